@@ -0,0 +1,120 @@
+import argparse
+import time
+
+import numpy as np
+
+from miniwake.turbine import Turbine
+from miniwake.turbine import FixedThrustCurve
+from miniwake.wind_farm_wake import WindFarmWake
+from miniwake.ambient import FixedAmbientConditions
+from miniwake.rotor_integration import VelocityDeficitIntegrator
+from miniwake.rotor_integration import AddedTurbulenceIntegrator
+from miniwake.rotor_integration import VectorVelocityDeficitIntegrator
+from miniwake.rotor_integration import GaussVelocityDeficitIntegrator
+from miniwake.rotor_integration import RotorOverlapIntegrator
+
+
+# (radial points, angular points) of the Gauss integrators
+GAUSS_POINTS = [
+    (1, 4),
+    (2, 6),
+    (3, 8),
+    (4, 12),
+    (6, 16),
+    (8, 24),
+]
+
+REFERENCE_POINTS = (16, 64)
+
+
+def staggered_layout(rows, columns, spacing):
+
+    turbines = [
+        Turbine(
+            name=f"T{i}_{j}",
+            x=spacing * i + 0.1 * spacing * j,
+            y=0.75 * spacing * j,
+            hub_height=80.0,
+            diameter=76.0,
+            rotational_speed_rpm=17.0,
+            thrust_curve=FixedThrustCurve(0.75))
+        for i in range(rows) for j in range(columns)]
+
+    turbines.sort(key=lambda turbine: turbine.x)
+
+    return turbines
+
+
+def solve(turbines, ambient_conditions, velocity_deficit_integrator, added_turbulence_integrator):
+
+    return WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=ambient_conditions,
+        velocity_deficit_integrator=velocity_deficit_integrator,
+        added_turbulence_integrator=added_turbulence_integrator)
+
+
+def time_per_flow_case(turbines, ambient_conditions, velocity_deficit_integrator, added_turbulence_integrator, repeats):
+
+    # the first solve fills the trajectory cache for this integrator's waked conditions
+    wind_farm_wake = solve(turbines, ambient_conditions, velocity_deficit_integrator, added_turbulence_integrator)
+
+    start = time.perf_counter()
+
+    for _ in range(repeats):
+        solve(turbines, ambient_conditions, velocity_deficit_integrator, added_turbulence_integrator)
+
+    return wind_farm_wake, (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Convergence and time per flow case of the rotor integrators")
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--spacing", type=float, default=400.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    arguments = parser.parse_args()
+
+    turbines = staggered_layout(arguments.rows, arguments.columns, arguments.spacing)
+
+    ambient_conditions = FixedAmbientConditions(fixed_velocity=9.5, fixed_turbulence=0.08)
+
+    # every integrator is paired with the section maximum for added turbulence,
+    # as the waked turbulence feeds into the deficits downwind, so that the
+    # integrators are compared on the velocity deficit alone
+    reference = solve(
+        turbines,
+        ambient_conditions,
+        GaussVelocityDeficitIntegrator(*REFERENCE_POINTS),
+        AddedTurbulenceIntegrator())
+
+    reference_velocities = np.array([wake.waked_velocity for wake in reference.turbine_wakes])
+
+    integrators = [
+        ("sections (12)", VelocityDeficitIntegrator(), AddedTurbulenceIntegrator()),
+        ("vector sections (12)", VectorVelocityDeficitIntegrator(), AddedTurbulenceIntegrator()),
+        ("rotor overlap", RotorOverlapIntegrator(), AddedTurbulenceIntegrator()),
+    ]
+
+    for radial_points, angular_points in GAUSS_POINTS:
+        integrators.append((
+            f"gauss {radial_points}x{angular_points} ({radial_points * angular_points})",
+            GaussVelocityDeficitIntegrator(radial_points, angular_points),
+            AddedTurbulenceIntegrator()))
+
+    print(f"{len(turbines)} turbines, reference gauss {REFERENCE_POINTS[0]}x{REFERENCE_POINTS[1]}")
+    print(f"{'integrator':<24}{'max error m/s':>16}{'rms error m/s':>16}{'time per case s':>18}")
+
+    for name, velocity_deficit_integrator, added_turbulence_integrator in integrators:
+
+        wind_farm_wake, elapsed = time_per_flow_case(
+            turbines,
+            ambient_conditions,
+            velocity_deficit_integrator,
+            added_turbulence_integrator,
+            arguments.repeats)
+
+        errors = np.array([wake.waked_velocity for wake in wind_farm_wake.turbine_wakes]) - reference_velocities
+
+        print(f"{name:<24}{np.max(np.abs(errors)):>16.2e}{np.sqrt(np.mean(errors * errors)):>16.2e}{elapsed:>18.3f}")
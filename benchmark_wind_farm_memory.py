@@ -0,0 +1,209 @@
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+from miniwake import wind_farm_wake as wind_farm_wake_module
+from miniwake.turbine import Turbine
+from miniwake.turbine import FixedThrustCurve
+from miniwake.turbine_wake import TurbineWake
+from miniwake.interacting_wakes import InteractingWakes
+from miniwake.wind_farm_wake import WindFarmWake
+from miniwake.ambient import FixedAmbientConditions
+from miniwake.rotor_integration import RotorCenterIntegrator
+from miniwake.deficit_engine import OdeDeficitEngine
+
+
+# peak memory and time of a large wind farm wake solve, in two modes each run in
+# its own process (peak RSS is a high water mark):
+#
+#   all_pairs    the storage before per-pair objects had __slots__ and TurbineWake
+#                kept only the interacting wakes in arrays, an object (with an
+#                instance dictionary) for the wake of every upwind turbine at every
+#                downwind turbine, with cross-section and profile objects for those
+#                in the wake, held alongside the current storage
+#   interacting  the current storage
+#
+# e.g. python benchmark_wind_farm_memory.py --rows 25 --columns 20
+
+
+class PairRecord:
+
+    # as WakeAtRotorCenter before __slots__
+
+    def __init__(self, x, cross_section, lateral_distance, vertical_distance):
+
+        self.x = x
+        self.lateral_distance = lateral_distance
+        self.vertical_distance = vertical_distance
+        self.upwind_diameter = cross_section.upwind_diameter
+        self.one_over_upwind_diameter = 1.0 / cross_section.upwind_diameter
+        self.normalised_distance_downwind = cross_section.normalised_distance_downwind
+        self.cross_section = cross_section
+
+
+class NoWakeRecord:
+
+    # as NoWakeCrossSection before __slots__
+
+    def __init__(self, distance_downwind, upwind_diameter):
+
+        self.distance_downwind = distance_downwind
+        self.upwind_diameter = upwind_diameter
+        self.normalised_distance_downwind = distance_downwind / upwind_diameter
+
+
+class WakeRecord(NoWakeRecord):
+
+    # as WakeCrossSection (and its two profiles) before __slots__
+
+    def __init__(self, distance_downwind, upwind_diameter, velocity_deficit, added_turbulence, width):
+
+        super().__init__(distance_downwind, upwind_diameter)
+
+        self.velocity_deficit = ProfileRecord(velocity_deficit, width)
+        self.added_turbulence = ProfileRecord(added_turbulence, width)
+        self.width = width
+
+
+class ProfileRecord:
+
+    def __init__(self, value, width):
+
+        self.value = value
+        self.wake_width = width
+        self.one_over_wake_width = 1.0 / width
+        self.one_over_wake_width_sq = self.one_over_wake_width * self.one_over_wake_width
+
+
+class AllPairsTurbineWake(TurbineWake):
+
+    # also keeps a record of every added wake, as TurbineWake did
+
+    def __init__(self, *args, **kwargs):
+
+        super().__init__(*args, **kwargs)
+
+        self.pair_records = []
+
+    def add_wake(self, turbine_wake):
+
+        interacting = len(self.interacting_wakes)
+
+        super().add_wake(turbine_wake)
+
+        distance_downwind = self.x - turbine_wake.x
+
+        if len(self.interacting_wakes) > interacting:
+
+            column = self.interacting_wakes.values[:, interacting]
+
+            cross_section = WakeRecord(
+                distance_downwind,
+                turbine_wake.diameter,
+                column[InteractingWakes.ROWS["velocity_deficits"]],
+                column[InteractingWakes.ROWS["added_turbulences"]],
+                column[InteractingWakes.ROWS["widths"]])
+
+        else:
+
+            cross_section = NoWakeRecord(distance_downwind, turbine_wake.diameter)
+
+        self.pair_records.append(PairRecord(
+            turbine_wake.x,
+            cross_section,
+            self.y - turbine_wake.y,
+            self.hub_height - turbine_wake.hub_height))
+
+
+def regular_layout(rows, columns, spacing):
+
+    return [
+        Turbine(
+            name=f"T{i}_{j}",
+            x=spacing * i,
+            y=spacing * j,
+            hub_height=80.0,
+            diameter=76.0,
+            rotational_speed_rpm=17.0,
+            thrust_curve=FixedThrustCurve(0.7))
+        for i in range(rows) for j in range(columns)]
+
+
+def peak_rss_megabytes():
+    # ru_maxrss is in kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run(arguments):
+
+    # one solve in this process, printing pairs, interacting, seconds and MB above start
+
+    turbines = regular_layout(arguments.rows, arguments.columns, arguments.spacing)
+
+    upwind_index_bin_width = arguments.upwind_index_bin_width
+
+    if arguments.mode == "all_pairs":
+        # WindFarmWake creates its TurbineWakes from its module's TurbineWake
+        wind_farm_wake_module.TurbineWake = AllPairsTurbineWake
+        upwind_index_bin_width = None
+
+    # every turbine's waked conditions are different, so the trajectory cache
+    # is sized to the farm
+    deficit_engine = OdeDeficitEngine(maxsize=4 * len(turbines))
+
+    start_rss = peak_rss_megabytes()
+
+    start = time.perf_counter()
+
+    wind_farm_wake = WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=FixedAmbientConditions(fixed_velocity=9.5, fixed_turbulence=0.08),
+        velocity_deficit_integrator=RotorCenterIntegrator(),
+        added_turbulence_integrator=RotorCenterIntegrator(),
+        deficit_engine=deficit_engine,
+        upwind_index_bin_width=upwind_index_bin_width)
+
+    elapsed = time.perf_counter() - start
+
+    added = sum(wake.number_of_added_wakes for wake in wind_farm_wake.turbine_wakes)
+    interacting = sum(len(wake.interacting_wakes) for wake in wind_farm_wake.turbine_wakes)
+
+    print(added, interacting, elapsed, peak_rss_megabytes() - start_rss)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Peak memory and time of a large wind farm wake solve")
+    parser.add_argument("--rows", type=int, default=25)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--spacing", type=float, default=400.0)
+    parser.add_argument("--upwind-index-bin-width", type=float, default=None)
+    parser.add_argument("--mode", choices=["all_pairs", "interacting"], default=None)
+    arguments = parser.parse_args()
+
+    if arguments.mode is not None:
+        run(arguments)
+        sys.exit()
+
+    results = {}
+
+    for mode in ["all_pairs", "interacting"]:
+
+        command = [sys.executable, __file__, "--mode", mode] + sys.argv[1:]
+
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout.split()
+
+        results[mode] = (int(output[0]), int(output[1]), float(output[2]), float(output[3]))
+
+    added, interacting, _, _ = results["interacting"]
+
+    print(f"{arguments.rows * arguments.columns} turbines, {added} wake pairs tested, {interacting} interacting")
+
+    for mode, (_, _, elapsed, megabytes) in results.items():
+        print(f"{mode:12} time {elapsed:6.2f} s, peak RSS {megabytes:7.1f} MB above start")
+
+    reduction = 1.0 - results["interacting"][3] / results["all_pairs"][3]
+
+    print(f"memory growth reduced by {100.0 * reduction:.0f}%")
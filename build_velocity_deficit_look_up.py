@@ -25,7 +25,8 @@ if __name__ == "__main__":
                             max_dist_downwind=1000.0,
                             max_turbulence_intensity=0.4,
                             max_thrust_coefficient=1.0,
-                            print_messages=True)
+                            print_messages=True,
+                            workers=os.cpu_count())
 
         look_up_builder.save(lookup_path)
 
@@ -0,0 +1,19 @@
+import math
+
+import numpy as np
+
+
+# helpers for the functions which take either floats or numpy arrays
+# (broadcast together), arrays take the numpy branch of a calculation
+
+
+def is_array(*values):
+    return any(isinstance(value, np.ndarray) for value in values)
+
+
+def sqrt(value):
+
+    if is_array(value):
+        return np.sqrt(value)
+
+    return math.sqrt(value)
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 class NumberOfImpactiveWakesCalculator:
 
@@ -11,6 +13,80 @@ class NumberOfImpactiveWakesCalculator:
         if velocity_deficit > self.threshold:
             self.count += 1
 
+    def count_arrays(self, velocity_deficits):
+
+        # count for each point of (wakes, points) deficits
+        return np.sum(velocity_deficits > self.threshold, axis=0)
+
+
+class RSSMaxAutoArrayCombination:
+
+    # array equivalent of RSSMaxAutoVelocityDeficitCombiner.add() and combined_value()
+    # for many points, each wake is added at the subset of points it reaches so
+    # memory is bounded by the number of points rather than wakes x points
+
+    def __init__(self, number_of_points):
+        self.far_combination_total = np.zeros(number_of_points)
+        self.near_combination_maximum = np.zeros(number_of_points)
+        self.closest_normalised_distance_upwind = np.full(number_of_points, np.inf)
+
+    def add(self, points, values, normalised_distances_upwind, normalised_lateral_distances):
+
+        values = np.maximum(values, 0.0)
+
+        self.far_combination_total[points] += values * values
+        self.near_combination_maximum[points] = np.maximum(self.near_combination_maximum[points], values)
+
+        near = (values > 0.0) & (np.abs(normalised_lateral_distances) <= 1.5)
+
+        self.closest_normalised_distance_upwind[points[near]] = np.minimum(
+            self.closest_normalised_distance_upwind[points[near]],
+            normalised_distances_upwind[near])
+
+    def combined_value(self):
+        return np.where(
+            self.closest_normalised_distance_upwind <= 6.0,
+            self.near_combination_maximum,
+            np.sqrt(self.far_combination_total))
+
+
+class RSSLinearArrayCombination:
+
+    # array equivalent of the weighted RSS and linear combiners, as RSSMaxAutoArrayCombination
+
+    def __init__(self, number_of_points, squared_weight, linear_weight):
+        self.squared_weight = squared_weight
+        self.linear_weight = linear_weight
+        self.squared_combination_total = np.zeros(number_of_points)
+        self.linear_combination_total = np.zeros(number_of_points)
+
+    def add(self, points, values, normalised_distances_upwind, normalised_lateral_distances):
+
+        values = np.maximum(values, 0.0)
+
+        self.squared_combination_total[points] += values * values
+        self.linear_combination_total[points] += values
+
+    def combined_value(self):
+        return self.squared_weight * np.sqrt(self.squared_combination_total) + self.linear_weight * self.linear_combination_total
+
+
+class RSSArrayCombination:
+
+    # array equivalent of AddedTurbulenceCombiner, as RSSMaxAutoArrayCombination
+
+    def __init__(self, number_of_points):
+        self.total = np.zeros(number_of_points)
+
+    def add(self, points, values):
+
+        values = np.maximum(values, 0.0)
+
+        self.total[points] += values * values
+
+    def combined_value(self):
+        return np.sqrt(self.total)
+
 
 class RSSMaxAutoVelocityDeficitCombiner:
 
@@ -46,6 +122,30 @@ class RSSMaxAutoVelocityDeficitCombiner:
     def impacting_wakes(self):
         return self.impactive_wakes.count
 
+    @staticmethod
+    def combine_arrays(values, normalised_distances_upwind, normalised_lateral_distances):
+
+        # array equivalent of add() for every wake then combined_value(),
+        # arrays are (wakes, points) and one combined value is returned per point
+
+        values = np.maximum(values, 0.0)
+
+        near = (values > 0.0) & (np.abs(normalised_lateral_distances) <= 1.5)
+
+        closest_normalised_distance_upwind = np.min(
+            np.where(near, normalised_distances_upwind, np.inf),
+            axis=0,
+            initial=np.inf)
+
+        return np.where(
+            closest_normalised_distance_upwind <= 6.0,
+            np.max(values, axis=0, initial=0.0),
+            np.sqrt(np.sum(values * values, axis=0)))
+
+    @staticmethod
+    def array_combination(number_of_points):
+        return RSSMaxAutoArrayCombination(number_of_points)
+
 
 class WeightedAverageRSSLinearVelocityDeficitCombiner:
 
@@ -70,6 +170,20 @@ class WeightedAverageRSSLinearVelocityDeficitCombiner:
     def impacting_wakes(self):
         return self.impactive_wakes.count
 
+    @staticmethod
+    def combine_arrays(values, normalised_distances_upwind, normalised_lateral_distances):
+
+        # array equivalent of add() for every wake then combined_value(),
+        # arrays are (wakes, points) and one combined value is returned per point
+
+        values = np.maximum(values, 0.0)
+
+        return 0.7 * np.sqrt(np.sum(values * values, axis=0)) + 0.3 * np.sum(values, axis=0)
+
+    @staticmethod
+    def array_combination(number_of_points):
+        return RSSLinearArrayCombination(number_of_points, 0.7, 0.3)
+
 
 class StraightAverageRSSLinearVelocityDeficitCombiner:
 
@@ -94,6 +208,20 @@ class StraightAverageRSSLinearVelocityDeficitCombiner:
     def impacting_wakes(self):
         return self.impactive_wakes.count
 
+    @staticmethod
+    def combine_arrays(values, normalised_distances_upwind, normalised_lateral_distances):
+
+        # array equivalent of add() for every wake then combined_value(),
+        # arrays are (wakes, points) and one combined value is returned per point
+
+        values = np.maximum(values, 0.0)
+
+        return 0.5 * np.sqrt(np.sum(values * values, axis=0)) + 0.5 * np.sum(values, axis=0)
+
+    @staticmethod
+    def array_combination(number_of_points):
+        return RSSLinearArrayCombination(number_of_points, 0.5, 0.5)
+
 
 class AddedTurbulenceCombiner:
 
@@ -112,3 +240,17 @@ class AddedTurbulenceCombiner:
 
     def combined_value(self):
         return math.sqrt(self.total)
+
+    @staticmethod
+    def combine_arrays(values):
+
+        # array equivalent of add() for every wake then combined_value(),
+        # values are (wakes, points)
+
+        values = np.maximum(values, 0.0)
+
+        return np.sqrt(np.sum(values * values, axis=0))
+
+    @staticmethod
+    def array_combination(number_of_points):
+        return RSSArrayCombination(number_of_points)
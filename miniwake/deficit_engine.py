@@ -0,0 +1,188 @@
+import numpy as np
+
+from . import velocity_deficit
+
+from .velocity_deficit import clamp_velocity_deficit_inputs
+from .velocity_deficit import clamp_velocity_deficit_input_arrays
+from .velocity_deficit import look_up_velocity_deficit
+from .velocity_deficit import look_up_velocity_deficits
+from .velocity_deficit import solve_velocity_deficit
+from .velocity_deficit import solve_cached_velocity_deficits
+from .velocity_deficit import VelocityDeficitTrajectoryCache
+from .velocity_deficit import AdaptiveVelocityDeficitTrajectory
+from .velocity_deficit import VelocityDeficitTrajectory
+from .velocity_deficit import VelocityDeficitTrajectoryGroup
+
+
+# a deficit engine calculates the centre line velocity deficit for the wakes,
+# it is passed to SingleWake, TurbineWake, WindFarmWake and WindFarm in place of
+# the module global velocity_deficit.velocity_deficit_look_up
+#
+# engines hold all of their state (trajectory cache or look-up table) so each
+# thread or process can use its own warmed up engine, an engine that caches
+# trajectories (OdeDeficitEngine) can be shared between threads but they then
+# take turns through its cache's lock
+
+
+class GlobalDeficitEngine:
+
+    # uses velocity_deficit.velocity_deficit_look_up when it is set and solves
+    # the eddy viscosity model otherwise (the behaviour before engines), caching
+    # trajectories in velocity_deficit.velocity_deficit_trajectory_cache
+
+    def calculate_velocity_deficit(
+            self,
+            thrust_coefficient,
+            normalized_distance_downwind,
+            turbulence):
+
+        return velocity_deficit.calculate_velocity_deficit(
+            thrust_coefficient,
+            normalized_distance_downwind,
+            turbulence)
+
+    def calculate_velocity_deficits(
+            self,
+            thrust_coefficients,
+            normalized_distances_downwind,
+            turbulences):
+
+        return velocity_deficit.calculate_velocity_deficits(
+            thrust_coefficients,
+            normalized_distances_downwind,
+            turbulences)
+
+
+class OdeDeficitEngine:
+
+    # solves the eddy viscosity model, trajectories are kept in the engine's own
+    # cache, adaptive uses AdaptiveVelocityDeficitTrajectory (far fewer steps)
+
+    def __init__(
+            self,
+            maxsize=128,
+            quantum=1e-6,
+            maximum_distance_downstream=11000.0,
+            adaptive=False):
+
+        self.trajectory_cache = VelocityDeficitTrajectoryCache(
+            maxsize=maxsize,
+            quantum=quantum,
+            maximum_distance_downstream=maximum_distance_downstream,
+            trajectory_type=AdaptiveVelocityDeficitTrajectory if adaptive else VelocityDeficitTrajectory,
+            group_type=None if adaptive else VelocityDeficitTrajectoryGroup)
+
+    def calculate_velocity_deficit(
+            self,
+            thrust_coefficient,
+            normalized_distance_downwind,
+            turbulence):
+
+        thrust_coefficient, normalized_distance_downwind, turbulence = clamp_velocity_deficit_inputs(
+            thrust_coefficient,
+            normalized_distance_downwind,
+            turbulence)
+
+        solution = solve_velocity_deficit(
+            thrust_coefficient,
+            normalized_distance_downwind,
+            turbulence,
+            trajectory_cache=self.trajectory_cache)
+
+        return max([solution, 0])
+
+    def calculate_velocity_deficits(
+            self,
+            thrust_coefficients,
+            normalized_distances_downwind,
+            turbulences):
+
+        thrust_coefficients, normalized_distances_downwind, turbulences = clamp_velocity_deficit_input_arrays(
+            thrust_coefficients,
+            normalized_distances_downwind,
+            turbulences)
+
+        solution = solve_cached_velocity_deficits(
+            thrust_coefficients,
+            normalized_distances_downwind,
+            turbulences,
+            trajectory_cache=self.trajectory_cache)
+
+        return np.maximum(solution, 0.0)
+
+    def clear(self):
+        self.trajectory_cache.clear()
+
+
+class LookUpDeficitEngine:
+
+    # interpolates a VelocityDeficitLookUp or evaluates a VelocityDeficitSurrogate
+    # (anything called as look_up(thrust_coefficient, normalized_distance_downwind,
+    # turbulence) with a max_turbulence attribute), read only once warmed up
+
+    def __init__(self, look_up):
+        self.look_up = look_up
+
+    def warm_up(self):
+
+        # builds a lazily created interpolator now rather than on the first
+        # query, so that workers sharing the engine never build it concurrently
+
+        self.calculate_velocity_deficit(0.5, 2.0, 0.0)
+
+        return self
+
+    def calculate_velocity_deficit(
+            self,
+            thrust_coefficient,
+            normalized_distance_downwind,
+            turbulence):
+
+        thrust_coefficient, normalized_distance_downwind, turbulence = clamp_velocity_deficit_inputs(
+            thrust_coefficient,
+            normalized_distance_downwind,
+            turbulence)
+
+        solution = look_up_velocity_deficit(
+            self.look_up,
+            thrust_coefficient,
+            normalized_distance_downwind,
+            turbulence)
+
+        return max([solution, 0])
+
+    def calculate_velocity_deficits(
+            self,
+            thrust_coefficients,
+            normalized_distances_downwind,
+            turbulences):
+
+        thrust_coefficients, normalized_distances_downwind, turbulences = clamp_velocity_deficit_input_arrays(
+            thrust_coefficients,
+            normalized_distances_downwind,
+            turbulences)
+
+        solution = look_up_velocity_deficits(
+            self.look_up,
+            thrust_coefficients,
+            normalized_distances_downwind,
+            turbulences)
+
+        return np.maximum(solution, 0.0)
+
+
+default_deficit_engine = GlobalDeficitEngine()
+
+
+def create_deficit_engine(number_of_turbines):
+
+    # the engine for a farm which is not given one, the module globals are used
+    # when a look-up has been set on the module, otherwise the farm caches its
+    # trajectories in its own engine (rather than the module cache) sized so that
+    # cycling through the turbines (a trajectory each) does not evict the ones
+    # still needed
+
+    if velocity_deficit.is_look_up_set():
+        return default_deficit_engine
+
+    return OdeDeficitEngine(maxsize=max(128, 2 * number_of_turbines))
@@ -0,0 +1,192 @@
+import numpy as np
+
+from .velocity_deficit import calculate_shape_at_position_sq
+from .combination import AddedTurbulenceCombiner
+from .turbine_wake import calculate_normalised_control_surface
+
+
+class FlowField:
+
+    # combined velocity deficit and added turbulence of the wakes of a solved
+    # WindFarmWake at arbitrary points, using the same (rotated) co-ordinates as
+    # the wind farm wake, i.e. positive x along the wind direction
+    #
+    # points are processed tile_size at a time so memory is bounded by the tile
+    # rather than the size of the map, within a tile each wake's cross-sections are
+    # calculated together (TurbineWake.calculate_cross_sections) once per distinct
+    # distance downwind and all of the points are evaluated in one vector operation
+    #
+    # with apply_control_surface only points inside a wake's rule of thumb control
+    # surface (as used by TurbineWake for downwind rotors) are evaluated for that
+    # wake, which avoids calculating cross-sections for wakes that cannot reach
+    # scattered points, otherwise every point downwind of a wake is evaluated
+
+    def __init__(
+            self,
+            wind_farm_wake,
+            tile_size=20000,
+            apply_control_surface=False):
+
+        if tile_size < 1:
+            raise Exception("Tile size must be at least 1")
+
+        self.turbine_wakes = wind_farm_wake.turbine_wakes
+        self.velocity_deficit_combiner = wind_farm_wake.velocity_deficit_combiner
+        self.tile_size = tile_size
+        self.apply_control_surface = apply_control_surface
+
+    def calculate(self, x, y, z):
+
+        # x, y and z are broadcast together, returns (velocity_deficit, added_turbulence)
+        # arrays of the broadcast shape
+
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        z = np.asarray(z, dtype=float)
+
+        shape = np.broadcast(x, y, z).shape
+        size = int(np.prod(shape))
+
+        x = np.broadcast_to(x, shape)
+        y = np.broadcast_to(y, shape)
+        z = np.broadcast_to(z, shape)
+
+        velocity_deficits = np.zeros(shape)
+        added_turbulences = np.zeros(shape)
+
+        for start in range(0, size, self.tile_size):
+
+            tile = np.unravel_index(np.arange(start, min(start + self.tile_size, size)), shape)
+
+            velocity_deficits[tile], added_turbulences[tile] = self.calculate_tile(x[tile], y[tile], z[tile])
+
+        return velocity_deficits, added_turbulences
+
+    def horizontal_plane(self, xs, ys, height):
+
+        # map at a fixed height, arrays are (len(ys), len(xs)) as np.meshgrid(xs, ys),
+        # calculated along x so that tiles share few distances downwind
+
+        velocity_deficits, added_turbulences = self.calculate(
+            np.asarray(xs, dtype=float)[:, np.newaxis],
+            np.asarray(ys, dtype=float)[np.newaxis, :],
+            height)
+
+        return velocity_deficits.T, added_turbulences.T
+
+    def vertical_plane(self, xs, zs, y):
+
+        # map in the vertical plane at lateral position y, arrays are (len(zs), len(xs))
+
+        velocity_deficits, added_turbulences = self.calculate(
+            np.asarray(xs, dtype=float)[:, np.newaxis],
+            y,
+            np.asarray(zs, dtype=float)[np.newaxis, :])
+
+        return velocity_deficits.T, added_turbulences.T
+
+    def calculate_tile(self, x, y, z):
+
+        # wakes are combined one at a time at the points they reach
+
+        velocity_deficits = self.velocity_deficit_combiner.array_combination(len(x))
+        added_turbulences = AddedTurbulenceCombiner.array_combination(len(x))
+
+        for turbine_wake in self.turbine_wakes:
+
+            values = self.calculate_wake(turbine_wake, x, y, z)
+
+            if values is None:
+                continue
+
+            points, velocity_deficit, added_turbulence, normalised_distance_downwind, normalised_lateral_distance = values
+
+            velocity_deficits.add(points, velocity_deficit, normalised_distance_downwind, normalised_lateral_distance)
+            added_turbulences.add(points, added_turbulence)
+
+        return velocity_deficits.combined_value(), added_turbulences.combined_value()
+
+    def calculate_wake(self, turbine_wake, x, y, z):
+
+        # indices of the points within reach of one wake and the wake's velocity deficit,
+        # added turbulence, normalised distance downwind and normalised lateral distance
+        # at them, None if no point is in the wake
+
+        distances_downwind = x - turbine_wake.x
+
+        downwind = np.flatnonzero(distances_downwind > 0.0)
+
+        if self.apply_control_surface:
+            downwind = downwind[self.within_control_surface(turbine_wake, distances_downwind[downwind], y[downwind], z[downwind])]
+
+        if len(downwind) < 1:
+            return None
+
+        distances, distance_index = np.unique(distances_downwind[downwind], return_inverse=True)
+
+        centre_velocity_deficits, widths, added_turbulences = self.cross_section_values(turbine_wake, distances)
+
+        if not np.any(centre_velocity_deficits > 0.0):
+            return None
+
+        lateral_distances = y[downwind] - turbine_wake.y
+        vertical_distances = z[downwind] - turbine_wake.hub_height
+
+        distance_from_wake_center_sq = lateral_distances * lateral_distances + vertical_distances * vertical_distances
+
+        # beyond twice the widest width the deficit shape is cut off (and the
+        # added turbulence top-hat ends at one width)
+        maximum_width = np.max(widths[centre_velocity_deficits > 0.0])
+
+        within = distance_from_wake_center_sq <= 4.0 * maximum_width * maximum_width
+
+        downwind = downwind[within]
+        distance_index = distance_index[within]
+        distance_from_wake_center_sq = distance_from_wake_center_sq[within]
+
+        widths = widths[distance_index]
+
+        velocity_deficit = centre_velocity_deficits[distance_index] * calculate_shape_at_position_sq(
+            distance_from_wake_center_sq / (widths * widths))
+
+        added_turbulence = np.where(
+            distance_from_wake_center_sq < widths * widths,
+            added_turbulences[distance_index],
+            0.0)
+
+        one_over_diameter = 1.0 / turbine_wake.diameter
+
+        normalised_distance_downwind = distances_downwind[downwind] * one_over_diameter
+        normalised_lateral_distance = (y[downwind] - turbine_wake.y) * one_over_diameter
+
+        return downwind, velocity_deficit, added_turbulence, normalised_distance_downwind, normalised_lateral_distance
+
+    def within_control_surface(self, turbine_wake, distances_downwind, y, z):
+
+        # as TurbineWake.add_wake for a downwind rotor of zero diameter
+
+        radius = 0.5 * turbine_wake.diameter
+
+        lateral_distances = np.maximum(np.abs(y - turbine_wake.y) - radius, 0.0)
+        vertical_distances = np.maximum(np.abs(z - turbine_wake.hub_height) - radius, 0.0)
+
+        rd_sq = lateral_distances * lateral_distances + vertical_distances * vertical_distances
+
+        control_surfaces = np.maximum(
+            calculate_normalised_control_surface(
+                distances_downwind / turbine_wake.diameter,
+                turbine_wake.waked_turbulence) * turbine_wake.diameter,
+            0.0)
+
+        return rd_sq < control_surfaces * control_surfaces
+
+    def cross_section_values(self, turbine_wake, distances):
+
+        # centre line velocity deficit, width and added turbulence of the wake at each distance,
+        # where there is no wake the deficit is zero (and the width one to avoid dividing by zero)
+
+        cross_sections = turbine_wake.calculate_cross_sections(distances)
+
+        widths = np.where(cross_sections.in_wake, cross_sections.widths, 1.0)
+
+        return cross_sections.velocity_deficits, widths, cross_sections.added_turbulences
@@ -0,0 +1,280 @@
+import math
+
+import numpy as np
+
+from .velocity_deficit import calculate_width
+from .deficit_engine import default_deficit_engine
+from .meander import calculate_meander_factor
+
+
+class InfluenceEnvelope:
+
+    # tabulated radius (in upwind diameters) beyond which a wake's velocity deficit
+    # is below threshold, as a function of normalised distance downwind, thrust
+    # coefficient and the wake's local turbulence, calculated from the wake model
+    # rather than fitted (compare TurbineWake.rule_of_thumb_control_surface)
+    #
+    # each table cell holds an upper bound on the radius anywhere in the cell, not
+    # a sample: the cell is split into subdivisions sub-cells along each axis and the
+    # deficit, width and meander widening in each sub-cell are bounded from the
+    # deficits at its corners, the radius rises with deficit (for a given width) and
+    # width, so these give a bound on the radius, this assumes that the deficit from
+    # deficit_engine does not increase with distance or turbulence and does not fall
+    # with thrust coefficient (true of the eddy viscosity model and of linear
+    # interpolation between its values, see tests/test_influence_envelope.py),
+    # more subdivisions make the bound tighter
+    #
+    # the deficits are calculated with deficit_engine, which should be the engine
+    # (ODE, look-up or surrogate) the wakes pruned with the envelope use
+    #
+    # with apply_meander the radius is the largest for any ambient turbulence up to
+    # the local turbulence (the meander widens the wake but lowers the deficit), so
+    # pruning with the envelope changes the velocity deficit at a rotor by less than
+    # threshold, the added turbulence top-hat (which extends to the meandered width
+    # however small the deficit) is only covered with include_added_turbulence and
+    # is otherwise pruned along with the deficit, as with the control surface
+
+    # below this SingleWake treats the deficit as no wake
+    NEGLIGIBLE_DEFICIT = 0.000001
+
+    # shape factor is cut off beyond twice the wake width
+    SHAPE_CUT_OFF_SQ = 4.0
+    SHAPE_COEFFICIENT = 3.56
+
+    # the deficit never exceeds the thrust coefficient (it starts below it and
+    # decays) so no wake is narrower than calculate_width(D, D) >= sqrt(3.56 / 8)
+    MIN_WIDTH = math.sqrt(3.56 / 8.0)
+
+    def __init__(
+            self,
+            radii,
+            distance_step,
+            thrust_coefficient_step,
+            turbulence_step,
+            threshold,
+            apply_meander,
+            include_added_turbulence):
+
+        self.radii = radii
+
+        self.distance_step = distance_step
+        self.thrust_coefficient_step = thrust_coefficient_step
+        self.turbulence_step = turbulence_step
+
+        self.threshold = threshold
+        self.apply_meander = apply_meander
+        self.include_added_turbulence = include_added_turbulence
+
+    @classmethod
+    def build(
+            cls,
+            threshold=0.001,
+            max_distance=200.0,
+            distance_step=1.0,
+            max_thrust_coefficient=1.0,
+            thrust_coefficient_step=0.05,
+            max_turbulence=0.4,
+            turbulence_step=0.02,
+            apply_meander=True,
+            include_added_turbulence=False,
+            subdivisions=2,
+            deficit_engine=default_deficit_engine):
+
+        cells = (
+            int(round(max_distance / distance_step)),
+            int(round(max_thrust_coefficient / thrust_coefficient_step)),
+            int(round(max_turbulence / turbulence_step)))
+
+        distances = np.linspace(0.0, cells[0] * distance_step, cells[0] * subdivisions + 1)
+        thrust_coefficients = np.linspace(0.0, cells[1] * thrust_coefficient_step, cells[1] * subdivisions + 1)
+        turbulences = np.linspace(0.0, cells[2] * turbulence_step, cells[2] * subdivisions + 1)
+
+        deficits = deficit_engine.calculate_velocity_deficits(
+            thrust_coefficients[np.newaxis, :, np.newaxis],
+            distances[:, np.newaxis, np.newaxis],
+            turbulences[np.newaxis, np.newaxis, :])
+
+        # the deficit in each sub-cell is largest at its nearest, highest thrust
+        # coefficient, lowest turbulence corner and smallest at the opposite one
+        sub_cell_radii = cls.calculate_radius_bounds(
+            distances[1:, np.newaxis, np.newaxis],
+            thrust_coefficients[np.newaxis, :-1, np.newaxis],
+            thrust_coefficients[np.newaxis, 1:, np.newaxis],
+            turbulences[np.newaxis, np.newaxis, 1:],
+            deficits[1:, :-1, 1:],
+            deficits[:-1, 1:, :-1],
+            threshold,
+            apply_meander,
+            include_added_turbulence)
+
+        radii = sub_cell_radii.reshape(
+            cells[0], subdivisions,
+            cells[1], subdivisions,
+            cells[2], subdivisions).max(axis=(1, 3, 5))
+
+        return cls(
+            radii,
+            distance_step,
+            thrust_coefficient_step,
+            turbulence_step,
+            threshold,
+            apply_meander,
+            include_added_turbulence)
+
+    @classmethod
+    def calculate_radii(
+            cls,
+            distances,
+            thrust_coefficients,
+            turbulences,
+            threshold,
+            apply_meander,
+            include_added_turbulence,
+            deficit_engine=default_deficit_engine):
+
+        # radius at each (distance, thrust coefficient, turbulence), inputs are broadcast together
+
+        distances, thrust_coefficients, turbulences = np.broadcast_arrays(
+            np.asarray(distances, dtype=float),
+            np.asarray(thrust_coefficients, dtype=float),
+            np.asarray(turbulences, dtype=float))
+
+        deficits = deficit_engine.calculate_velocity_deficits(thrust_coefficients, distances, turbulences)
+
+        return cls.calculate_radius_bounds(
+            distances,
+            thrust_coefficients,
+            thrust_coefficients,
+            turbulences,
+            deficits,
+            deficits,
+            threshold,
+            apply_meander,
+            include_added_turbulence)
+
+    @classmethod
+    def calculate_radius_bounds(
+            cls,
+            max_distances,
+            min_thrust_coefficients,
+            max_thrust_coefficients,
+            max_turbulences,
+            min_deficits,
+            max_deficits,
+            threshold,
+            apply_meander,
+            include_added_turbulence):
+
+        # largest radius for any distance, thrust coefficient, turbulence and deficit
+        # up to (or down to) these limits, the radius itself where the limits are equal
+
+        in_wake = max_deficits >= cls.NEGLIGIBLE_DEFICIT
+
+        safe_max_deficits = np.where(in_wake, max_deficits, 1.0)
+
+        # a deficit below threshold has no radius, so only wider wakes than at threshold matter
+        max_widths = calculate_width(max_thrust_coefficients, np.maximum(min_deficits, threshold))
+
+        # widening g = 1 / meander factor ranges from 1 (no meander) up to that at the
+        # local turbulence, as the ambient turbulence is no more than the local
+        if apply_meander:
+            min_widths = np.maximum(
+                calculate_width(min_thrust_coefficients, safe_max_deficits),
+                cls.MIN_WIDTH)
+            maximum_widening = 1.0 / calculate_meander_factor(
+                max_distances,
+                safe_max_deficits,
+                min_widths,
+                max_turbulences)
+        else:
+            maximum_widening = np.ones(in_wake.shape)
+
+        log_ratio = np.log(np.maximum(safe_max_deficits, threshold) / threshold)
+
+        # radius(g) = g w sqrt(min(log_ratio - ln g, cut off) / 3.56), the largest value is at
+        # an end of the range or where it is stationary (ln g = log_ratio - 1/2) or at the cut off
+        candidates = [
+            np.ones(in_wake.shape),
+            maximum_widening,
+            np.clip(np.exp(log_ratio - 0.5), 1.0, maximum_widening),
+            np.clip(np.exp(log_ratio - cls.SHAPE_COEFFICIENT * cls.SHAPE_CUT_OFF_SQ), 1.0, maximum_widening)]
+
+        radii = np.zeros(in_wake.shape)
+
+        for widening in candidates:
+            exponent = np.clip(log_ratio - np.log(widening), 0.0, cls.SHAPE_COEFFICIENT * cls.SHAPE_CUT_OFF_SQ)
+            radii = np.maximum(radii, widening * max_widths * np.sqrt(exponent / cls.SHAPE_COEFFICIENT))
+
+        if include_added_turbulence:
+            top_hat_widths = calculate_width(
+                max_thrust_coefficients,
+                np.maximum(min_deficits, cls.NEGLIGIBLE_DEFICIT))
+            radii = np.maximum(radii, maximum_widening * top_hat_widths)
+
+        return np.where(in_wake, radii, 0.0)
+
+    def radius(self, normalised_distance_downwind, thrust_coefficient, turbulence):
+
+        # normalised radius of influence, None outside of the table
+
+        indices = []
+
+        for value, step, cells in zip(
+                (normalised_distance_downwind, thrust_coefficient, turbulence),
+                (self.distance_step, self.thrust_coefficient_step, self.turbulence_step),
+                self.radii.shape):
+
+            if value < 0.0 or value > step * cells:
+                return None
+
+            # a value on the upper edge belongs to the last cell
+            indices.append(min(math.floor(value / step), cells - 1))
+
+        return float(self.radii[tuple(indices)])
+
+    def radii_at(self, normalised_distances_downwind, thrust_coefficients, turbulences):
+
+        # array equivalent of radius, NaN outside of the table
+
+        indices = []
+        outside = np.zeros(np.broadcast(normalised_distances_downwind, thrust_coefficients, turbulences).shape, dtype=bool)
+
+        for values, step, cells in zip(
+                (normalised_distances_downwind, thrust_coefficients, turbulences),
+                (self.distance_step, self.thrust_coefficient_step, self.turbulence_step),
+                self.radii.shape):
+
+            values = np.asarray(values, dtype=float)
+
+            outside = outside | (values < 0.0) | (values > step * cells)
+
+            indices.append(np.clip(np.floor(values / step), 0, cells - 1).astype(int))
+
+        return np.where(outside, np.nan, self.radii[tuple(indices)])
+
+    def max_radius(self, thrust_coefficient, turbulence):
+
+        # largest radius at any distance in the table, None outside of the table
+
+        indices = []
+
+        for value, step, cells in zip(
+                (thrust_coefficient, turbulence),
+                (self.thrust_coefficient_step, self.turbulence_step),
+                self.radii.shape[1:]):
+
+            if value < 0.0 or value > step * cells:
+                return None
+
+            indices.append(min(math.floor(value / step), cells - 1))
+
+        return float(np.max(self.radii[:, indices[0], indices[1]]))
+
+    @property
+    def max_normalised_distance(self):
+        return self.distance_step * self.radii.shape[0]
+
+    def covers(self, apply_meander):
+
+        # an envelope built without meander is not conservative for meandering wakes
+        return self.apply_meander or not apply_meander
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+class InteractingWakes:
+
+    # the upwind wakes that reach a turbine's rotor, one column per wake in a
+    # growing (fields, capacity) array rather than an object per pair, upwind
+    # wakes that do not reach the rotor are not stored at all
+
+    FIELDS = (
+        "x",
+        "lateral_distances",
+        "vertical_distances",
+        "one_over_upwind_diameters",
+        "normalised_distances_downwind",
+        "velocity_deficits",
+        "added_turbulences",
+        "widths")
+
+    ROWS = {name: row for row, name in enumerate(FIELDS)}
+
+    def __init__(self, capacity=4):
+
+        self.size = 0
+        self.values = np.empty((len(self.FIELDS), capacity))
+
+        # the upwind TurbineWake of each column
+        self.turbine_wakes = []
+
+    def __len__(self):
+        return self.size
+
+    def append(self, turbine_wake, cross_section, lateral_distance, vertical_distance):
+
+        if self.size == self.values.shape[1]:
+            values = np.empty((len(self.FIELDS), 2 * self.size))
+            values[:, :self.size] = self.values
+            self.values = values
+
+        self.values[:, self.size] = (
+            turbine_wake.x,
+            lateral_distance,
+            vertical_distance,
+            1.0 / cross_section.upwind_diameter,
+            cross_section.normalised_distance_downwind,
+            cross_section.velocity_deficit.velocity_deficit,
+            cross_section.added_turbulence.added_turbulence,
+            cross_section.width)
+
+        self.turbine_wakes.append(turbine_wake)
+
+        self.size += 1
+
+    def column(self, name):
+        return self.values[self.ROWS[name], :self.size]
+
+    def rows(self):
+
+        # python floats for the scalar loops, one list per field
+
+        return self.values[:, :self.size].tolist()
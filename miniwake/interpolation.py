@@ -1,5 +1,10 @@
+import bisect
+
+import numpy as np
 from scipy import interpolate
 
+from .arrays import is_array
+
 
 def rect_grid_linear(cts, turbulences, distances, deficits):
 
@@ -16,4 +21,189 @@ def rect_grid_nearest(cts, turbulences, distances, deficits):
         points=(cts, turbulences, distances),
         values=deficits,
         method="nearest",
-        bounds_error=True)
\ No newline at end of file
+        bounds_error=True)
+
+
+class GridAxis:
+
+    # locates a value on one axis of a rectilinear grid, uniformly spaced axes
+    # are located by arithmetic and others by bisection
+
+    def __init__(self, values):
+
+        self.values = [float(value) for value in values]
+        self.array = np.array(self.values)
+        self.size = len(self.values)
+
+        if self.size < 2:
+            raise Exception("At least two points are required on each grid axis")
+
+        self.lower_bound = self.values[0]
+        self.upper_bound = self.values[-1]
+
+        steps = np.diff(self.values)
+
+        self.uniform = bool(np.allclose(steps, steps[0], rtol=1e-9, atol=0.0))
+        self.one_over_step = 1.0 / float(steps[0])
+
+    def locate(self, value):
+
+        # returns the index of the cell containing value
+        # and the normalised distance across it
+
+        if not (self.lower_bound <= value <= self.upper_bound):
+            raise ValueError(f"Value {value} is out of bounds [{self.lower_bound}, {self.upper_bound}]")
+
+        values = self.values
+        last = self.size - 2
+
+        if self.uniform:
+            index = min(int((value - self.lower_bound) * self.one_over_step), last)
+            # guard against rounding placing value one cell out
+            if value < values[index]:
+                index -= 1
+            elif index < last and value >= values[index + 1]:
+                index += 1
+        else:
+            index = min(max(bisect.bisect_right(values, value) - 1, 0), last)
+
+        lower = values[index]
+
+        return index, (value - lower) / (values[index + 1] - lower)
+
+    def locate_array(self, values):
+
+        # array equivalent of locate
+
+        if np.any(values < self.lower_bound) or np.any(values > self.upper_bound) or np.any(np.isnan(values)):
+            raise ValueError(f"Values are out of bounds [{self.lower_bound}, {self.upper_bound}]")
+
+        index = np.clip(np.searchsorted(self.array, values, side='right') - 1, 0, self.size - 2)
+
+        lower = self.array[index]
+
+        return index, (values - lower) / (self.array[index + 1] - lower)
+
+
+class DirectRectGridInterpolator:
+
+    # scalar equivalent of RegularGridInterpolator for (ct, turbulence, distance)
+    # look-ups, avoids the per call input checking and array allocation by
+    # precomputing the axes and strides and reading the corner values directly
+
+    def __init__(self, cts, turbulences, distances, deficits, method="linear"):
+
+        if method not in ("linear", "nearest"):
+            raise Exception(f"Unknown interpolation method: {method}")
+
+        self.axes = (GridAxis(cts), GridAxis(turbulences), GridAxis(distances))
+
+        self.deficits = deficits
+        self.values = np.asarray(deficits).reshape(-1)
+
+        self.stride_ct = len(turbulences) * len(distances)
+        self.stride_turbulence = len(distances)
+
+        self.method = method
+
+        if method == "linear":
+            self.evaluate = self.evaluate_linear
+        else:
+            self.evaluate = self.evaluate_nearest
+
+    def __call__(self, point):
+
+        ct, turbulence, distance = point
+
+        if is_array(ct, turbulence, distance):
+            return self.evaluate_arrays(ct, turbulence, distance)
+
+        return self.evaluate(
+            self.axes[0].locate(ct),
+            self.axes[1].locate(turbulence),
+            self.axes[2].locate(distance))
+
+    def evaluate_linear(self, ct, turbulence, distance):
+
+        i, fi = ct
+        j, fj = turbulence
+        k, fk = distance
+
+        item = self.values.item
+        si = self.stride_ct
+        sj = self.stride_turbulence
+
+        base = i * si + j * sj + k
+
+        c00 = item(base) * (1.0 - fk) + item(base + 1) * fk
+        c01 = item(base + sj) * (1.0 - fk) + item(base + sj + 1) * fk
+        c10 = item(base + si) * (1.0 - fk) + item(base + si + 1) * fk
+        c11 = item(base + si + sj) * (1.0 - fk) + item(base + si + sj + 1) * fk
+
+        c0 = c00 * (1.0 - fj) + c01 * fj
+        c1 = c10 * (1.0 - fj) + c11 * fj
+
+        return c0 * (1.0 - fi) + c1 * fi
+
+    def evaluate_arrays(self, ct, turbulence, distance):
+
+        ct, turbulence, distance = np.broadcast_arrays(
+            np.asarray(ct, dtype=float),
+            np.asarray(turbulence, dtype=float),
+            np.asarray(distance, dtype=float))
+
+        i, fi = self.axes[0].locate_array(ct)
+        j, fj = self.axes[1].locate_array(turbulence)
+        k, fk = self.axes[2].locate_array(distance)
+
+        si = self.stride_ct
+        sj = self.stride_turbulence
+
+        if self.method == "nearest":
+            i = np.where(fi <= 0.5, i, i + 1)
+            j = np.where(fj <= 0.5, j, j + 1)
+            k = np.where(fk <= 0.5, k, k + 1)
+            return self.values[i * si + j * sj + k]
+
+        values = self.values
+        base = i * si + j * sj + k
+
+        c00 = values[base] * (1.0 - fk) + values[base + 1] * fk
+        c01 = values[base + sj] * (1.0 - fk) + values[base + sj + 1] * fk
+        c10 = values[base + si] * (1.0 - fk) + values[base + si + 1] * fk
+        c11 = values[base + si + sj] * (1.0 - fk) + values[base + si + sj + 1] * fk
+
+        c0 = c00 * (1.0 - fj) + c01 * fj
+        c1 = c10 * (1.0 - fj) + c11 * fj
+
+        return c0 * (1.0 - fi) + c1 * fi
+
+    def evaluate_nearest(self, ct, turbulence, distance):
+
+        # ties go to the lower point, as in RegularGridInterpolator
+
+        i = ct[0] if ct[1] <= 0.5 else ct[0] + 1
+        j = turbulence[0] if turbulence[1] <= 0.5 else turbulence[0] + 1
+        k = distance[0] if distance[1] <= 0.5 else distance[0] + 1
+
+        return self.values.item(i * self.stride_ct + j * self.stride_turbulence + k)
+
+
+def direct_rect_grid_linear(cts, turbulences, distances, deficits):
+
+    return DirectRectGridInterpolator(
+        cts,
+        turbulences,
+        distances,
+        deficits,
+        method="linear")
+
+
+def direct_rect_grid_nearest(cts, turbulences, distances, deficits):
+
+    return DirectRectGridInterpolator(
+        cts,
+        turbulences,
+        distances,
+        deficits,
+        method="nearest")
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import struct
+
+import numpy as np
+
+
+# single file look-up format (all values little endian):
+#
+#   magic           8 bytes    b"MINIWAKE"
+#   version         uint32
+#   header length   uint32
+#   header          json       axis lengths, build parameters, data offset and checksum
+#   padding                    so that the data starts on an ALIGNMENT byte boundary
+#   data            float64    thrust coefficients, turbulences, distances, deficits (C order)
+#
+# the data block is opened with np.memmap so nothing is read until it is used and
+# processes opening the same file share one copy through the page cache
+
+MAGIC = b"MINIWAKE"
+VERSION = 1
+ALIGNMENT = 64
+DTYPE = np.dtype('<f8')
+
+PREAMBLE = struct.Struct('<8sII')
+
+
+def calculate_checksum(arrays):
+
+    checksum = hashlib.sha256()
+
+    for values in arrays:
+        checksum.update(np.ascontiguousarray(values, dtype=DTYPE).tobytes())
+
+    return checksum.hexdigest()
+
+
+def save_look_up_file(
+        path,
+        cts,
+        turbulences,
+        distances,
+        deficits,
+        build_parameters=None):
+
+    arrays = [np.asarray(values, dtype=DTYPE) for values in (cts, turbulences, distances, deficits)]
+
+    expected_shape = (len(arrays[0]), len(arrays[1]), len(arrays[2]))
+
+    if arrays[3].shape != expected_shape:
+        raise Exception(f"Deficits shape {arrays[3].shape} does not match axes {expected_shape}")
+
+    header = {
+        "version": VERSION,
+        "dtype": DTYPE.str,
+        "axes": {
+            "thrust_coefficients": expected_shape[0],
+            "turbulences": expected_shape[1],
+            "distances": expected_shape[2]
+        },
+        "build_parameters": build_parameters if build_parameters is not None else {},
+        "checksum": {
+            "algorithm": "sha256",
+            "value": calculate_checksum(arrays)
+        }
+    }
+
+    # the offset is part of the header so iterate until its own length is stable
+    data_offset = 0
+
+    while True:
+        header["data_offset"] = data_offset
+        encoded_header = json.dumps(header, sort_keys=True).encode("utf-8")
+        required_offset = aligned(PREAMBLE.size + len(encoded_header))
+        if required_offset == data_offset:
+            break
+        data_offset = required_offset
+
+    with open(path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded_header)))
+        f.write(encoded_header)
+        f.write(b"\0" * (data_offset - PREAMBLE.size - len(encoded_header)))
+        for values in arrays:
+            f.write(np.ascontiguousarray(values).tobytes())
+
+
+def aligned(offset):
+    return ((offset + ALIGNMENT - 1) // ALIGNMENT) * ALIGNMENT
+
+
+def read_look_up_header(path):
+
+    with open(path, "rb") as f:
+
+        magic, version, header_length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+
+        if magic != MAGIC:
+            raise Exception(f"{path} is not a look-up file")
+
+        if version > VERSION:
+            raise Exception(f"Look-up file version {version} is newer than supported version {VERSION}")
+
+        return json.loads(f.read(header_length).decode("utf-8"))
+
+
+def is_look_up_file(path):
+
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except (IsADirectoryError, PermissionError, FileNotFoundError):
+        return False
+
+
+class LookUpFile:
+
+    def __init__(self, path):
+
+        self.path = path
+        self.header = read_look_up_header(path)
+
+        axes = self.header["axes"]
+
+        shape = (axes["thrust_coefficients"], axes["turbulences"], axes["distances"])
+        dtype = np.dtype(self.header["dtype"])
+
+        offset = self.header["data_offset"]
+
+        self.cts = self.map(offset, (shape[0],), dtype)
+        offset += self.cts.nbytes
+
+        self.turbulences = self.map(offset, (shape[1],), dtype)
+        offset += self.turbulences.nbytes
+
+        self.distances = self.map(offset, (shape[2],), dtype)
+        offset += self.distances.nbytes
+
+        self.deficits = self.map(offset, shape, dtype)
+
+    def map(self, offset, shape, dtype):
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+    @property
+    def build_parameters(self):
+        return self.header["build_parameters"]
+
+    def verify(self):
+
+        # reads the whole file, so only done on request
+
+        expected = self.header["checksum"]["value"]
+        actual = calculate_checksum([self.cts, self.turbulences, self.distances, self.deficits])
+
+        if actual != expected:
+            raise Exception(f"Look-up file {self.path} checksum does not match its header")
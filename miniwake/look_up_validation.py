@@ -0,0 +1,159 @@
+import json
+import time
+
+import numpy as np
+
+from .velocity_deficit import solve_velocity_deficit
+from .velocity_deficit import solve_velocity_deficits
+from .velocity_deficit import VelocityDeficitTrajectoryCache
+
+
+def sample_domain(
+        number_of_points,
+        max_thrust_coefficient=1.0,
+        max_turbulence=0.4,
+        max_distance=1000.0,
+        min_thrust_coefficient=0.1,
+        seed=0):
+
+    # random (ct, turbulence, distance) points covering the look-up domain,
+    # distances are log-uniform as the deficit changes most in the near wake
+    # and ct starts above zero because the model's initial deficit is not
+    # positive for very small ct at high turbulence
+
+    random = np.random.default_rng(seed)
+
+    cts = random.uniform(min_thrust_coefficient, max_thrust_coefficient, number_of_points)
+    turbulences = random.uniform(0.0, max_turbulence, number_of_points)
+    distances = np.exp(random.uniform(np.log(2.0), np.log(max_distance), number_of_points))
+
+    return cts, distances, turbulences
+
+
+def measure_rate(function, number_of_queries, minimum_time=0.2):
+
+    # queries per second, repeating the function until minimum_time has elapsed
+
+    repeats = 0
+    start = time.perf_counter()
+
+    while True:
+        function()
+        repeats += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= minimum_time:
+            break
+
+    return number_of_queries * repeats / elapsed
+
+
+def look_up_footprint(look_up):
+
+    # bytes held by the tabulated (or fitted) values of a look-up
+
+    if hasattr(look_up, "nbytes"):
+        return int(look_up.nbytes)
+
+    return int(sum(np.asarray(values).nbytes for values in (look_up.cts, look_up.turbulences, look_up.distances, look_up.deficits)))
+
+
+def validate_look_up(look_up, cts, distances, turbulences, reference, scalar_points=1000):
+
+    # errors of a look-up against reference deficits and its query rates,
+    # one query at a time and as a single batch
+
+    values = np.asarray(look_up(cts, distances, turbulences), dtype=float)
+
+    errors = values - reference
+
+    scalar_queries = [
+        (float(cts[i]), float(distances[i]), float(turbulences[i]))
+        for i in range(min(scalar_points, len(cts)))]
+
+    def scalar():
+        for ct, distance, turbulence in scalar_queries:
+            look_up(ct, distance, turbulence)
+
+    def batch():
+        look_up(cts, distances, turbulences)
+
+    return {
+        "max_error": float(np.max(np.abs(errors))),
+        "rms_error": float(np.sqrt(np.mean(errors * errors))),
+        "scalar_queries_per_second": measure_rate(scalar, len(scalar_queries)),
+        "batch_queries_per_second": measure_rate(batch, len(cts)),
+        "memory_bytes": look_up_footprint(look_up)
+    }
+
+
+def validate_ode(cts, distances, turbulences, scalar_points=100):
+
+    # query rates of solve_velocity_deficit starting from an empty trajectory
+    # cache (every query integrates) and from a warm one (every query interpolates)
+
+    queries = [
+        (float(cts[i]), float(distances[i]), float(turbulences[i]))
+        for i in range(min(scalar_points, len(cts)))]
+
+    cache = VelocityDeficitTrajectoryCache(maxsize=len(queries))
+
+    start = time.perf_counter()
+
+    for ct, distance, turbulence in queries:
+        solve_velocity_deficit(ct, distance, turbulence, trajectory_cache=cache)
+
+    cold = len(queries) / (time.perf_counter() - start)
+
+    def warm():
+        for ct, distance, turbulence in queries:
+            solve_velocity_deficit(ct, distance, turbulence, trajectory_cache=cache)
+
+    return {
+        "cold_queries_per_second": cold,
+        "warm_queries_per_second": measure_rate(warm, len(queries)),
+        "trajectory_cache_bytes": int(sum(
+            16 * len(trajectory.distances) for trajectory in cache.trajectories.values()))
+    }
+
+
+def validate_look_ups(
+        look_ups,
+        number_of_points=2000,
+        max_thrust_coefficient=1.0,
+        max_turbulence=0.4,
+        max_distance=1000.0,
+        seed=0):
+
+    # look_ups maps a name to a look-up (anything called as
+    # look_up(thrust_coefficient, normalized_distance_downwind, turbulence)),
+    # each is compared against the ODE solution at the same sample points
+
+    cts, distances, turbulences = sample_domain(
+        number_of_points,
+        max_thrust_coefficient=max_thrust_coefficient,
+        max_turbulence=max_turbulence,
+        max_distance=max_distance,
+        seed=seed)
+
+    reference = solve_velocity_deficits(cts, distances, turbulences)
+
+    return {
+        "sample": {
+            "number_of_points": number_of_points,
+            "max_thrust_coefficient": max_thrust_coefficient,
+            "max_turbulence": max_turbulence,
+            "max_distance": max_distance,
+            "seed": seed
+        },
+        "ode": validate_ode(cts, distances, turbulences),
+        "look_ups": {
+            name: validate_look_up(look_up, cts, distances, turbulences, reference)
+            for name, look_up in look_ups.items()
+        }
+    }
+
+
+def write_results(results, path):
+
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
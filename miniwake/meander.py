@@ -1,8 +1,13 @@
-import math
+import numpy as np
+
+from .arrays import is_array
+from .arrays import sqrt
 
 
 class MeanderResult:
 
+    __slots__ = ("width_meander", "amplitude_meander")
+
     def __init__(
             self,
             width_meander,
@@ -21,9 +26,16 @@ def calculate_meander_factor(
         normalized_wake_width,
         ambient_turbulence):
 
+    # inputs may be numpy arrays (broadcast together), giving an array
+
     sigth = calculate_standard_deviation_of_direction(ambient_turbulence)
-    sigth = max([0.0, sigth])
-    return 1.0 / math.sqrt(1.0 + 7.12 * (sigth * normalized_distance_downwind / normalized_wake_width) ** 2.0)
+
+    if is_array(sigth):
+        sigth = np.maximum(sigth, 0.0)
+    else:
+        sigth = max([0.0, sigth])
+
+    return 1.0 / sqrt(1.0 + 7.12 * (sigth * normalized_distance_downwind / normalized_wake_width) ** 2.0)
 
 
 def calculate_meander(
@@ -32,6 +44,8 @@ def calculate_meander(
         normalized_wake_width,
         ambient_turbulence):
 
+    # with array inputs a single MeanderResult holds arrays of factors
+
     meander_factor = calculate_meander_factor(
         normalized_distance_downwind,
         velocity_deficit,
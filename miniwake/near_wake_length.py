@@ -1,11 +1,23 @@
 import math
 
+import numpy as np
+
+from .arrays import is_array
+from .arrays import sqrt
+
+
+# every function takes either floats or numpy arrays (broadcast together),
+# arrays take the numpy branch of each calculation and give identical results
+
 
 def calculate_ambient_turbulence_wake_erosion_rate(turbulence):
 
     # Equate 19 (from p440)
     # An Experimental analysis of wind turbine wakes, P.E.J. Vermeulen, Wind Energy Systems August 26-29, 1980.
 
+    if is_array(turbulence):
+        return np.where(turbulence < 0.02, 5.0 * turbulence, 2.5 * turbulence + 0.05)
+
     if turbulence < 0.02:
         return 5.0 * turbulence
     else:
@@ -21,6 +33,13 @@ def calculate_flow_field_ratio(thrust_coefficient):
     # ref Equations 7 and 8 in Vermeulen 1980
     # m = Uinf / U2
 
+    if is_array(thrust_coefficient):
+        # the root is limited so that it stays real where it is not used
+        return np.where(
+            thrust_coefficient > 0.8888,
+            3.0,
+            1.0 / np.sqrt(1.0 - np.minimum(thrust_coefficient, 0.8888)))
+
     if thrust_coefficient > 0.8888:
         return 3.0
     else:
@@ -41,8 +60,8 @@ def calculate_n(flow_field_ratio):
     C = 0.134
     D = 0.124
 
-    c1 = math.sqrt(A + B * flow_field_ratio)
-    c2 = math.sqrt(C + D * flow_field_ratio)
+    c1 = sqrt(A + B * flow_field_ratio)
+    c2 = sqrt(C + D * flow_field_ratio)
 
     return c1 * (1.0 - c2) / ((1.0 - c1) * c2)
 
@@ -54,11 +73,11 @@ def calculate_radius_of_inviscid_expanded_rotor_disk(
     # ref Equation 9 in Vermeulen 1980
     radius = 0.5 * diameter
 
-    return radius * math.sqrt((flow_field_ratio + 1.0) / 2.0)
+    return radius * sqrt((flow_field_ratio + 1.0) / 2.0)
 
 
 def calculate_shear_generated_turbulence_wake_erosion_rate(flow_field_ratio):
-    return (1.0 - flow_field_ratio) * math.sqrt(1.49 + flow_field_ratio) / (9.76 * (1.0 + flow_field_ratio))
+    return (1.0 - flow_field_ratio) * sqrt(1.49 + flow_field_ratio) / (9.76 * (1.0 + flow_field_ratio))
 
 
 def calculate_tip_speed_ratio(
@@ -72,7 +91,7 @@ def calculate_total_wake_erosion_rate(
         shear_generated_turbulence_wake_erosion_rate,
         mechanical_turbulence_wake_erosion_rate):
 
-    return math.sqrt(ambient_turbulence_wake_erosion_rate ** 2.0 + shear_generated_turbulence_wake_erosion_rate ** 2.0 + mechanical_turbulence_wake_erosion_rate ** 2.0)
+    return sqrt(ambient_turbulence_wake_erosion_rate ** 2.0 + shear_generated_turbulence_wake_erosion_rate ** 2.0 + mechanical_turbulence_wake_erosion_rate ** 2.0)
 
 
 def calculate_radius(diameter):
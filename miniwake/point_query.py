@@ -0,0 +1,61 @@
+import numpy as np
+
+from .flow_field import FlowField
+
+
+class PointQuery:
+
+    # waked velocity and turbulence at points that are not turbines, e.g. met masts,
+    # lidar scan points or neighbouring site reference points
+    #
+    # x, y (site co-ordinates, as the turbines) and z (height) are broadcast together,
+    # for each flow case the points are rotated with the same transform as the
+    # turbines and all of them are evaluated in one batch against the wakes that
+    # can reach them (those whose control surface contains the point)
+
+    def __init__(self, x, y, z, tile_size=20000):
+
+        self.x, self.y, self.z = np.broadcast_arrays(
+            np.asarray(x, dtype=float),
+            np.asarray(y, dtype=float),
+            np.asarray(z, dtype=float))
+
+        self.tile_size = tile_size
+
+    @property
+    def shape(self):
+        return self.x.shape
+
+    def calculate(
+            self,
+            wind_farm_wake,
+            transform,
+            ambient_velocity=None,
+            ambient_turbulence=None):
+
+        # returns (waked_velocity, waked_turbulence) arrays of the points' shape,
+        # the ambient velocity and turbulence at the points default to those
+        # of the most upwind turbine
+
+        if ambient_velocity is None:
+            ambient_velocity = wind_farm_wake.turbine_wakes[0].ambient_velocity
+
+        if ambient_turbulence is None:
+            ambient_turbulence = wind_farm_wake.turbine_wakes[0].ambient_turbulence
+
+        x, y = transform(self.x, self.y)
+
+        flow_field = FlowField(
+            wind_farm_wake,
+            tile_size=self.tile_size,
+            apply_control_surface=True)
+
+        velocity_deficits, added_turbulences = flow_field.calculate(x, y, self.z)
+
+        waked_velocities = (1.0 - velocity_deficits) * ambient_velocity
+
+        waked_turbulences = np.sqrt(
+            added_turbulences * added_turbulences +
+            np.asarray(ambient_turbulence) * ambient_turbulence)
+
+        return waked_velocities, waked_turbulences
@@ -4,38 +4,52 @@ from .turbine import Turbine
 PI_OVER_180_DEGRESS = math.pi / 180.0
 
 
-def rotate_and_sort_turbines(direction, turbines):
+class WindDirectionTransform:
 
-    delr = PI_OVER_180_DEGRESS * (direction - 270)
+    # rotates site co-ordinates so that positive x is along the wind direction
+    # and shifts them so that the most upwind turbine is at the origin,
+    # x and y may be numpy arrays so that other points (e.g. met masts)
+    # can be put in the same frame as the rotated turbines
 
-    cd = math.cos(delr)
-    sd = math.sin(delr)
+    def __init__(self, direction, turbines):
 
-    rotated = []
+        delr = PI_OVER_180_DEGRESS * (direction - 270)
 
-    min_x = None
-    y_at_min_x = None
+        self.cd = math.cos(delr)
+        self.sd = math.sin(delr)
 
-    for turbine in turbines:
+        self.min_x = None
+        self.y_at_min_x = None
+
+        for turbine in turbines:
+
+            x, y = self.rotate(turbine.x, turbine.y)
+
+            if self.min_x is None or x < self.min_x:
+                self.min_x = x
+                self.y_at_min_x = y
+
+    def rotate(self, x, y):
+        return x * self.cd - y * self.sd, x * self.sd + y * self.cd
 
-        x = turbine.x * cd - turbine.y * sd
-        y = turbine.x * sd + turbine.y * cd
+    def __call__(self, x, y):
 
-        rotated.append(turbine.clone_at_new_location(x, y))
+        x, y = self.rotate(x, y)
 
-        if min_x is None or x < min_x:
-            min_x = x
-            y_at_min_x = y
+        return x - self.min_x, y - self.y_at_min_x
+
+
+def rotate_and_sort_turbines(direction, turbines):
+
+    transform = WindDirectionTransform(direction, turbines)
 
     shifted = []
 
-    for turbine in rotated:
+    for turbine in turbines:
+
+        x, y = transform(turbine.x, turbine.y)
 
-        shifted.append(
-            turbine.clone_at_new_location(
-                    x=turbine.x - min_x,
-                    y=turbine.y - y_at_min_x)
-                )
+        shifted.append(turbine.clone_at_new_location(x=x, y=y))
 
     shifted.sort(key=lambda t: t.x, reverse=False)
 
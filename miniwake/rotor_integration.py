@@ -1,5 +1,9 @@
 import math
 
+import numpy as np
+
+from .rotor_overlap import RotorOverlapTable
+
 
 class RotorCenterIntegrator:
 
@@ -68,3 +72,111 @@ class AddedTurbulenceIntegrator(VelocityDeficitIntegrator):
 
     def finalise(self, combined_value):
         return combined_value
+
+
+class VectorVelocityDeficitIntegrator(VelocityDeficitIntegrator):
+
+    # the same sections as VelocityDeficitIntegrator evaluated in one call,
+    # wake_integral is given arrays of offsets and returns arrays of values and
+    # impacting wakes (one per section), TurbineWake.velocity_deficit_at_offset
+    # then evaluates every upstream wake at every section in one vector operation
+
+    def __init__(self, number_of_sections=12):
+
+        super().__init__(number_of_sections)
+
+        self.lateral_array = np.array(self.laterals)
+        self.vertical_array = np.array(self.verticals)
+
+    def calculate(self,
+                  downwind_rotor_diameter,
+                  wake_integral):
+
+        values, impacting_wakes = wake_integral(
+            self.lateral_array * downwind_rotor_diameter,
+            self.vertical_array * downwind_rotor_diameter)
+
+        return self.reduce(values), int(np.max(impacting_wakes))
+
+    def reduce(self, values):
+        return float(np.sum(values)) * self.one_over_sections
+
+
+class VectorAddedTurbulenceIntegrator(VectorVelocityDeficitIntegrator):
+
+    def reduce(self, values):
+        return float(np.max(values))
+
+
+class GaussVelocityDeficitIntegrator:
+
+    # polar quadrature over the whole rotor disc, radial_points Gauss-Legendre radii
+    # (weighted by area) times angular_points equally spaced angles (which is the
+    # Gauss rule for a periodic integrand), evaluated in one call as for
+    # VectorVelocityDeficitIntegrator, offsets are fractions of the diameter
+
+    def __init__(self, radial_points=3, angular_points=8):
+
+        if radial_points < 1 or angular_points < 1:
+            raise Exception("At least one radial and one angular point are required")
+
+        self.radial_points = radial_points
+        self.angular_points = angular_points
+
+        nodes, radial_weights = np.polynomial.legendre.leggauss(radial_points)
+
+        radii = 0.25 * (nodes + 1.0)
+        radial_weights = radial_weights * radii
+
+        thetas = (np.arange(angular_points) + 0.5) * 2.0 * math.pi / angular_points
+
+        self.lateral_array = (radii[:, np.newaxis] * np.sin(thetas)).ravel()
+        self.vertical_array = (radii[:, np.newaxis] * np.cos(thetas)).ravel()
+
+        self.weights = np.repeat(radial_weights / (np.sum(radial_weights) * angular_points), angular_points)
+
+        self.number_of_points = len(self.weights)
+
+    def calculate(self,
+                  downwind_rotor_diameter,
+                  wake_integral):
+
+        values, impacting_wakes = wake_integral(
+            self.lateral_array * downwind_rotor_diameter,
+            self.vertical_array * downwind_rotor_diameter)
+
+        return self.reduce(values), int(np.max(impacting_wakes))
+
+    def reduce(self, values):
+        return float(np.sum(values * self.weights))
+
+
+class GaussAddedTurbulenceIntegrator(GaussVelocityDeficitIntegrator):
+
+    # maximum over the quadrature points, as AddedTurbulenceIntegrator
+
+    def reduce(self, values):
+        return float(np.max(values))
+
+
+class RotorOverlapIntegrator:
+
+    # averages each wake over the whole rotor and then combines the wakes, rather
+    # than combining the wakes at sections and averaging the sections, so each
+    # upstream wake costs one RotorOverlapTable look-up (velocity deficit) or one
+    # analytic overlap fraction (added turbulence), used for both like
+    # RotorCenterIntegrator, wake_integral must accept the rotor_overlap keyword
+    # (as TurbineWake.velocity_deficit_at_offset and added_turbulence_at_offset do)
+
+    def __init__(self, rotor_overlap=None):
+
+        if rotor_overlap is None:
+            rotor_overlap = RotorOverlapTable.build()
+
+        self.rotor_overlap = rotor_overlap
+
+    def calculate(self,
+                  downwind_rotor_diameter,
+                  wake_integral):
+
+        return wake_integral(0.0, 0.0, rotor_overlap=self.rotor_overlap)
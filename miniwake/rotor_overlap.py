@@ -0,0 +1,168 @@
+import math
+
+import numpy as np
+from scipy import special
+
+from .interpolation import GridAxis
+
+
+# rotor averages of the wake cross-section profiles, distances are normalised by
+# the wake width: the offset of the rotor centre from the wake centre and the rotor
+# diameter, the profiles are axisymmetric so the lateral and vertical offsets only
+# enter through the radial offset
+
+SHAPE_COEFFICIENT = 3.56
+
+
+def calculate_rotor_averaged_shape(normalised_offsets, normalised_diameters, points=48):
+
+    # mean of exp(-3.56 r^2) over the rotor disc, integrating across the disc
+    # analytically (error function) and along it by Gauss-Legendre quadrature with
+    # x = offset + radius sin(phi) so that the integrand is smooth, the shape cut off
+    # beyond twice the width (where it is below 0.0001%) is neglected
+
+    normalised_offsets, normalised_diameters = np.broadcast_arrays(
+        np.asarray(normalised_offsets, dtype=float),
+        np.asarray(normalised_diameters, dtype=float))
+
+    radii = 0.5 * normalised_diameters[..., np.newaxis]
+
+    nodes, weights = np.polynomial.legendre.leggauss(points)
+
+    phis = 0.5 * math.pi * nodes
+    cos_phis = np.cos(phis)
+
+    x = normalised_offsets[..., np.newaxis] + radii * np.sin(phis)
+    half_chords = radii * cos_phis
+
+    root_coefficient = math.sqrt(SHAPE_COEFFICIENT)
+
+    chord_integrals = math.sqrt(math.pi) / root_coefficient * special.erf(root_coefficient * half_chords)
+
+    integral = 0.5 * math.pi * np.sum(
+        weights * np.exp(-SHAPE_COEFFICIENT * x * x) * chord_integrals * radii * cos_phis,
+        axis=-1)
+
+    radii = radii[..., 0]
+
+    area = math.pi * radii * radii
+
+    # a rotor of no size sees the shape at its centre
+    centre = np.exp(-SHAPE_COEFFICIENT * normalised_offsets * normalised_offsets)
+
+    return np.where(area > 0.0, integral / np.where(area > 0.0, area, 1.0), centre)
+
+
+def calculate_top_hat_overlap(normalised_offsets, normalised_diameters):
+
+    # fraction of the rotor disc inside the wake width (the added turbulence
+    # top-hat), from the area of intersection of two circles
+
+    normalised_offsets, normalised_diameters = np.broadcast_arrays(
+        np.asarray(normalised_offsets, dtype=float),
+        np.asarray(normalised_diameters, dtype=float))
+
+    d = normalised_offsets
+    r = 0.5 * normalised_diameters
+
+    # on the edge of the width is outside, as for AddedTurbulenceWakeProfile
+    outside = d >= 1.0 + r
+    inside = ~outside & ((d < np.abs(1.0 - r)) | (d == 0.0))
+    partial = ~(inside | outside)
+
+    fractions = np.zeros(d.shape)
+
+    # wholly inside the top-hat, or the top-hat wholly inside the rotor
+    rotor_inside = inside & (r <= 1.0)
+    fractions[rotor_inside] = 1.0
+
+    top_hat_inside = inside & (r > 1.0)
+    fractions[top_hat_inside] = 1.0 / (r[top_hat_inside] * r[top_hat_inside])
+
+    d = d[partial]
+    r = r[partial]
+
+    area = (
+        r * r * np.arccos(np.clip((d * d + r * r - 1.0) / (2.0 * d * r), -1.0, 1.0)) +
+        np.arccos(np.clip((d * d + 1.0 - r * r) / (2.0 * d), -1.0, 1.0)) -
+        0.5 * np.sqrt(np.maximum((-d + r + 1.0) * (d + r - 1.0) * (d - r + 1.0) * (d + r + 1.0), 0.0)))
+
+    fractions[partial] = area / (math.pi * r * r)
+
+    return fractions
+
+
+class RotorOverlapTable:
+
+    # rotor averaged shape factor tabulated against (offset / width, diameter / width)
+    # and interpolated bilinearly, the top-hat overlap is analytic and so is not
+    # tabulated, points beyond the tabulated diameters are calculated directly and
+    # the shape factor is zero beyond offset = 2 + diameter / 2 (the cut off)
+
+    def __init__(self, normalised_offsets, normalised_diameters, shape_factors, points=48):
+
+        self.offset_axis = GridAxis(normalised_offsets)
+        self.diameter_axis = GridAxis(normalised_diameters)
+
+        self.shape_factors = np.asarray(shape_factors, dtype=float)
+        self.values = self.shape_factors.reshape(-1)
+        self.stride = len(normalised_diameters)
+
+        self.points = points
+
+    @classmethod
+    def build(cls, max_normalised_diameter=4.0, step=0.02, points=48):
+
+        normalised_diameters = np.linspace(0.0, max_normalised_diameter, int(round(max_normalised_diameter / step)) + 1)
+
+        max_normalised_offset = 2.0 + 0.5 * max_normalised_diameter
+
+        normalised_offsets = np.linspace(0.0, max_normalised_offset, int(round(max_normalised_offset / step)) + 1)
+
+        shape_factors = calculate_rotor_averaged_shape(
+            normalised_offsets[:, np.newaxis],
+            normalised_diameters[np.newaxis, :],
+            points=points)
+
+        return cls(normalised_offsets, normalised_diameters, shape_factors, points=points)
+
+    @property
+    def nbytes(self):
+        return self.shape_factors.nbytes
+
+    def shape_factor(self, normalised_offsets, normalised_diameters):
+
+        normalised_offsets, normalised_diameters = np.broadcast_arrays(
+            np.asarray(normalised_offsets, dtype=float),
+            np.asarray(normalised_diameters, dtype=float))
+
+        shape_factors = np.zeros(normalised_offsets.shape)
+
+        within = normalised_offsets < 2.0 + 0.5 * normalised_diameters
+
+        tabulated = within & (normalised_diameters <= self.diameter_axis.upper_bound)
+        direct = within & ~tabulated
+
+        if np.any(tabulated):
+
+            i, fi = self.offset_axis.locate_array(normalised_offsets[tabulated])
+            j, fj = self.diameter_axis.locate_array(normalised_diameters[tabulated])
+
+            values = self.values
+            base = i * self.stride + j
+
+            c0 = values[base] * (1.0 - fj) + values[base + 1] * fj
+            c1 = values[base + self.stride] * (1.0 - fj) + values[base + self.stride + 1] * fj
+
+            shape_factors[tabulated] = c0 * (1.0 - fi) + c1 * fi
+
+        if np.any(direct):
+            shape_factors[direct] = calculate_rotor_averaged_shape(
+                normalised_offsets[direct],
+                normalised_diameters[direct],
+                points=self.points)
+
+        return shape_factors
+
+    def top_hat_overlap(self, normalised_offsets, normalised_diameters):
+        return calculate_top_hat_overlap(normalised_offsets, normalised_diameters)
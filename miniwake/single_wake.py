@@ -1,18 +1,34 @@
 import numpy as np
 
-from .velocity_deficit import is_look_up_set
 from .velocity_deficit import calculate_shape_at_position_sq
 from .velocity_deficit import calculate_width
-from .velocity_deficit import calculate_velocity_deficit
+from .deficit_engine import default_deficit_engine
+from .cache import LRUCache
 from .added_turbulence import quarton_added_turbulence
 from .meander import calculate_meander
 from .near_wake_length import calculate_near_wake_length
 from .distance import distance
 from .distance import distance_sq
+from .arrays import is_array
+
+
+def zeros_at(lateral_distance, vertical_distance):
+
+    # zero for a single point or an array of zeros for arrays of points
+
+    if is_array(lateral_distance, vertical_distance):
+        return np.zeros(np.broadcast(lateral_distance, vertical_distance).shape)
+
+    return 0.0
 
 
 class NoWakeCrossSection:
 
+    # a cross-section (and its profiles) is created for every upstream/downstream
+    # pair so these classes use __slots__ to keep the objects small
+
+    __slots__ = ("distance_downwind", "upwind_diameter", "normalised_distance_downwind")
+
     def __init__(self, distance_downwind, upwind_diameter):
         self.distance_downwind = distance_downwind
         self.upwind_diameter = upwind_diameter
@@ -21,16 +37,24 @@ class NoWakeCrossSection:
     def velocity_deficit(self,
                          lateral_distance,
                          vertical_distance):
-        return 0.0
+        return zeros_at(lateral_distance, vertical_distance)
 
     def added_turbulence(self,
                          lateral_distance,
                          vertical_distance):
-        return 0.0
+        return zeros_at(lateral_distance, vertical_distance)
 
 
 class WakeCrossSection:
 
+    __slots__ = (
+        "distance_downwind",
+        "upwind_diameter",
+        "normalised_distance_downwind",
+        "velocity_deficit",
+        "added_turbulence",
+        "width")
+
     def __init__(
             self,
             distance_downwind,
@@ -54,8 +78,76 @@ class WakeCrossSection:
         self.width = wake_width
 
 
+class WakeCrossSections:
+
+    # cross-sections of one wake at many distances downwind held as arrays,
+    # where there is no wake (in_wake is False) the velocity deficit, added
+    # turbulence and width are zero
+
+    def __init__(
+            self,
+            distances_downwind,
+            velocity_deficits,
+            added_turbulences,
+            wake_widths,
+            upwind_diameter):
+
+        self.distances_downwind = distances_downwind
+        self.upwind_diameter = upwind_diameter
+        self.normalised_distances_downwind = distances_downwind / upwind_diameter
+
+        self.velocity_deficits = velocity_deficits
+        self.added_turbulences = added_turbulences
+        self.widths = wake_widths
+
+        self.in_wake = wake_widths > 0.0
+
+    def __len__(self):
+        return len(self.distances_downwind)
+
+    def __getitem__(self, index):
+
+        # the cross-section object SingleWake.calculate returns for the distance
+
+        if not self.in_wake[index]:
+            return NoWakeCrossSection(float(self.distances_downwind[index]), self.upwind_diameter)
+
+        return WakeCrossSection(
+            float(self.distances_downwind[index]),
+            float(self.velocity_deficits[index]),
+            float(self.added_turbulences[index]),
+            float(self.widths[index]),
+            self.upwind_diameter)
+
+    def velocity_deficit(self, lateral_distance, vertical_distance=0.0):
+
+        # deficit of each cross-section at its own point, lateral and vertical
+        # distances are broadcast against the distances downwind
+
+        distance_from_wake_center_sq = distance_sq(lateral_distance, vertical_distance)
+
+        widths = np.where(self.in_wake, self.widths, 1.0)
+
+        return self.velocity_deficits * calculate_shape_at_position_sq(
+            np.asarray(distance_from_wake_center_sq / (widths * widths)))
+
+    def added_turbulence(self, lateral_distance, vertical_distance=0.0):
+
+        distance_from_wake_center_sq = distance_sq(lateral_distance, vertical_distance)
+
+        return np.where(
+            distance_from_wake_center_sq < self.widths * self.widths,
+            self.added_turbulences,
+            0.0)
+
+
 class AddedTurbulenceWakeProfile:
 
+    # lateral and vertical distances may be numpy arrays (broadcast together),
+    # in which case an array is returned
+
+    __slots__ = ("added_turbulence", "wake_width", "wake_width_sq")
+
     def __init__(self, added_turbulence, wake_width):
         self.added_turbulence = added_turbulence
         self.wake_width = wake_width
@@ -69,6 +161,9 @@ class AddedTurbulenceWakeProfile:
             lateral_distance,
             vertical_distance)
 
+        if is_array(lateral_distance, vertical_distance):
+            return np.where(distance_from_wake_center_sq < self.wake_width_sq, self.added_turbulence, 0.0)
+
         if distance_from_wake_center_sq < self.wake_width_sq:
             return self.added_turbulence
         else:
@@ -77,6 +172,11 @@ class AddedTurbulenceWakeProfile:
 
 class VelocityDeficitWakeProfile:
 
+    # lateral and vertical distances may be numpy arrays (broadcast together),
+    # in which case an array is returned
+
+    __slots__ = ("velocity_deficit", "wake_width", "one_over_wake_width", "one_over_wake_width_sq")
+
     def __init__(self, velocity_deficit, wake_width):
         self.velocity_deficit = velocity_deficit
         self.wake_width = wake_width
@@ -97,6 +197,11 @@ class VelocityDeficitWakeProfile:
 
 class SingleWake:
 
+    # with a cross_section_cache_size cross-sections are kept in a bounded (least
+    # recently used) cache keyed on distance downwind rounded to the nearest
+    # cross_section_quantum (metres) and are calculated at the rounded distance,
+    # so that turbines at the same separation (e.g. in a regular layout) share one
+
     NEAR_ZERO = 0.000001
 
     def __init__(
@@ -106,7 +211,10 @@ class SingleWake:
             upwind_velocity,
             upwind_local_turbulence_intensity,
             apply_meander=True,
-            apply_added_turbulence=True):
+            apply_added_turbulence=True,
+            deficit_engine=default_deficit_engine,
+            cross_section_cache_size=None,
+            cross_section_quantum=1e-6):
 
         if np.isnan(upwind_local_turbulence_intensity):
             raise Exception("Upwind local turbulence intensity is nan")
@@ -137,8 +245,32 @@ class SingleWake:
         self.apply_meander = apply_meander
         self.apply_added_turbulence = apply_added_turbulence
 
+        self.deficit_engine = deficit_engine
+
+        self.cross_section_quantum = cross_section_quantum
+
+        if cross_section_cache_size is None:
+            self.cross_section_cache = None
+        else:
+            self.cross_section_cache = LRUCache(cross_section_cache_size)
+
     def calculate(self, distance_downwind):
 
+        if self.cross_section_cache is None:
+            return self.calculate_uncached(distance_downwind)
+
+        key = round(distance_downwind / self.cross_section_quantum)
+
+        cross_section = self.cross_section_cache.get(key)
+
+        if cross_section is None:
+            cross_section = self.calculate_uncached(key * self.cross_section_quantum)
+            self.cross_section_cache.put(key, cross_section)
+
+        return cross_section
+
+    def calculate_uncached(self, distance_downwind):
+
         if distance_downwind <= 0.0 or \
                 self.is_negligible(self.upwind_thrust_coefficient) or \
                 self.is_negligible(self.upwind_turbine.diameter):
@@ -149,7 +281,7 @@ class SingleWake:
 
         normalized_distance_downwind = distance_downwind / self.upwind_turbine.diameter
 
-        velocity_deficit = calculate_velocity_deficit(
+        velocity_deficit = self.deficit_engine.calculate_velocity_deficit(
             self.upwind_thrust_coefficient,
             normalized_distance_downwind,
             self.upwind_local_turbulence_intensity)
@@ -189,6 +321,74 @@ class SingleWake:
             wake_width,
             self.upwind_turbine.diameter)
 
+    def calculate_many(self, distances_downwind):
+
+        # array equivalent of calculate, each sub-model is called once for all of
+        # the distances, the cross-section cache is not used
+
+        distances_downwind = np.asarray(distances_downwind, dtype=float)
+
+        velocity_deficits = np.zeros(distances_downwind.shape)
+        added_turbulences = np.zeros(distances_downwind.shape)
+        wake_widths = np.zeros(distances_downwind.shape)
+
+        if self.is_negligible(self.upwind_thrust_coefficient) or \
+                self.is_negligible(self.upwind_turbine.diameter):
+            return WakeCrossSections(
+                distances_downwind,
+                velocity_deficits,
+                added_turbulences,
+                wake_widths,
+                self.upwind_turbine.diameter)
+
+        downwind = np.flatnonzero(distances_downwind > 0.0)
+
+        normalized_distances_downwind = distances_downwind[downwind] / self.upwind_turbine.diameter
+
+        velocity_deficit = self.deficit_engine.calculate_velocity_deficits(
+            self.upwind_thrust_coefficient,
+            normalized_distances_downwind,
+            self.upwind_local_turbulence_intensity)
+
+        waked = ~self.is_negligible(velocity_deficit)
+
+        downwind = downwind[waked]
+        normalized_distances_downwind = normalized_distances_downwind[waked]
+        velocity_deficit = velocity_deficit[waked]
+
+        normalized_wake_width = calculate_width(
+                                    self.upwind_thrust_coefficient,
+                                    velocity_deficit)
+
+        wake_width = normalized_wake_width * self.upwind_turbine.diameter
+
+        if self.apply_meander:
+            meander = calculate_meander(
+                normalized_distances_downwind,
+                velocity_deficit,
+                normalized_wake_width,
+                self.ambient_turbulence_intensity)
+            velocity_deficit *= meander.amplitude_meander
+            wake_width *= meander.width_meander
+
+        if self.apply_added_turbulence:
+            added_turbulences[downwind] = quarton_added_turbulence(
+                distances_downwind[downwind],
+                self.upwind_thrust_coefficient,
+                self.upwind_turbine.diameter,
+                self.near_wake_length,
+                self.ambient_turbulence_intensity)
+
+        velocity_deficits[downwind] = velocity_deficit
+        wake_widths[downwind] = wake_width
+
+        return WakeCrossSections(
+            distances_downwind,
+            velocity_deficits,
+            added_turbulences,
+            wake_widths,
+            self.upwind_turbine.diameter)
+
     def is_negligible(self, value):
         return value < SingleWake.NEAR_ZERO
 
@@ -6,15 +6,49 @@ from .rotor_integration import AddedTurbulenceIntegrator
 
 from .single_wake import SingleWake
 from .single_wake import NoWakeCrossSection
+from .single_wake import WakeCrossSection
+from .arrays import is_array
 
 from .combination import WeightedAverageRSSLinearVelocityDeficitCombiner
 from .combination import AddedTurbulenceCombiner
+from .combination import NumberOfImpactiveWakesCalculator
 
+from .velocity_deficit import calculate_shape_at_position_sq
+
+from .distance import distance
 from .distance import distance_sq
 
+from .deficit_engine import default_deficit_engine
+from .interacting_wakes import InteractingWakes
+
+
+def calculate_normalised_control_surface(normalised_downwind_separation, turbulence):
+
+    # lateral extent (in upwind diameters) beyond which a wake is taken to have
+    # no effect, normalised_downwind_separation may be a numpy array
+
+    a = -0.0232381 * turbulence * turbulence + 0.0001743 * turbulence
+    b = 1.84646 * turbulence + 0.00400
+    c = 2.0
+
+    normalised_downwind_separation_sq = normalised_downwind_separation * normalised_downwind_separation
+
+    return a * normalised_downwind_separation_sq + b * normalised_downwind_separation + c
+
 
 class WakeAtRotorCenter:
 
+    # one per upstream/downstream pair, __slots__ keeps the objects small
+
+    __slots__ = (
+        "x",
+        "lateral_distance",
+        "vertical_distance",
+        "upwind_diameter",
+        "one_over_upwind_diameter",
+        "normalised_distance_downwind",
+        "cross_section")
+
     def __init__(
             self,
             x,
@@ -65,7 +99,11 @@ class TurbineWake:
             velocity_deficit_combiner=WeightedAverageRSSLinearVelocityDeficitCombiner,
             added_turbulence_integrator=AddedTurbulenceIntegrator(),
             apply_meander=True,
-            apply_added_turbulence=True):
+            apply_added_turbulence=True,
+            deficit_engine=default_deficit_engine,
+            cross_section_cache_size=None,
+            cross_section_quantum=1e-6,
+            influence_envelope=None):
 
         self.set_ambient_conditions(ambient_velocity, ambient_turbulence)
 
@@ -84,7 +122,23 @@ class TurbineWake:
         self.apply_meander = apply_meander
         self.apply_added_turbulence = apply_added_turbulence
 
-        self.wakes = []
+        self.deficit_engine = deficit_engine
+
+        self.cross_section_cache_size = cross_section_cache_size
+        self.cross_section_quantum = cross_section_quantum
+
+        # optional InfluenceEnvelope used in place of the rule of thumb control
+        # surface where it is tabulated
+        if influence_envelope is not None and not influence_envelope.covers(apply_meander):
+            raise Exception("Influence envelope built without meander cannot prune meandering wakes")
+
+        self.influence_envelope = influence_envelope
+
+        # only the upwind wakes reaching the rotor are stored, the others are
+        # counted (and the last position kept for the ordering check)
+        self.number_of_added_wakes = 0
+        self.last_added_x = None
+        self.interacting_wakes = InteractingWakes()
 
         self._calculated = False
         self._waked_velocity = None
@@ -115,9 +169,9 @@ class TurbineWake:
                 "hasn't been calculated yet. "
                 "Call calculate() method first.")
 
-        if len(self.wakes) > 0:
-            if turbine_wake.x < self.wakes[-1].x:
-                raise Exception(f'Added wake (x={turbine_wake.x}) is not downwind of previous (x={self.wakes[-1].x})')
+        if self.last_added_x is not None:
+            if turbine_wake.x < self.last_added_x:
+                raise Exception(f'Added wake (x={turbine_wake.x}) is not downwind of previous (x={self.last_added_x})')
 
         downwind_separation = self.x - turbine_wake.x
 
@@ -139,26 +193,45 @@ class TurbineWake:
         cross_section = self.calculate_cross_section_if_in_wake(
             downwind_separation,
             rd_sq,
-            turbine_wake)
+            turbine_wake,
+            lateral_separation,
+            vertical_separation)
 
-        self.wakes.append(
-            WakeAtRotorCenter(
-                turbine_wake.x,
+        self.number_of_added_wakes += 1
+        self.last_added_x = turbine_wake.x
+
+        if isinstance(cross_section, WakeCrossSection):
+            self.interacting_wakes.append(
+                turbine_wake,
                 cross_section,
                 lateral_separation,
-                vertical_separation))
+                vertical_separation)
 
     def calculate_cross_section_if_in_wake(
             self,
             downwind_separation,
             rd_sq,
-            turbine_wake):
+            turbine_wake,
+            lateral_separation=None,
+            vertical_separation=None):
+
+        in_wake = None
 
-        if self.rule_of_thumb_control_surface(
+        if self.influence_envelope is not None and lateral_separation is not None:
+            in_wake = self.in_influence_envelope(
+                downwind_separation,
+                lateral_separation,
+                vertical_separation,
+                turbine_wake)
+
+        if in_wake is None:
+            in_wake = self.rule_of_thumb_control_surface(
                 downwind_separation,
                 rd_sq,
                 turbine_wake.waked_turbulence,
-                turbine_wake.diameter):
+                turbine_wake.diameter)
+
+        if in_wake:
 
             return turbine_wake.calculate_cross_section(downwind_separation)
 
@@ -168,16 +241,33 @@ class TurbineWake:
                 downwind_separation,
                 turbine_wake.diameter)
 
-    def rule_of_thumb_control_surface(self, downwind_separation, rd_sq, turbulence, diameter):
+    def in_influence_envelope(
+            self,
+            downwind_separation,
+            lateral_separation,
+            vertical_separation,
+            turbine_wake):
+
+        # whether any of this rotor is within the wake's influence radius,
+        # None where the envelope is not tabulated
+
+        radius = self.influence_envelope.radius(
+            downwind_separation / turbine_wake.diameter,
+            turbine_wake.wake_thrust_coefficient,
+            turbine_wake.waked_turbulence)
 
-        a = -0.0232381 * turbulence * turbulence + 0.0001743 * turbulence
-        b = 1.84646 * turbulence + 0.00400
-        c = 2.0
+        if radius is None:
+            return None
 
-        normalised_downwind_separation = downwind_separation / diameter
-        normalised_downwind_separation_sq = normalised_downwind_separation * normalised_downwind_separation
+        closest_distance = distance(lateral_separation, vertical_separation) - 0.5 * self.diameter
 
-        normalised_control_surface = a * normalised_downwind_separation_sq + b * normalised_downwind_separation + c
+        return closest_distance < radius * turbine_wake.diameter
+
+    def rule_of_thumb_control_surface(self, downwind_separation, rd_sq, turbulence, diameter):
+
+        normalised_control_surface = calculate_normalised_control_surface(
+            downwind_separation / diameter,
+            turbulence)
         control_surface = max([0.0, normalised_control_surface * diameter])
 
         control_surface_sq = control_surface * control_surface
@@ -196,45 +286,221 @@ class TurbineWake:
         else:
             return False
 
-    def velocity_deficit_at_offset(self, lateral_offset, vertical_offset):
+    def velocity_deficit_at_offset(self, lateral_offset, vertical_offset, rotor_overlap=None):
+
+        # with a rotor_overlap (RotorOverlapTable) each wake is averaged over this
+        # turbine's rotor centred at the offset before the wakes are combined
+
+        if rotor_overlap is not None:
+            return self.rotor_averaged_velocity_deficit(lateral_offset, vertical_offset, rotor_overlap)
+
+        if is_array(lateral_offset, vertical_offset):
+            return self.velocity_deficits_at_offsets(lateral_offset, vertical_offset)
 
         combined = self.velocity_deficit_combiner()
 
-        for wake in self.wakes:
-            velocity_deficit = wake.velocity_deficit(
-                lateral_offset,
-                vertical_offset)
+        _, lateral_distances, vertical_distances, one_over_upwind_diameters, normalised_distances_downwind, \
+            velocity_deficits, _, widths = self.interacting_wakes.rows()
+
+        for i in range(len(widths)):
+
+            # as WakeAtRotorCenter and VelocityDeficitWakeProfile
+
+            lateral_distance = lateral_distances[i] + lateral_offset
+
+            one_over_width = 1.0 / widths[i]
+
+            velocity_deficit = calculate_shape_at_position_sq(
+                distance_sq(lateral_distance, vertical_distances[i] + vertical_offset) *
+                (one_over_width * one_over_width)) * velocity_deficits[i]
 
             combined.add(
                 velocity_deficit,
-                wake.normalised_distance_downwind,
-                wake.normalised_lateral_distance(lateral_offset))
+                normalised_distances_downwind[i],
+                lateral_distance * one_over_upwind_diameters[i])
 
         return combined.combined_value(), combined.impacting_wakes()
 
-    def added_turbulence_at_offset(self, lateral_offset, vertical_offset):
+    def added_turbulence_at_offset(self, lateral_offset, vertical_offset, rotor_overlap=None):
+
+        if rotor_overlap is not None:
+            return self.rotor_averaged_added_turbulence(lateral_offset, vertical_offset, rotor_overlap)
+
+        if is_array(lateral_offset, vertical_offset):
+            return self.added_turbulences_at_offsets(lateral_offset, vertical_offset)
 
         combined = AddedTurbulenceCombiner()
 
-        for wake in self.wakes:
+        _, lateral_distances, vertical_distances, _, _, _, added_turbulences, widths = self.interacting_wakes.rows()
 
-            combined.add(
-                wake.added_turbulence(
-                    lateral_offset,
-                    vertical_offset)
-            )
+        for i in range(len(widths)):
+
+            # as AddedTurbulenceWakeProfile
+            if distance_sq(lateral_distances[i] + lateral_offset, vertical_distances[i] + vertical_offset) < \
+                    widths[i] * widths[i]:
+                combined.add(added_turbulences[i])
 
         return combined.combined_value(), 0
 
-    def recalculate(self, ambient_velocity, ambient_turbulence):
+    def interacting_wake_arrays(self):
+
+        # (wakes, 1) arrays of the interacting wakes, None if there are none
+
+        if len(self.interacting_wakes) < 1:
+            return None
+
+        return {
+            name: self.interacting_wakes.column(name)[:, np.newaxis]
+            for name in InteractingWakes.FIELDS[1:]}
+
+    def wakes_reaching_offsets(self, wakes, lateral_offsets, vertical_offsets, widths):
+
+        # drops the wakes that are more than widths wake widths from every offset
+        # (they contribute nothing) so that pairs outside the rotor exit early,
+        # None if no wake reaches
+
+        if wakes is None:
+            return None
+
+        offset_radius = math.sqrt(np.max(distance_sq(lateral_offsets, vertical_offsets)))
+
+        reach = widths * wakes["widths"][:, 0] + offset_radius
+
+        reaching = distance_sq(wakes["lateral_distances"][:, 0], wakes["vertical_distances"][:, 0]) <= reach * reach
+
+        if not np.any(reaching):
+            return None
+
+        return {name: values[reaching] for name, values in wakes.items()}
+
+    def velocity_deficits_at_offsets(self, lateral_offsets, vertical_offsets):
+
+        # velocity_deficit_at_offset for arrays of offsets, the (wakes, offsets)
+        # deficits are combined with the combiner's combine_arrays
+
+        lateral_offsets, vertical_offsets = np.broadcast_arrays(lateral_offsets, vertical_offsets)
+
+        # the shape is cut off beyond twice the width
+        wakes = self.wakes_reaching_offsets(
+            self.interacting_wake_arrays(),
+            lateral_offsets,
+            vertical_offsets,
+            2.0)
+
+        if wakes is None:
+            return np.zeros(lateral_offsets.shape), np.zeros(lateral_offsets.shape, dtype=int)
+
+        lateral_distances = wakes["lateral_distances"] + lateral_offsets.ravel()
+        vertical_distances = wakes["vertical_distances"] + vertical_offsets.ravel()
+
+        widths = wakes["widths"]
+
+        velocity_deficits = wakes["velocity_deficits"] * calculate_shape_at_position_sq(
+            distance_sq(lateral_distances, vertical_distances) / (widths * widths))
+
+        combined = self.velocity_deficit_combiner.combine_arrays(
+            velocity_deficits,
+            np.broadcast_to(wakes["normalised_distances_downwind"], velocity_deficits.shape),
+            lateral_distances * wakes["one_over_upwind_diameters"])
+
+        impacting_wakes = NumberOfImpactiveWakesCalculator().count_arrays(velocity_deficits)
+
+        return combined.reshape(lateral_offsets.shape), impacting_wakes.reshape(lateral_offsets.shape)
+
+    def added_turbulences_at_offsets(self, lateral_offsets, vertical_offsets):
+
+        lateral_offsets, vertical_offsets = np.broadcast_arrays(lateral_offsets, vertical_offsets)
+
+        impacting_wakes = np.zeros(lateral_offsets.shape, dtype=int)
+
+        # the top-hat ends at the width
+        wakes = self.wakes_reaching_offsets(
+            self.interacting_wake_arrays(),
+            lateral_offsets,
+            vertical_offsets,
+            1.0)
+
+        if wakes is None:
+            return np.zeros(lateral_offsets.shape), impacting_wakes
+
+        widths = wakes["widths"]
+
+        added_turbulences = np.where(
+            distance_sq(
+                wakes["lateral_distances"] + lateral_offsets.ravel(),
+                wakes["vertical_distances"] + vertical_offsets.ravel()) < widths * widths,
+            wakes["added_turbulences"],
+            0.0)
+
+        combined = AddedTurbulenceCombiner.combine_arrays(added_turbulences)
+
+        return combined.reshape(lateral_offsets.shape), impacting_wakes
+
+    def rotor_averaged_velocity_deficit(self, lateral_offset, vertical_offset, rotor_overlap):
+
+        wakes = self.interacting_wake_arrays()
+
+        if wakes is None:
+            return 0.0, 0
+
+        lateral_distances = wakes["lateral_distances"] + lateral_offset
+        vertical_distances = wakes["vertical_distances"] + vertical_offset
+
+        widths = wakes["widths"]
+
+        velocity_deficits = wakes["velocity_deficits"] * rotor_overlap.shape_factor(
+            np.sqrt(distance_sq(lateral_distances, vertical_distances)) / widths,
+            self.diameter / widths)
+
+        combined = self.velocity_deficit_combiner.combine_arrays(
+            velocity_deficits,
+            wakes["normalised_distances_downwind"],
+            lateral_distances * wakes["one_over_upwind_diameters"])
+
+        impacting_wakes = NumberOfImpactiveWakesCalculator().count_arrays(velocity_deficits)
+
+        return float(combined[0]), int(impacting_wakes[0])
+
+    def rotor_averaged_added_turbulence(self, lateral_offset, vertical_offset, rotor_overlap):
+
+        wakes = self.interacting_wake_arrays()
+
+        if wakes is None:
+            return 0.0, 0
+
+        widths = wakes["widths"]
+
+        added_turbulences = wakes["added_turbulences"] * rotor_overlap.top_hat_overlap(
+            np.sqrt(distance_sq(
+                wakes["lateral_distances"] + lateral_offset,
+                wakes["vertical_distances"] + vertical_offset)) / widths,
+            self.diameter / widths)
+
+        return float(AddedTurbulenceCombiner.combine_arrays(added_turbulences)[0]), 0
+
+    def reset(self, ambient_velocity, ambient_turbulence):
+
+        # removes the added wakes, ready for upwind wakes to be added again
+        # in new ambient conditions
 
         self._is_calculated = False
 
         self.set_ambient_conditions(ambient_velocity, ambient_turbulence)
 
-        for wake in self.wakes: #WakeAtRotorCenter
-            # need to update cross_section
-            wake.set_cross_Section()
+        self.number_of_added_wakes = 0
+        self.last_added_x = None
+        self.interacting_wakes = InteractingWakes()
+
+    def recalculate(self, ambient_velocity, ambient_turbulence, upwind_wakes):
+
+        # the upwind wakes may have changed, including those that did not reach
+        # the rotor before (which are not stored), so every upwind wake is given
+        # and tested again, WindFarmWake.recalculate does this for a whole farm
+
+        self.reset(ambient_velocity, ambient_turbulence)
+
+        for turbine_wake in upwind_wakes:
+            self.add_wake(turbine_wake)
 
         self.calculate()
 
@@ -260,7 +526,10 @@ class TurbineWake:
             upwind_velocity=self._waked_velocity,
             upwind_local_turbulence_intensity=self._waked_turbulence,
             apply_meander=self.apply_meander,
-            apply_added_turbulence=self.apply_added_turbulence)
+            apply_added_turbulence=self.apply_added_turbulence,
+            deficit_engine=self.deficit_engine,
+            cross_section_cache_size=self.cross_section_cache_size,
+            cross_section_quantum=self.cross_section_quantum)
 
         self._is_calculated = True
 
@@ -303,6 +572,33 @@ class TurbineWake:
 
         return self._impacting_wakes
 
+    @property
+    def wakes(self):
+
+        # a WakeAtRotorCenter for each interacting wake, created on request for
+        # inspection (the wakes are held in interacting_wakes)
+
+        return [
+            WakeAtRotorCenter(
+                turbine_wake.x,
+                WakeCrossSection(
+                    self.x - turbine_wake.x,
+                    velocity_deficit,
+                    added_turbulence,
+                    width,
+                    turbine_wake.diameter),
+                lateral_distance,
+                vertical_distance)
+            for turbine_wake, (_, lateral_distance, vertical_distance, _, _, velocity_deficit, added_turbulence, width)
+            in zip(self.interacting_wakes.turbine_wakes, zip(*self.interacting_wakes.rows()))]
+
+    @property
+    def wake_thrust_coefficient(self):
+
+        self.validate_has_been_calculated()
+
+        return self._next_wake.upwind_thrust_coefficient
+
     @property
     def near_wake_length(self):
 
@@ -310,8 +606,26 @@ class TurbineWake:
 
         return self._next_wake.near_wake_length
 
+    @property
+    def cross_section_cache(self):
+
+        # LRUCache (with hits and misses counters) of the cross-sections of this
+        # turbine's wake, None when caching is off
+
+        self.validate_has_been_calculated()
+
+        return self._next_wake.cross_section_cache
+
     def calculate_cross_section(self, distance_downwind):
 
         self.validate_has_been_calculated()
 
         return self._next_wake.calculate(distance_downwind)
+
+    def calculate_cross_sections(self, distances_downwind):
+
+        # WakeCrossSections at an array of distances downwind, see SingleWake.calculate_many
+
+        self.validate_has_been_calculated()
+
+        return self._next_wake.calculate_many(distances_downwind)
@@ -0,0 +1,200 @@
+import math
+
+import numpy as np
+
+from .turbine_wake import calculate_normalised_control_surface
+
+
+class UpwindWakeBin:
+
+    # the calculated wakes in one lateral bin, held in lists as they are added and
+    # converted to arrays when the bin is next queried
+
+    def __init__(self):
+
+        self.indices = []
+        self.x = []
+        self.y = []
+        self.hub_heights = []
+        self.diameters = []
+        self.thrust_coefficients = []
+        self.turbulences = []
+
+        self.min_y = math.inf
+        self.max_y = -math.inf
+        self.reach = 0.0
+
+        self.arrays = None
+
+    def add(self, index, turbine_wake, reach):
+
+        self.indices.append(index)
+        self.x.append(turbine_wake.x)
+        self.y.append(turbine_wake.y)
+        self.hub_heights.append(turbine_wake.hub_height)
+        self.diameters.append(turbine_wake.diameter)
+        self.thrust_coefficients.append(turbine_wake.wake_thrust_coefficient)
+        self.turbulences.append(turbine_wake.waked_turbulence)
+
+        self.min_y = min(self.min_y, turbine_wake.y)
+        self.max_y = max(self.max_y, turbine_wake.y)
+        self.reach = max(self.reach, reach)
+
+        self.arrays = None
+
+    def can_reach(self, y):
+        return self.min_y - self.reach <= y <= self.max_y + self.reach
+
+    def as_arrays(self):
+
+        if self.arrays is None:
+            self.arrays = tuple(np.array(values) for values in (
+                self.indices,
+                self.x,
+                self.y,
+                self.hub_heights,
+                self.diameters,
+                self.thrust_coefficients,
+                self.turbulences))
+
+        return self.arrays
+
+
+class UpwindWakeIndex:
+
+    # lateral bins over the calculated wakes (in rotated co-ordinates) so that a
+    # downwind turbine only visits the upwind wakes whose rule of thumb control
+    # surface (or influence envelope, where it is tabulated) can reach its rotor,
+    # rather than every upwind wake
+    #
+    # each wake's reach is bounded by its largest control surface (or envelope
+    # radius) up to max_x, bins that cannot reach the rotor are skipped and the
+    # wakes in the others are tested in one vector operation, with a small
+    # tolerance so that the candidates always include the wakes that pass
+    # TurbineWake.add_wake's own test (which is still applied), candidates are
+    # returned in the order they were added so add_wake's ordering checks hold
+
+    TOLERANCE = 1e-9
+
+    def __init__(self, max_x, max_diameter, bin_width=2000.0, influence_envelope=None):
+
+        if bin_width <= 0.0:
+            raise Exception("Bin width must be positive")
+
+        self.max_x = max_x
+        self.max_diameter = max_diameter
+        self.bin_width = bin_width
+        self.influence_envelope = influence_envelope
+
+        self.bins = {}
+
+    def add(self, index, turbine_wake):
+
+        key = math.floor(turbine_wake.y / self.bin_width)
+
+        if key not in self.bins:
+            self.bins[key] = UpwindWakeBin()
+
+        self.bins[key].add(index, turbine_wake, self.calculate_reach(turbine_wake))
+
+    def calculate_reach(self, turbine_wake):
+
+        # largest lateral distance at which the wake can reach a rotor downwind
+
+        diameter = turbine_wake.diameter
+        turbulence = turbine_wake.waked_turbulence
+
+        normalised_separations = [0.0, max(self.max_x - turbine_wake.x, 0.0) / diameter]
+
+        # the control surface is quadratic in separation
+        a = -0.0232381 * turbulence * turbulence + 0.0001743 * turbulence
+        b = 1.84646 * turbulence + 0.00400
+
+        if a < 0.0:
+            vertex = -b / (2.0 * a)
+            if normalised_separations[0] < vertex < normalised_separations[1]:
+                normalised_separations.append(vertex)
+
+        radius = max(
+            calculate_normalised_control_surface(normalised_separation, turbulence)
+            for normalised_separation in normalised_separations)
+
+        if self.influence_envelope is not None:
+
+            envelope_radius = self.influence_envelope.max_radius(
+                turbine_wake.wake_thrust_coefficient,
+                turbulence)
+
+            if envelope_radius is not None:
+                radius = max(radius, envelope_radius)
+
+        return max(radius, 0.0) * diameter + 0.5 * (diameter + self.max_diameter)
+
+    def candidates(self, turbine_wake):
+
+        # indices of the upwind wakes that may reach the rotor, in the order added
+
+        candidates = []
+
+        for wake_bin in self.bins.values():
+
+            if not wake_bin.can_reach(turbine_wake.y):
+                continue
+
+            indices, x, y, hub_heights, diameters, thrust_coefficients, turbulences = wake_bin.as_arrays()
+
+            in_wake = self.in_wake(
+                turbine_wake,
+                turbine_wake.x - x,
+                turbine_wake.y - y,
+                turbine_wake.hub_height - hub_heights,
+                diameters,
+                thrust_coefficients,
+                turbulences)
+
+            candidates.extend(indices[in_wake].tolist())
+
+        candidates.sort()
+
+        return candidates
+
+    def in_wake(
+            self,
+            turbine_wake,
+            downwind_separations,
+            lateral_separations,
+            vertical_separations,
+            diameters,
+            thrust_coefficients,
+            turbulences):
+
+        # as TurbineWake.calculate_cross_section_if_in_wake with a tolerance
+
+        dual_radii = 0.5 * (turbine_wake.diameter + diameters)
+
+        rd_sq = \
+            np.maximum(np.abs(lateral_separations) - dual_radii, 0.0) ** 2 + \
+            np.maximum(np.abs(vertical_separations) - dual_radii, 0.0) ** 2
+
+        control_surfaces = np.maximum(
+            calculate_normalised_control_surface(downwind_separations / diameters, turbulences) * diameters,
+            0.0)
+
+        in_wake = rd_sq < control_surfaces * control_surfaces * (1.0 + self.TOLERANCE) + self.TOLERANCE
+
+        if self.influence_envelope is None:
+            return in_wake
+
+        radii = self.influence_envelope.radii_at(
+            downwind_separations / diameters,
+            thrust_coefficients,
+            turbulences)
+
+        tabulated = ~np.isnan(radii)
+
+        closest_distances = np.sqrt(lateral_separations * lateral_separations + vertical_separations * vertical_separations) - \
+            0.5 * turbine_wake.diameter
+
+        in_envelope = closest_distances < np.where(tabulated, radii, 0.0) * diameters * (1.0 + self.TOLERANCE) + self.TOLERANCE
+
+        return np.where(tabulated, in_envelope, in_wake)
@@ -1,9 +1,10 @@
+import bisect
 import math
 import os
 import os.path
+import threading
 
 from scipy import integrate
-from math import sqrt
 from scipy import interpolate
 
 from numpy import isnan
@@ -13,15 +14,29 @@ from numpy import zeros
 
 import numpy as np
 
+from .cache import LRUCache
+from .arrays import is_array
+from .arrays import sqrt
+
 
 velocity_deficit_look_up = None
 
+SMALL_DEFICIT = 1e-12
+
 
 def is_look_up_set():
     return (velocity_deficit_look_up is not None)
 
 
 def calculate_shape_at_position_sq(normalized_position_sq):
+
+    if is_array(normalized_position_sq):
+        # exp is only evaluated within the cut-off
+        shape = np.zeros(normalized_position_sq.shape)
+        within = normalized_position_sq <= 4.0
+        shape[within] = np.exp(-3.56 * normalized_position_sq[within])
+        return shape
+
     if normalized_position_sq > 4.0:
         # shape factor is less than 0.0001% beyond 2.0
         return 0.0
@@ -35,7 +50,7 @@ def calculate_shape(normalized_position):
 
 def calculate_width(thrust_coefficient, velocity_deficit):
 
-    return math.sqrt(3.56 * thrust_coefficient / (8.0 * velocity_deficit * (1.0 - 0.5 * velocity_deficit)))
+    return sqrt(3.56 * thrust_coefficient / (8.0 * velocity_deficit * (1.0 - 0.5 * velocity_deficit)))
 
 
 class AndersonSimplifiedSolution:
@@ -185,7 +200,343 @@ class WakeDeficitIntegrator:
         return (self.normalised_distance_downstream < self.maximum_distance_downstream)
 
 
-def calculate_velocity_deficit(
+class BatchAndersonSimplifiedSolution(AndersonSimplifiedSolution):
+
+    # vectorised form of the simplified solution, the state is an array of
+    # center line velocities, one for each (thrust coefficient, turbulence) case
+
+    def __init__(
+            self,
+            free_stream_velocity,
+            thrust_coefficients,
+            ambient_turbulences):
+
+        thrust_coefficients, ambient_turbulences = np.broadcast_arrays(
+            np.asarray(thrust_coefficients, dtype=float),
+            np.asarray(ambient_turbulences, dtype=float))
+
+        super().__init__(
+            free_stream_velocity,
+            thrust_coefficients.ravel(),
+            ambient_turbulences.ravel())
+
+        # a case with no initial deficit (high turbulence at low thrust) has no
+        # wake, rather than failing the whole batch its velocity is held at the
+        # free stream velocity, as is a deficit too small to change the velocity
+        self.initial_centre_line_deficit = np.maximum(self.initial_centre_line_deficit, 0.0)
+        self.initial_center_line_velocity = self.center_line_velocity(self.initial_centre_line_deficit)
+
+        self.valid = self.initial_center_line_velocity < free_stream_velocity
+
+        self.initial_centre_line_deficit = np.where(self.valid, self.initial_centre_line_deficit, 0.0)
+
+    def F(self, normalized_downwind_distance):
+
+        # from Ainslie, 1988
+        return np.where(
+            normalized_downwind_distance >= 5.5,
+            1.0,
+            0.65 + np.cbrt((normalized_downwind_distance - 4.5) / 23.32))
+
+    def b(self, velocity_deficit):
+        return np.sqrt(3.56 * self.thrust_coefficient / (8.0 * velocity_deficit * (1.0 - 0.5 * velocity_deficit)))
+
+    def derivative_of_center_line_velocity_wrt_distance(
+            self,
+            normalised_distance_downwind,
+            center_line_velocity):
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            derivative = super().derivative_of_center_line_velocity_wrt_distance(
+                normalised_distance_downwind,
+                center_line_velocity)
+
+        return np.where(self.valid, derivative, 0.0)
+
+    def __call__(
+            self,
+            normalised_distance_downwind,
+            center_line_velocity):
+
+        return self.derivative_of_center_line_velocity_wrt_distance(normalised_distance_downwind, center_line_velocity)
+
+
+class AdaptiveAndersonSimplifiedSolution(BatchAndersonSimplifiedSolution):
+
+    # variant for error controlled solvers, trial steps can overshoot to a
+    # negative deficit so the shear term is written as K1 * (b * D), which
+    # tends to zero with the deficit, and is evaluated with the deficit clamped at zero
+
+    def shear_term(self, velocity_deficit):
+        clamped = np.maximum(velocity_deficit, 0.0)
+        return np.sqrt(3.56 * self.thrust_coefficient * clamped / (8.0 * (1.0 - 0.5 * clamped)))
+
+    def derivative_of_shear_term(self, velocity_deficit):
+        # d(b * D) / dD
+        clamped = np.maximum(velocity_deficit, SMALL_DEFICIT)
+        return 0.5 * self.shear_term(clamped) / (clamped * (1.0 - 0.5 * clamped))
+
+    def epsilon(
+            self,
+            normalised_distance_downwind,
+            center_line_velocity):
+
+        velocity_deficit = self.center_line_deficit(center_line_velocity)
+
+        shear_eddy_viscosity = AndersonSimplifiedSolution.K1 * self.shear_term(velocity_deficit)
+
+        return self.F(normalised_distance_downwind) * (shear_eddy_viscosity + self.ambient_eddy_visocity)
+
+    def jacobian(
+            self,
+            normalised_distance_downwind,
+            center_line_velocity):
+
+        # analytic d(dUc/dx) / dUc, cases are independent so the matrix is diagonal
+
+        uc = center_line_velocity / self.free_stream_velocity
+        velocity_deficit = 1.0 - uc
+
+        epsilon = self.epsilon(normalised_distance_downwind, center_line_velocity)
+
+        # dD / duc = -1
+        derivative_of_epsilon = -self.F(normalised_distance_downwind) \
+            * AndersonSimplifiedSolution.K1 \
+            * np.where(velocity_deficit > 0.0, self.derivative_of_shear_term(velocity_deficit), 0.0)
+
+        g = uc**3.0 - uc**2.0 - uc + 1.0
+        derivative_of_g = 3.0 * uc**2.0 - 2.0 * uc - 1.0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            derivative = 16.0 * (derivative_of_epsilon * g / uc + epsilon * (derivative_of_g * uc - g) / (uc * uc)) / self.thrust_coefficient
+
+        return np.diag(np.where(self.valid, derivative, 0.0))
+
+
+class AdaptiveVelocityDeficitTrajectory:
+
+    # one error controlled solve with dense output, giving the deficit at any
+    # distance up to the maximum, tolerances trade speed against accuracy
+
+    METHODS_USING_JACOBIAN = ('Radau', 'BDF', 'LSODA')
+    FILTER_BREAKS = (4.5, 5.5)
+
+    def __init__(
+            self,
+            thrust_coefficient,
+            turbulence,
+            maximum_distance_downstream=None,
+            method='RK45',
+            rtol=1e-6,
+            atol=1e-9):
+
+        if maximum_distance_downstream is None:
+            maximum_distance_downstream = WakeDeficitIntegrator.MAXIMUM_DISTANCE_DOWNSTREAM
+
+        self.free_stream_velocity = 10.0 #initial velocity, arbitary assumption as later normalised
+        self.maximum_distance_downstream = maximum_distance_downstream
+
+        self.f = AdaptiveAndersonSimplifiedSolution(
+            self.free_stream_velocity,
+            thrust_coefficient,
+            turbulence)
+
+        options = {}
+
+        if method in AdaptiveVelocityDeficitTrajectory.METHODS_USING_JACOBIAN:
+            options['jac'] = self.f.jacobian
+
+        # the filter function F has an infinite gradient at 4.5D and a kink at 5.5D
+        # which error estimates can step straight over, so solve each smooth piece separately
+        breaks = [self.f.initial_normalised_distance_downstream] \
+            + [x for x in AdaptiveVelocityDeficitTrajectory.FILTER_BREAKS if x < self.maximum_distance_downstream] \
+            + [self.maximum_distance_downstream]
+
+        y0 = self.f.initial_center_line_velocity
+
+        self.breaks = breaks
+        self.solutions = []
+
+        for start, end in zip(breaks[:-1], breaks[1:]):
+
+            solution = integrate.solve_ivp(
+                self.f,
+                t_span=(start, end),
+                y0=y0,
+                method=method,
+                dense_output=True,
+                rtol=rtol,
+                atol=atol * self.free_stream_velocity,
+                **options)
+
+            if not solution.success:
+                raise Exception(f"Velocity deficit solve failed: {solution.message}")
+
+            self.solutions.append(solution)
+            y0 = solution.y[:, -1]
+
+        self.initial_velocity_deficit = float(self.f.initial_centre_line_deficit[0])
+
+    @property
+    def number_of_steps(self):
+        return sum(len(solution.t) - 1 for solution in self.solutions)
+
+    def __call__(self, normalized_distance_downwind):
+
+        if normalized_distance_downwind <= self.f.initial_normalised_distance_downstream:
+            return self.initial_velocity_deficit
+        elif normalized_distance_downwind > self.maximum_distance_downstream:
+            return 0.0
+
+        piece = min(bisect.bisect_left(self.breaks, normalized_distance_downwind), len(self.solutions)) - 1
+
+        center_line_velocity = self.solutions[piece].sol(normalized_distance_downwind)[0]
+
+        return float(self.f.center_line_deficit(center_line_velocity))
+
+    def evaluate(self, normalized_distances_downwind):
+
+        # array equivalent of __call__
+
+        normalized_distances_downwind = np.asarray(normalized_distances_downwind, dtype=float)
+
+        values = np.full(normalized_distances_downwind.shape, self.initial_velocity_deficit)
+
+        pieces = np.searchsorted(self.breaks, normalized_distances_downwind, side='left') - 1
+
+        for piece, solution in enumerate(self.solutions):
+
+            selected = pieces == piece
+
+            if np.any(selected):
+                center_line_velocities = solution.sol(normalized_distances_downwind[selected])[0]
+                values[selected] = self.f.center_line_deficit(center_line_velocities)
+
+        values[normalized_distances_downwind > self.maximum_distance_downstream] = 0.0
+
+        return values
+
+
+class BatchWakeDeficitIntegrator:
+
+    # integrates many centre line trajectories together as one vector state,
+    # all cases share the same (normalised) distance steps
+
+    def __init__(
+            self,
+            thrust_coefficients,
+            turbulences,
+            maximum_distance_downstream=None,
+            first_step=0.1,
+            max_step=0.1):
+
+        if maximum_distance_downstream is None:
+            maximum_distance_downstream = WakeDeficitIntegrator.MAXIMUM_DISTANCE_DOWNSTREAM
+
+        self.free_stream_velocity = 10.0 #initial velocity, arbitary assumption as later normalised
+        self.maximum_distance_downstream = maximum_distance_downstream
+
+        self.f = BatchAndersonSimplifiedSolution(
+            self.free_stream_velocity,
+            thrust_coefficients,
+            turbulences)
+
+        self.integrator = integrate.RK45(
+            self.f,
+            t0=self.f.initial_normalised_distance_downstream,
+            y0=self.f.initial_center_line_velocity,
+            t_bound=self.maximum_distance_downstream,
+            first_step=first_step,
+            max_step=max_step)
+
+        self.normalised_distance_downstream = self.f.initial_normalised_distance_downstream
+        self.velocity_deficits = self.f.center_line_deficit(self.f.initial_center_line_velocity)
+
+    def step(self):
+        self.integrator.step()
+        self.normalised_distance_downstream = self.integrator.t
+        self.velocity_deficits = self.f.center_line_deficit(self.integrator.y)
+
+    def within_bound(self):
+        return (self.normalised_distance_downstream < self.maximum_distance_downstream)
+
+    def integrate(self, distances):
+
+        # returns velocity deficits at the requested (ascending) distances
+        # for every case, shape is (number of cases, number of distances)
+
+        distances = np.asarray(distances, dtype=float)
+
+        x = [0.0, self.normalised_distance_downstream]
+        y = [self.velocity_deficits, self.velocity_deficits]
+
+        while self.normalised_distance_downstream < distances[-1]:
+            self.step()
+            x.append(self.normalised_distance_downstream)
+            y.append(self.velocity_deficits)
+
+        return interpolate_trajectories(np.array(x), np.array(y), distances)
+
+
+def interpolate_trajectories(x, y, distances):
+
+    # linear interpolation of trajectories y (steps x cases) which all share
+    # the steps x, evaluated at distances (returned as cases x distances)
+
+    upper = np.searchsorted(x, distances, side='left')
+    upper = np.clip(upper, 1, len(x) - 1)
+    lower = upper - 1
+
+    weight = (distances - x[lower]) / (x[upper] - x[lower])
+
+    values = y[lower] + (y[upper] - y[lower]) * weight[:, np.newaxis]
+
+    return np.transpose(values)
+
+
+def solve_velocity_deficits(
+        thrust_coefficients,
+        normalized_distances_downwind,
+        turbulences):
+
+    # batched equivalent of solve_velocity_deficit, inputs are broadcast together
+    # and each distinct (thrust coefficient, turbulence) pair is integrated once
+    # as part of a single vector integration
+
+    thrust_coefficients, normalized_distances_downwind, turbulences = np.broadcast_arrays(
+        np.asarray(thrust_coefficients, dtype=float),
+        np.asarray(normalized_distances_downwind, dtype=float),
+        np.asarray(turbulences, dtype=float))
+
+    if np.any(normalized_distances_downwind > 11000.0):
+        raise Exception("Input normalised distance exceeds prescribed maximum 11000.0")
+
+    cases, case_index = np.unique(
+        np.stack([thrust_coefficients.ravel(), turbulences.ravel()], axis=1),
+        axis=0,
+        return_inverse=True)
+
+    case_index = case_index.ravel()
+    distances = np.maximum(normalized_distances_downwind.ravel(), 2.0)
+
+    sorted_distances = np.unique(distances)
+
+    integrator = BatchWakeDeficitIntegrator(
+        thrust_coefficients=cases[:, 0],
+        turbulences=cases[:, 1],
+        maximum_distance_downstream=11000.0)
+
+    trajectories = integrator.integrate(sorted_distances)
+
+    values = trajectories[case_index, np.searchsorted(sorted_distances, distances)]
+
+    if np.any(isnan(values)):
+        raise Exception("Deficit evalated as Nan")
+
+    return values.reshape(thrust_coefficients.shape)
+
+
+def clamp_velocity_deficit_inputs(
         thrust_coefficient,
         normalized_distance_downwind,
         turbulence):
@@ -194,32 +545,100 @@ def calculate_velocity_deficit(
         raise Exception("Negative wake thrust coefficient")
 
     if turbulence < 0.0:
-        raise Exception("Negative wake distance")
+        raise Exception("Negative wake turbulence")
 
     if normalized_distance_downwind < 0.0:
-        raise Exception("Negative wake turbulence")
-    
+        raise Exception("Negative wake distance")
+
     normalized_distance_downwind = max([2.0, normalized_distance_downwind])
 
     thrust_coefficient = min([1.0, thrust_coefficient])
 
-    if velocity_deficit_look_up is not None:
+    return thrust_coefficient, normalized_distance_downwind, turbulence
+
+
+def clamp_velocity_deficit_input_arrays(
+        thrust_coefficients,
+        normalized_distances_downwind,
+        turbulences):
+
+    # array equivalent of clamp_velocity_deficit_inputs, inputs are broadcast together
+
+    thrust_coefficients, normalized_distances_downwind, turbulences = np.broadcast_arrays(
+        np.asarray(thrust_coefficients, dtype=float),
+        np.asarray(normalized_distances_downwind, dtype=float),
+        np.asarray(turbulences, dtype=float))
 
-        if isnan(turbulence):
-            raise Exception("Cannot calculate velocity deficit for turbulence=nan")
+    if np.any(thrust_coefficients < 0.0):
+        raise Exception("Negative wake thrust coefficient")
+
+    if np.any(turbulences < 0.0):
+        raise Exception("Negative wake turbulence")
+
+    if np.any(normalized_distances_downwind < 0.0):
+        raise Exception("Negative wake distance")
+
+    normalized_distances_downwind = np.maximum(normalized_distances_downwind, 2.0)
 
-        # clamp turbulence at maximum of look up
-        if turbulence > velocity_deficit_look_up.max_turbulence:
-            turbulence = velocity_deficit_look_up.max_turbulence
+    thrust_coefficients = np.minimum(thrust_coefficients, 1.0)
 
-        # clamp thrust_coefficient to one
-        if thrust_coefficient > 1.0:
-            thrust_coefficient = 1.0
+    return thrust_coefficients, normalized_distances_downwind, turbulences
+
+
+def look_up_velocity_deficit(
+        look_up,
+        thrust_coefficient,
+        normalized_distance_downwind,
+        turbulence):
 
-        solution = velocity_deficit_look_up(
-                    thrust_coefficient=thrust_coefficient,
-                    normalized_distance_downwind=normalized_distance_downwind,
-                    turbulence=turbulence)
+    if isnan(turbulence):
+        raise Exception("Cannot calculate velocity deficit for turbulence=nan")
+
+    # clamp turbulence at maximum of look up
+    if turbulence > look_up.max_turbulence:
+        turbulence = look_up.max_turbulence
+
+    return look_up(
+        thrust_coefficient=thrust_coefficient,
+        normalized_distance_downwind=normalized_distance_downwind,
+        turbulence=turbulence)
+
+
+def look_up_velocity_deficits(
+        look_up,
+        thrust_coefficients,
+        normalized_distances_downwind,
+        turbulences):
+
+    if np.any(isnan(turbulences)):
+        raise Exception("Cannot calculate velocity deficit for turbulence=nan")
+
+    # clamp turbulence at maximum of look up
+    turbulences = np.minimum(turbulences, look_up.max_turbulence)
+
+    return look_up(
+        thrust_coefficient=thrust_coefficients,
+        normalized_distance_downwind=normalized_distances_downwind,
+        turbulence=turbulences)
+
+
+def calculate_velocity_deficit(
+        thrust_coefficient,
+        normalized_distance_downwind,
+        turbulence):
+
+    thrust_coefficient, normalized_distance_downwind, turbulence = clamp_velocity_deficit_inputs(
+        thrust_coefficient,
+        normalized_distance_downwind,
+        turbulence)
+
+    if velocity_deficit_look_up is not None:
+
+        solution = look_up_velocity_deficit(
+                    velocity_deficit_look_up,
+                    thrust_coefficient,
+                    normalized_distance_downwind,
+                    turbulence)
     else:
 
         solution = solve_velocity_deficit(
@@ -230,41 +649,360 @@ def calculate_velocity_deficit(
     return max([solution, 0])
 
 
+def calculate_velocity_deficits(
+        thrust_coefficients,
+        normalized_distances_downwind,
+        turbulences):
+
+    # array equivalent of calculate_velocity_deficit, inputs are broadcast together
+
+    thrust_coefficients, normalized_distances_downwind, turbulences = clamp_velocity_deficit_input_arrays(
+        thrust_coefficients,
+        normalized_distances_downwind,
+        turbulences)
+
+    if velocity_deficit_look_up is not None:
+
+        solution = look_up_velocity_deficits(
+                    velocity_deficit_look_up,
+                    thrust_coefficients,
+                    normalized_distances_downwind,
+                    turbulences)
+    else:
+
+        solution = solve_cached_velocity_deficits(
+                            thrust_coefficients,
+                            normalized_distances_downwind,
+                            turbulences)
+
+    return np.maximum(solution, 0.0)
+
+
+class VelocityDeficitTrajectory:
+
+    # integrated centre line trajectory for one (thrust coefficient, turbulence) pair,
+    # extended on demand when a farther distance is requested
+
+    def __init__(
+            self,
+            thrust_coefficient,
+            turbulence,
+            maximum_distance_downstream):
+
+        self.integrator = WakeDeficitIntegrator(
+            thrust_coefficient=thrust_coefficient,
+            turbulence=turbulence,
+            maximum_distance_downstream=maximum_distance_downstream)
+
+        self.distances = [self.integrator.normalised_distance_downstream]
+        self.velocity_deficits = [self.integrator.velocity_deficit]
+
+    def extend(self, normalized_distance_downwind):
+
+        # integrate until we step past target value
+        while self.distances[-1] < normalized_distance_downwind:
+            self.integrator.step()
+            self.distances.append(self.integrator.normalised_distance_downstream)
+            self.velocity_deficits.append(self.integrator.velocity_deficit)
+
+    def __call__(self, normalized_distance_downwind):
+
+        if normalized_distance_downwind <= self.distances[0]:
+            return self.velocity_deficits[0]
+        elif normalized_distance_downwind > self.integrator.maximum_distance_downstream:
+            return 0.0
+
+        self.extend(normalized_distance_downwind)
+
+        upper = bisect.bisect_left(self.distances, normalized_distance_downwind)
+        lower = upper - 1
+
+        x0 = self.distances[lower]
+        y0 = self.velocity_deficits[lower]
+
+        weight = (normalized_distance_downwind - x0) / (self.distances[upper] - x0)
+
+        return y0 + (self.velocity_deficits[upper] - y0) * weight
+
+    def evaluate(self, normalized_distances_downwind):
+
+        # array equivalent of __call__
+
+        normalized_distances_downwind = np.asarray(normalized_distances_downwind, dtype=float)
+
+        within = normalized_distances_downwind <= self.integrator.maximum_distance_downstream
+
+        if np.any(within):
+            self.extend(np.max(normalized_distances_downwind[within]))
+
+        values = np.interp(normalized_distances_downwind, self.distances, self.velocity_deficits)
+
+        return np.where(within, values, 0.0)
+
+
+class VelocityDeficitTrajectoryGroup:
+
+    # centre line trajectories for several (thrust coefficient, turbulence) pairs
+    # integrated together as one vector state, extended on demand for all of
+    # them at once, the deficits are held as a growing (cases, capacity) array
+
+    def __init__(
+            self,
+            thrust_coefficients,
+            turbulences,
+            maximum_distance_downstream,
+            capacity=64):
+
+        self.integrator = BatchWakeDeficitIntegrator(
+            thrust_coefficients=thrust_coefficients,
+            turbulences=turbulences,
+            maximum_distance_downstream=maximum_distance_downstream)
+
+        self.maximum_distance_downstream = maximum_distance_downstream
+
+        self.size = 1
+        self.distances = np.empty(capacity)
+        self.velocity_deficits = np.empty((len(self.integrator.velocity_deficits), capacity))
+
+        self.distances[0] = self.integrator.normalised_distance_downstream
+        self.velocity_deficits[:, 0] = self.integrator.velocity_deficits
+
+    @classmethod
+    def create_many(
+            cls,
+            thrust_coefficients,
+            turbulences,
+            maximum_distance_downstream):
+
+        # the trajectories are integrated together by one batched integration
+        group = cls(
+            thrust_coefficients=thrust_coefficients,
+            turbulences=turbulences,
+            maximum_distance_downstream=maximum_distance_downstream)
+
+        return [GroupedVelocityDeficitTrajectory(group, case) for case in range(len(thrust_coefficients))]
+
+    def extend(self, normalized_distance_downwind):
+
+        # integrate until we step past target value
+        while self.distances[self.size - 1] < normalized_distance_downwind:
+
+            self.integrator.step()
+
+            if self.size == len(self.distances):
+                self.distances = np.concatenate([self.distances, np.empty(self.size)])
+                self.velocity_deficits = np.concatenate([self.velocity_deficits, np.empty(self.velocity_deficits.shape)], axis=1)
+
+            self.distances[self.size] = self.integrator.normalised_distance_downstream
+            self.velocity_deficits[:, self.size] = self.integrator.velocity_deficits
+
+            self.size += 1
+
+    def evaluate(self, case, normalized_distances_downwind):
+
+        normalized_distances_downwind = np.asarray(normalized_distances_downwind, dtype=float)
+
+        within = normalized_distances_downwind <= self.maximum_distance_downstream
+
+        if np.any(within):
+            self.extend(np.max(normalized_distances_downwind[within]))
+
+        values = np.interp(
+            normalized_distances_downwind,
+            self.distances[:self.size],
+            self.velocity_deficits[case, :self.size])
+
+        return np.where(within, values, 0.0)
+
+
+class GroupedVelocityDeficitTrajectory:
+
+    # one case of a VelocityDeficitTrajectoryGroup, behaves as a VelocityDeficitTrajectory
+
+    def __init__(self, group, case):
+        self.group = group
+        self.case = case
+
+    @property
+    def distances(self):
+        return self.group.distances[:self.group.size]
+
+    def __call__(self, normalized_distance_downwind):
+        return float(self.group.evaluate(self.case, normalized_distance_downwind))
+
+    def evaluate(self, normalized_distances_downwind):
+        return self.group.evaluate(self.case, normalized_distances_downwind)
+
+
+class VelocityDeficitTrajectoryCache:
+
+    # bounded (least recently used) cache of centre line trajectories keyed on
+    # thrust coefficient and turbulence, each rounded to the nearest quantum,
+    # trajectories are extended in place so looking them up and evaluating them
+    # is done holding lock, trajectories missing together are created by
+    # group_type in one integration (None creates each with trajectory_type)
+
+    def __init__(
+            self,
+            maxsize=128,
+            quantum=1e-6,
+            maximum_distance_downstream=11000.0,
+            trajectory_type=VelocityDeficitTrajectory,
+            group_type=VelocityDeficitTrajectoryGroup):
+
+        self.quantum = quantum
+        self.maximum_distance_downstream = maximum_distance_downstream
+        self.trajectory_type = trajectory_type
+        self.group_type = group_type
+        self.trajectories = LRUCache(maxsize)
+        self.lock = threading.RLock()
+
+    def trajectory(self, thrust_coefficient, turbulence):
+
+        key = (round(thrust_coefficient / self.quantum), round(turbulence / self.quantum))
+
+        trajectory = self.trajectories.get(key)
+
+        if trajectory is None:
+            trajectory = self.create(key)
+
+        return trajectory
+
+    def create(self, key):
+
+        trajectory = self.trajectory_type(
+            thrust_coefficient=key[0] * self.quantum,
+            turbulence=key[1] * self.quantum,
+            maximum_distance_downstream=self.maximum_distance_downstream)
+
+        self.trajectories.put(key, trajectory)
+
+        return trajectory
+
+    def trajectories_for(self, thrust_coefficients, turbulences):
+
+        # trajectories for each (thrust coefficient, turbulence) pair, any not
+        # already cached are created together (in one integration where there
+        # is a group type)
+
+        keys = [
+            (round(thrust_coefficient / self.quantum), round(turbulence / self.quantum))
+            for thrust_coefficient, turbulence in zip(thrust_coefficients, turbulences)]
+
+        found = {key: self.trajectories.get(key) for key in keys}
+
+        missing = [key for key, trajectory in found.items() if trajectory is None]
+
+        if len(missing) > 1 and self.group_type is not None:
+
+            created = self.group_type.create_many(
+                thrust_coefficients=[key[0] * self.quantum for key in missing],
+                turbulences=[key[1] * self.quantum for key in missing],
+                maximum_distance_downstream=self.maximum_distance_downstream)
+
+            for key, trajectory in zip(missing, created):
+                self.trajectories.put(key, trajectory)
+                found[key] = trajectory
+
+        else:
+
+            for key in missing:
+                found[key] = self.create(key)
+
+        return [found[key] for key in keys]
+
+    def clear(self):
+        self.trajectories.clear()
+
+
+# process wide trajectory cache used by solve_velocity_deficit and the module
+# functions when they are not given one, bounded so that it does not grow with
+# the number of distinct wakes solved, callers on several threads share it one at
+# a time through its lock (a thread can use its own OdeDeficitEngine instead),
+# None integrates each call's trajectories afresh
+velocity_deficit_trajectory_cache = VelocityDeficitTrajectoryCache(maxsize=256)
+
+
+def select_trajectory_cache(trajectory_cache, maxsize):
+
+    if trajectory_cache is not None:
+        return trajectory_cache
+
+    if velocity_deficit_trajectory_cache is not None:
+        return velocity_deficit_trajectory_cache
+
+    # a cache for this call only
+    return VelocityDeficitTrajectoryCache(maxsize=max(1, maxsize))
+
+
+def solve_cached_velocity_deficits(
+        thrust_coefficients,
+        normalized_distances_downwind,
+        turbulences,
+        trajectory_cache=None):
+
+    # array equivalent of solve_velocity_deficit, each distinct (thrust coefficient,
+    # turbulence) pair is taken from the trajectory cache and evaluated once for
+    # all of its distances, pairs not yet cached are integrated together
+
+    thrust_coefficients, normalized_distances_downwind, turbulences = np.broadcast_arrays(
+        np.asarray(thrust_coefficients, dtype=float),
+        np.asarray(normalized_distances_downwind, dtype=float),
+        np.asarray(turbulences, dtype=float))
+
+    cases, case_index = np.unique(
+        np.stack([thrust_coefficients.ravel(), turbulences.ravel()], axis=1),
+        axis=0,
+        return_inverse=True)
+
+    trajectory_cache = select_trajectory_cache(trajectory_cache, len(cases))
+
+    if np.any(normalized_distances_downwind > trajectory_cache.maximum_distance_downstream):
+        raise Exception(
+                "Input normalised distance exceeds "
+                f"prescribed maximum {trajectory_cache.maximum_distance_downstream}")
+
+    case_index = case_index.ravel()
+    distances = normalized_distances_downwind.ravel()
+
+    values = np.empty(distances.shape)
+
+    # points grouped by case, rather than a mask over every point for each case
+    order = np.argsort(case_index, kind='stable')
+    bounds = np.searchsorted(case_index[order], np.arange(len(cases) + 1))
+
+    with trajectory_cache.lock:
+
+        trajectories = trajectory_cache.trajectories_for(cases[:, 0], cases[:, 1])
+
+        for case, trajectory in enumerate(trajectories):
+
+            selected = order[bounds[case]:bounds[case + 1]]
+
+            values[selected] = trajectory.evaluate(distances[selected])
+
+    if np.any(isnan(values)):
+        raise Exception("Deficit evalated as Nan")
+
+    return values.reshape(thrust_coefficients.shape)
+
+
 def solve_velocity_deficit(
         thrust_coefficient,
         normalized_distance_downwind,
-        turbulence):
+        turbulence,
+        trajectory_cache=None):
 
-    MAXIMUM_DISTANCE_DOWNSTREAM = 11000.0
+    trajectory_cache = select_trajectory_cache(trajectory_cache, 1)
 
-    if normalized_distance_downwind > MAXIMUM_DISTANCE_DOWNSTREAM:
+    if normalized_distance_downwind > trajectory_cache.maximum_distance_downstream:
         raise Exception(
                 "Input normalised distance "
                 f"({normalized_distance_downwind}) "
-                f"exceeds prescribed maximum {MAXIMUM_DISTANCE_DOWNSTREAM}")
+                f"exceeds prescribed maximum {trajectory_cache.maximum_distance_downstream}")
 
-    integrator = WakeDeficitIntegrator(
-        thrust_coefficient=thrust_coefficient,
-        turbulence=turbulence,
-        maximum_distance_downstream=MAXIMUM_DISTANCE_DOWNSTREAM)
-
-    if normalized_distance_downwind <= integrator.normalised_distance_downstream:
-        return integrator.velocity_deficit
-    elif normalized_distance_downwind > integrator.maximum_distance_downstream:
-        return 0.0
-            
-    x = [None, integrator.normalised_distance_downstream]
-    y = [None, integrator.velocity_deficit]
-
-    # integrate until we step past target value
-    while integrator.normalised_distance_downstream < normalized_distance_downwind:
-        x = [x[1], None]
-        y = [y[1], None]
-        integrator.step()
-        x[1] = integrator.normalised_distance_downstream
-        y[1] = integrator.velocity_deficit
-
-    value = interpolate.interp1d(x, y, kind='linear')(normalized_distance_downwind)
+    with trajectory_cache.lock:
+        value = trajectory_cache.trajectory(thrust_coefficient, turbulence)(normalized_distance_downwind)
 
     if isnan(value):
         raise Exception("Deficit evalated as Nan") 
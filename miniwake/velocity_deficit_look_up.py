@@ -1,13 +1,82 @@
+import math
 import os.path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
 
 import numpy as np
 from scipy.interpolate import interp1d
 
 from .interpolation import rect_grid_linear
+from .look_up_file import LookUpFile
+from .look_up_file import is_look_up_file
+from .look_up_file import save_look_up_file
 from .velocity_deficit import WakeDeficitIntegrator
+from .velocity_deficit import BatchWakeDeficitIntegrator
 from .velocity_deficit import calculate_velocity_deficit
 
 
+def print_progress(completed, total, ct, turbulence):
+    print(f"CT={ct:.2f} TI={(turbulence)*100.0:.2f}% ({completed}/{total})")
+
+
+def calculate_deficits(distances, ct, turbulence):
+
+    if ct <= 0.0:
+        return np.zeros(distances.shape)
+
+    integrator = WakeDeficitIntegrator(
+        thrust_coefficient=ct,
+        turbulence=turbulence,
+        maximum_distance_downstream=distances[-1])
+
+    x = [0, integrator.normalised_distance_downstream]
+    y = [integrator.velocity_deficit, integrator.velocity_deficit]
+
+    while integrator.normalised_distance_downstream < distances[-1]:
+        integrator.step()
+        x.append(integrator.normalised_distance_downstream)
+        y.append(integrator.velocity_deficit)
+
+    values = interp1d(x, y, kind='linear')(distances)
+
+    return values
+
+
+def select_distances(distances, deficits, tolerance):
+
+    # returns the (sorted) indices of the subset of distances for which linear
+    # interpolation between them reproduces the deficits at every other distance
+    # to within tolerance, for every (ct, turbulence) cell
+
+    values = deficits.reshape(-1, len(distances))
+
+    kept = {0, len(distances) - 1}
+    intervals = [(0, len(distances) - 1)]
+
+    while len(intervals) > 0:
+
+        lower, upper = intervals.pop()
+
+        if upper - lower < 2:
+            continue
+
+        weight = (distances[lower:upper + 1] - distances[lower]) / (distances[upper] - distances[lower])
+
+        interpolated = values[:, lower:lower + 1] + (values[:, upper:upper + 1] - values[:, lower:lower + 1]) * weight
+
+        error = np.max(np.abs(interpolated - values[:, lower:upper + 1]), axis=0)
+
+        worst = int(np.argmax(error))
+
+        if error[worst] > tolerance:
+            split = lower + worst
+            kept.add(split)
+            intervals.append((lower, split))
+            intervals.append((split, upper))
+
+    return np.array(sorted(kept))
+
+
 class VelocityDeficitLookUpBuilder:
 
     def __init__(
@@ -18,15 +87,56 @@ class VelocityDeficitLookUpBuilder:
             max_dist_downwind,
             max_turbulence_intensity,
             max_thrust_coefficient,
-            print_messages=False):
+            print_messages=False,
+            batch=False,
+            workers=None,
+            progress=None,
+            checkpoint_folder=None,
+            extend_from=None,
+            distance_grid="uniform",
+            distance_tolerance=1e-4):
+
+        # distance_grid is one of
+        #   "uniform"  - dist_downwind_step apart
+        #   "log"      - geometrically spaced from 2D, dist_downwind_step apart at 2D
+        #   "adaptive" - calculated on the uniform grid then only keeping the distances
+        #                needed for linear interpolation to be within distance_tolerance
+
+        # progress, if given, is called as progress(completed, total, ct, turbulence)
+        # after each (ct, turbulence) cell is calculated
+
+        # with a checkpoint_folder each completed cell is written to disk as it
+        # finishes and cells already in the folder are not recalculated, which
+        # allows an interrupted build to resume or a grid to be widened,
+        # extend_from is the folder of a saved look-up whose cells are reused
+
+        # batch integrates every cell together in this process, so it cannot be
+        # combined with workers or with a checkpoint_folder (no cell finishes
+        # before the others)
+
+        if batch and workers is not None and workers > 1:
+            raise ValueError("batch and workers cannot be combined")
+
+        if batch and checkpoint_folder is not None:
+            raise ValueError("batch and checkpoint_folder cannot be combined")
 
         if print_messages:
             print("Building Look-up")
 
-        self.distances = self.steps(
-            0,
-            max_dist_downwind,
-            dist_downwind_step)
+            if progress is None:
+                progress = print_progress
+
+        if distance_grid == "log":
+            self.distances = self.log_steps(
+                max_dist_downwind,
+                dist_downwind_step)
+        elif distance_grid in ("uniform", "adaptive"):
+            self.distances = self.steps(
+                0,
+                max_dist_downwind,
+                dist_downwind_step)
+        else:
+            raise Exception(f"Unknown distance grid: {distance_grid}")
 
         self.cts = self.steps(
             0,
@@ -38,28 +148,181 @@ class VelocityDeficitLookUpBuilder:
             max_turbulence_intensity,
             turbulence_intensity_step)
 
-        values = []
+        self.build_parameters = {
+            "dist_downwind_step": dist_downwind_step,
+            "thrust_coefficient_step": thrust_coefficient_step,
+            "turbulence_intensity_step": turbulence_intensity_step,
+            "max_dist_downwind": max_dist_downwind,
+            "max_turbulence_intensity": max_turbulence_intensity,
+            "max_thrust_coefficient": max_thrust_coefficient
+        }
+
+        self.checkpoint_folder = checkpoint_folder
+
+        if checkpoint_folder is not None:
+            self.prepare_checkpoint_folder(checkpoint_folder)
+
+        self.deficits = np.zeros((len(self.cts), len(self.turbulences), len(self.distances)))
+
+        cells = [(i, j) for i in range(len(self.cts)) for j in range(len(self.turbulences))]
+
+        if extend_from is not None:
+            cells = self.restore_cells_from_look_up(cells, extend_from)
+
+        if checkpoint_folder is not None:
+            cells = self.restore_cells_from_checkpoint(cells)
+
+        if batch:
+            self.calculate_cells_in_batch(cells, progress)
+        elif workers is not None and workers > 1:
+            self.calculate_cells_in_parallel(cells, workers, progress)
+        else:
+            self.calculate_cells(cells, progress)
+
+        if distance_grid == "adaptive":
+
+            kept = select_distances(self.distances, self.deficits, distance_tolerance)
+
+            self.distances = self.distances[kept]
+            self.deficits = self.deficits[:, :, kept]
+
+    def calculate_cells(self, cells, progress):
+
+        for completed, (i, j) in enumerate(cells, start=1):
+
+            self.store_cell(i, j, self.calculate(
+                self.distances,
+                self.cts[i],
+                self.turbulences[j]))
+
+            if progress is not None:
+                progress(completed, len(cells), self.cts[i], self.turbulences[j])
+
+    def calculate_cells_in_parallel(self, cells, workers, progress):
+
+        # each cell is independent and is calculated by the same function as
+        # the serial build so the results are identical
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+
+            futures = {}
+
+            for i, j in cells:
+                future = executor.submit(calculate_deficits, self.distances, self.cts[i], self.turbulences[j])
+                futures[future] = (i, j)
+
+            for completed, future in enumerate(as_completed(futures), start=1):
+
+                i, j = futures[future]
+                self.store_cell(i, j, future.result())
+
+                if progress is not None:
+                    progress(completed, len(cells), self.cts[i], self.turbulences[j])
+
+    def calculate_cells_in_batch(self, cells, progress):
+
+        # all (ct, turbulence) cells are integrated together as one vector state
+
+        wake_cells = [(i, j) for i, j in cells if self.cts[i] > 0.0]
+
+        if len(wake_cells) > 0:
+
+            integrator = BatchWakeDeficitIntegrator(
+                thrust_coefficients=[self.cts[i] for i, _ in wake_cells],
+                turbulences=[self.turbulences[j] for _, j in wake_cells],
+                maximum_distance_downstream=self.distances[-1])
+
+            values = integrator.integrate(self.distances)
 
-        for ct in self.cts:
+        positions = {cell: k for k, cell in enumerate(wake_cells)}
 
-            if print_messages:
-                print(f"CT={ct:.2f}")
+        for completed, (i, j) in enumerate(cells, start=1):
 
-            values_for_ct = []
+            if self.cts[i] > 0.0:
+                self.store_cell(i, j, values[positions[(i, j)]])
+            else:
+                self.store_cell(i, j, np.zeros(self.distances.shape))
 
-            for turbulence in self.turbulences:
+            if progress is not None:
+                progress(completed, len(cells), self.cts[i], self.turbulences[j])
 
-                if print_messages:
-                    print(f"-TI={(turbulence)*100.0:.2f}%")
+    def store_cell(self, i, j, values):
 
-                values_for_ct.append(self.calculate(
-                    self.distances,
-                    ct,
-                    turbulence))
+        self.deficits[i, j] = values
 
-            values.append(np.array(values_for_ct))
+        if self.checkpoint_folder is not None:
 
-        self.deficits = np.array(values)
+            path = self.cell_path(self.cts[i], self.turbulences[j])
+
+            # write then rename so that an interrupted write never leaves a partial cell
+            temporary_path = path + ".tmp.npy"
+            np.save(temporary_path, values)
+            os.replace(temporary_path, path)
+
+    def cell_path(self, ct, turbulence):
+        return os.path.join(self.checkpoint_folder, f"cell_ct{ct:.6f}_ti{turbulence:.6f}.npy")
+
+    def prepare_checkpoint_folder(self, folder):
+
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        distances_path = os.path.join(folder, "distances.npy")
+
+        if os.path.isfile(distances_path):
+            if not np.array_equal(np.load(distances_path), self.distances):
+                raise Exception(f"Checkpoint folder {folder} was built with different distances")
+        else:
+            np.save(distances_path, self.distances)
+
+    def restore_cells_from_checkpoint(self, cells):
+
+        remaining = []
+
+        for i, j in cells:
+
+            path = self.cell_path(self.cts[i], self.turbulences[j])
+
+            if os.path.isfile(path):
+                self.deficits[i, j] = np.load(path)
+            else:
+                remaining.append((i, j))
+
+        return remaining
+
+    def restore_cells_from_look_up(self, cells, look_up_folder):
+
+        cts = np.load(os.path.join(look_up_folder, "thrust_cofficients.npy"))
+        turbulences = np.load(os.path.join(look_up_folder, "turbulences.npy"))
+        distances = np.load(os.path.join(look_up_folder, "distances.npy"))
+
+        if not np.array_equal(distances, self.distances):
+            raise Exception(f"Look-up {look_up_folder} was built with different distances")
+
+        deficits = np.load(os.path.join(look_up_folder, "deficits.npy"), mmap_mode='r')
+
+        remaining = []
+
+        for i, j in cells:
+
+            existing_i = self.find_grid_index(cts, self.cts[i])
+            existing_j = self.find_grid_index(turbulences, self.turbulences[j])
+
+            if existing_i is None or existing_j is None:
+                remaining.append((i, j))
+            else:
+                self.store_cell(i, j, np.array(deficits[existing_i, existing_j]))
+
+        return remaining
+
+    def find_grid_index(self, values, value):
+
+        matches = np.flatnonzero(np.isclose(values, value, rtol=0.0, atol=1e-9))
+
+        if len(matches) > 0:
+            return matches[0]
+        else:
+            return None
 
     def save(self, folder):
         
@@ -71,27 +334,18 @@ class VelocityDeficitLookUpBuilder:
         np.save(os.path.join(folder, "distances.npy"), self.distances)
         np.save(os.path.join(folder, "deficits.npy"), self.deficits)
 
-    def calculate(self, distances, ct, turbulence):
-        
-        if ct <= 0.0:
-            return np.zeros(distances.shape)
-
-        integrator = WakeDeficitIntegrator(
-            thrust_coefficient=ct,
-            turbulence=turbulence,
-            maximum_distance_downstream=distances[-1])
+    def save_file(self, path):
 
-        x = [0, integrator.normalised_distance_downstream]
-        y = [integrator.velocity_deficit, integrator.velocity_deficit]
+        save_look_up_file(
+            path,
+            self.cts,
+            self.turbulences,
+            self.distances,
+            self.deficits,
+            build_parameters=self.build_parameters)
 
-        while integrator.normalised_distance_downstream < distances[-1]:
-            integrator.step()
-            x.append(integrator.normalised_distance_downstream)
-            y.append(integrator.velocity_deficit)
-
-        values = interp1d(x, y, kind='linear')(distances)
-
-        return values
+    def calculate(self, distances, ct, turbulence):
+        return calculate_deficits(distances, ct, turbulence)
 
     def steps(self, start, stop, step):
         return np.linspace(
@@ -100,26 +354,67 @@ class VelocityDeficitLookUpBuilder:
             num=self.calculate_num(start, stop, step)
         )
 
+    def log_steps(self, stop, step):
+
+        # zero, then geometric steps from the start of the wake (2D) with a first
+        # step of size step, deficits are constant between zero and 2D
+
+        start = 2.0
+        ratio = 1.0 + step / start
+
+        num = int(math.ceil(math.log(stop / start) / math.log(ratio))) + 1
+
+        return np.concatenate([[0.0], np.geomspace(start, stop, num=num)])
+
     def calculate_num(self, start, stop, step):
         return int(round((stop-start) / step, 0)) + 1
 
 
 class VelocityDeficitLookUp:
 
-    def __init__(self, look_up_folder, interpolation_method=rect_grid_linear):
+    # look_up_path is either a folder written by VelocityDeficitLookUpBuilder.save
+    # or a single file written by VelocityDeficitLookUpBuilder.save_file, the latter
+    # is memory mapped and the interpolator is only built on the first query
 
-        cts = np.load(os.path.join(look_up_folder, "thrust_cofficients.npy"))
-        turbulences = np.load(os.path.join(look_up_folder, "turbulences.npy"))
-        distances = np.load(os.path.join(look_up_folder, "distances.npy"))
-        deficits = np.load(os.path.join(look_up_folder, "deficits.npy"))
+    def __init__(self, look_up_path, interpolation_method=rect_grid_linear, verify=False):
+
+        self.interpolation_method = interpolation_method
+        self._interpolate = None
+
+        if is_look_up_file(look_up_path):
+
+            self.look_up_file = LookUpFile(look_up_path)
+
+            if verify:
+                self.look_up_file.verify()
+
+            self.cts = self.look_up_file.cts
+            self.turbulences = self.look_up_file.turbulences
+            self.distances = self.look_up_file.distances
+            self.deficits = self.look_up_file.deficits
+
+        else:
 
-        self.max_turbulence = turbulences[-1]
+            self.look_up_file = None
 
-        self.interpolate = interpolation_method(
-            cts,
-            turbulences,
-            distances,
-            deficits)
+            self.cts = np.load(os.path.join(look_up_path, "thrust_cofficients.npy"))
+            self.turbulences = np.load(os.path.join(look_up_path, "turbulences.npy"))
+            self.distances = np.load(os.path.join(look_up_path, "distances.npy"))
+            self.deficits = np.load(os.path.join(look_up_path, "deficits.npy"))
+
+        self.max_turbulence = float(self.turbulences[-1])
+
+    @property
+    def interpolate(self):
+
+        if self._interpolate is None:
+            self._interpolate = self.interpolation_method(
+                self.cts,
+                self.turbulences,
+                self.distances,
+                self.deficits)
+
+        return self._interpolate
 
     def __call__(
             self,
@@ -131,5 +426,3 @@ class VelocityDeficitLookUp:
             thrust_coefficient,
             turbulence,
             normalized_distance_downwind))
-
-
@@ -0,0 +1,357 @@
+import math
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from .velocity_deficit import BatchWakeDeficitIntegrator
+
+
+def chebyshev_nodes(number):
+    # chebyshev points of the first kind on [-1, 1], ascending
+    return np.cos(math.pi * (np.arange(number) + 0.5) / number)[::-1]
+
+
+def chebyshev_basis(x, number):
+
+    # T0(x) to T(number - 1)(x) by the three term recurrence, one row per order
+
+    basis = np.empty((number, len(x)))
+    basis[0] = 1.0
+
+    if number > 1:
+        basis[1] = x
+
+    two_x = 2.0 * x
+
+    for order in range(2, number):
+        np.multiply(two_x, basis[order - 1], out=basis[order])
+        basis[order] -= basis[order - 2]
+
+    return basis
+
+
+def calculate_onset_thrust_coefficients(turbulences):
+
+    # thrust coefficient at which the initial deficit of the eddy viscosity model,
+    # ct - 0.05 - (16 ct - 0.5) turbulence / 10, is zero, there is no wake below it
+
+    return 0.05 * (1.0 - turbulences) / (1.0 - 1.6 * turbulences)
+
+
+class VelocityDeficitSurrogate:
+
+    # compact alternative to the velocity deficit look-up table, a tensor-product
+    # chebyshev fit of deficit(ct, turbulence, distance) that can be used in place of
+    # velocity_deficit.velocity_deficit_look_up
+    #
+    # the fit is made in transformed variables in which the deficit is smooth:
+    #   ct                  sqrt((ct - onset) / (max_thrust_coefficient - onset)) where onset is
+    #                       the thrust coefficient below which the model has no wake (so the
+    #                       whole range of ct down to zero is fitted, the deficit is zero
+    #                       below onset and rises steeply just above it)
+    #   turbulence          sqrt(turbulence / max_turbulence), the decay rate changes quickly near zero
+    #   distance            log(distance) on separate pieces either side of the 4.5D and 5.5D
+    #                       breaks of the filter function F (Ainslie, 1988)
+    #
+    # max_error is the error estimate from validate (None when not validated)
+    #
+    # queries sharing one (ct, turbulence) pair, as for one wake at many distances,
+    # reduce the fit to a chebyshev series in distance which is summed by Clenshaw's
+    # recurrence and are faster than linear interpolation of a look-up, scattered
+    # queries are not, each needs the whole tensor product (about 2000 terms for
+    # the default degrees) and takes 1.5 to 2 times as long as interpolation
+
+    DISTANCE_BREAKS = (2.0, 4.5, 5.5)
+
+    # points evaluated together in scattered queries, so the partial sums stay in cache
+    CHUNK_SIZE = 4096
+
+    def __init__(
+            self,
+            coefficients,
+            distance_breaks,
+            max_thrust_coefficient,
+            max_turbulence,
+            max_error=None):
+
+        self.coefficients = [np.asarray(values, dtype=float) for values in coefficients]
+        self.distance_breaks = np.asarray(distance_breaks, dtype=float)
+
+        self.max_thrust_coefficient = float(max_thrust_coefficient)
+        self.max_turbulence = float(max_turbulence)
+        self.max_distance = float(self.distance_breaks[-1])
+
+        # at 0.625 turbulence and above the initial deficit is never positive
+        if 1.0 - 1.6 * self.max_turbulence <= 0.0 or \
+                calculate_onset_thrust_coefficients(self.max_turbulence) >= self.max_thrust_coefficient:
+            raise ValueError("Surrogate domain has no wake at the maximum turbulence")
+
+        self.max_error = max_error
+
+        self.log_distance_breaks = np.log(self.distance_breaks)
+
+    @classmethod
+    def fit(
+            cls,
+            thrust_coefficient_degree=8,
+            turbulence_degree=10,
+            distance_degrees=(8, 6, 20),
+            max_thrust_coefficient=1.0,
+            max_turbulence=0.4,
+            max_distance=1000.0,
+            validation_density=4,
+            tolerance=None):
+
+        # one degree per distance piece, pieces beyond max_distance are dropped
+        distance_breaks = [x for x in cls.DISTANCE_BREAKS if x < max_distance] + [max_distance]
+        distance_degrees = distance_degrees[:len(distance_breaks) - 1]
+
+        u = chebyshev_nodes(thrust_coefficient_degree + 1)
+        v = chebyshev_nodes(turbulence_degree + 1)
+
+        surrogate = cls(
+            coefficients=[],
+            distance_breaks=distance_breaks,
+            max_thrust_coefficient=max_thrust_coefficient,
+            max_turbulence=max_turbulence)
+
+        turbulences = surrogate.turbulences_from_unit(v)
+
+        pieces = []
+
+        for piece, degree in enumerate(distance_degrees):
+            w = chebyshev_nodes(degree + 1)
+            pieces.append((w, surrogate.distances_from_unit(w, piece)))
+
+        distances = np.sort(np.concatenate([x for _, x in pieces]))
+
+        # every node trajectory in one vector integration, the ct nodes depend on turbulence
+        node_turbulences = np.broadcast_to(turbulences[np.newaxis, :], (len(u), len(v)))
+        node_cts = surrogate.thrust_coefficients_from_unit(u[:, np.newaxis], node_turbulences)
+
+        integrator = BatchWakeDeficitIntegrator(
+            thrust_coefficients=node_cts.ravel(),
+            turbulences=node_turbulences.ravel(),
+            maximum_distance_downstream=max_distance)
+
+        deficits = integrator.integrate(distances).reshape(len(u), len(v), len(distances))
+
+        inverse_u = np.linalg.inv(chebyshev.chebvander(u, thrust_coefficient_degree))
+        inverse_v = np.linalg.inv(chebyshev.chebvander(v, turbulence_degree))
+
+        for w, x in pieces:
+
+            values = deficits[:, :, np.searchsorted(distances, x)]
+            inverse_w = np.linalg.inv(chebyshev.chebvander(w, len(w) - 1))
+
+            surrogate.coefficients.append(
+                np.einsum('ai,bj,ck,ijk->abc', inverse_u, inverse_v, inverse_w, values))
+
+        if validation_density > 0:
+            surrogate.max_error = surrogate.validate(validation_density)
+
+            if tolerance is not None and surrogate.max_error > tolerance:
+                raise Exception(
+                    f"Surrogate estimated maximum error {surrogate.max_error} exceeds tolerance {tolerance}, "
+                    "increase the degrees of the fit")
+
+        return surrogate
+
+    def validate(self, density=4):
+
+        # estimate of the maximum error against the eddy viscosity model (not a bound):
+        # the maximum error on a grid uniform in the fitted variables, density points
+        # per degree of the fit along each axis so that it includes the domain edges
+        # and the distance breaks, together with a grid uniform in ct from zero (which
+        # includes the region without a wake), plus the sum of the magnitudes of the
+        # highest order coefficients (each |Tn| <= 1) for the error between grid points
+
+        degree_u, degree_v = self.coefficients[0].shape[:2]
+
+        u = np.linspace(-1.0, 1.0, density * (degree_u - 1) + 1)
+
+        turbulences = np.minimum(
+            self.turbulences_from_unit(np.linspace(-1.0, 1.0, density * (degree_v - 1) + 1)),
+            self.max_turbulence)
+
+        distances = np.clip(np.unique(np.concatenate([
+            self.distances_from_unit(np.linspace(-1.0, 1.0, density * (coefficients.shape[2] - 1) + 1), piece)
+            for piece, coefficients in enumerate(self.coefficients)])),
+            self.distance_breaks[0],
+            self.max_distance)
+
+        grid_turbulences = np.broadcast_to(turbulences[np.newaxis, :], (2 * len(u), len(turbulences)))
+
+        grid_cts = np.minimum(np.concatenate([
+            self.thrust_coefficients_from_unit(u[:, np.newaxis], grid_turbulences[:len(u)]),
+            np.broadcast_to(0.5 * (u[:, np.newaxis] + 1.0) * self.max_thrust_coefficient, (len(u), len(turbulences)))]),
+            self.max_thrust_coefficient)
+
+        integrator = BatchWakeDeficitIntegrator(
+            thrust_coefficients=grid_cts.ravel(),
+            turbulences=grid_turbulences.ravel(),
+            maximum_distance_downstream=self.max_distance)
+
+        expected = integrator.integrate(distances)
+
+        values = self.evaluate(
+            grid_cts.ravel()[:, np.newaxis],
+            distances[np.newaxis, :],
+            grid_turbulences.ravel()[:, np.newaxis])
+
+        grid_error = float(np.max(np.abs(values - expected)))
+
+        tail_error = max(
+            float(np.sum(np.abs(coefficients[-1])) + np.sum(np.abs(coefficients[:, -1])) + np.sum(np.abs(coefficients[:, :, -1])))
+            for coefficients in self.coefficients)
+
+        return grid_error + tail_error
+
+    def thrust_coefficients_from_unit(self, u, turbulences):
+        onsets = calculate_onset_thrust_coefficients(turbulences)
+        return onsets + (0.5 * (u + 1.0)) ** 2.0 * (self.max_thrust_coefficient - onsets)
+
+    def unit_from_thrust_coefficients(self, thrust_coefficients, turbulences):
+        onsets = calculate_onset_thrust_coefficients(turbulences)
+        return 2.0 * np.sqrt(np.maximum(thrust_coefficients - onsets, 0.0) / (self.max_thrust_coefficient - onsets)) - 1.0
+
+    def turbulences_from_unit(self, v):
+        return (0.5 * (v + 1.0)) ** 2.0 * self.max_turbulence
+
+    def distances_from_unit(self, w, piece):
+        lower = self.log_distance_breaks[piece]
+        upper = self.log_distance_breaks[piece + 1]
+        return np.exp(lower + 0.5 * (w + 1.0) * (upper - lower))
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.coefficients)
+
+    def evaluate(self, thrust_coefficients, normalized_distances_downwind, turbulences):
+
+        thrust_coefficients, normalized_distances_downwind, turbulences = np.broadcast_arrays(
+            np.asarray(thrust_coefficients, dtype=float),
+            np.asarray(normalized_distances_downwind, dtype=float),
+            np.asarray(turbulences, dtype=float))
+
+        shape = thrust_coefficients.shape
+
+        cts = thrust_coefficients.ravel()
+        distances = np.maximum(normalized_distances_downwind.ravel(), self.distance_breaks[0])
+        turbulences = turbulences.ravel()
+
+        if np.any(distances > self.max_distance) or np.any(turbulences > self.max_turbulence) \
+                or np.any(cts > self.max_thrust_coefficient) or np.any(turbulences < 0.0) or np.any(cts < 0.0):
+            raise ValueError("Surrogate evaluated outside of its fitted domain")
+
+        u = self.unit_from_thrust_coefficients(cts, turbulences)
+        v = 2.0 * np.sqrt(turbulences / self.max_turbulence) - 1.0
+
+        log_distances = np.log(distances)
+        pieces = np.clip(np.searchsorted(self.log_distance_breaks, log_distances, side='left') - 1, 0, len(self.coefficients) - 1)
+
+        shared_pair = len(cts) > 0 and u.min() == u.max() and v.min() == v.max()
+
+        values = np.empty(len(cts))
+
+        for piece, coefficients in enumerate(self.coefficients):
+
+            selected = pieces == piece
+
+            if not np.any(selected):
+                continue
+
+            lower = self.log_distance_breaks[piece]
+            upper = self.log_distance_breaks[piece + 1]
+
+            w = 2.0 * (log_distances[selected] - lower) / (upper - lower) - 1.0
+
+            if shared_pair:
+                values[selected] = self.evaluate_series(coefficients, u[0], v[0], w)
+            else:
+                values[selected] = self.evaluate_piece(coefficients, u[selected], v[selected], w)
+
+        # no wake below the onset thrust coefficient
+        values[cts <= calculate_onset_thrust_coefficients(turbulences)] = 0.0
+
+        return values.reshape(shape)
+
+    def evaluate_series(self, coefficients, u, v, w):
+
+        # one (ct, turbulence) pair at many distances, the fit reduces to a
+        # series in distance which chebval sums by Clenshaw's recurrence
+
+        degree_u, degree_v, _ = coefficients.shape
+
+        series = np.einsum(
+            'abc,a,b->c',
+            coefficients,
+            chebyshev_basis(np.array([u]), degree_u)[:, 0],
+            chebyshev_basis(np.array([v]), degree_v)[:, 0])
+
+        return chebyshev.chebval(w, series)
+
+    def evaluate_piece(self, coefficients, u, v, w):
+
+        # sum of c[a, b, c] * Ta(u) * Tb(v) * Tc(w), the contraction over distance
+        # is a single matrix product for each chunk of points
+
+        degree_u, degree_v, degree_w = coefficients.shape
+
+        matrix = coefficients.reshape(degree_u * degree_v, degree_w)
+
+        values = np.empty(len(u))
+
+        for start in range(0, len(u), self.CHUNK_SIZE):
+
+            chunk = slice(start, start + self.CHUNK_SIZE)
+
+            partial = (matrix @ chebyshev_basis(w[chunk], degree_w)).reshape(degree_u, degree_v, -1)
+
+            values[chunk] = np.einsum(
+                'an,an->n',
+                np.einsum('abn,bn->an', partial, chebyshev_basis(v[chunk], degree_v)),
+                chebyshev_basis(u[chunk], degree_u))
+
+        return values
+
+    def __call__(
+            self,
+            thrust_coefficient,
+            normalized_distance_downwind,
+            turbulence):
+
+        values = self.evaluate(thrust_coefficient, normalized_distance_downwind, turbulence)
+
+        if values.ndim == 0:
+            return float(values)
+
+        return values
+
+    def save(self, path):
+
+        arrays = {f"coefficients_{piece}": values for piece, values in enumerate(self.coefficients)}
+
+        np.savez(
+            path,
+            distance_breaks=self.distance_breaks,
+            domain=np.array([self.max_thrust_coefficient, self.max_turbulence]),
+            max_error=np.array(np.nan if self.max_error is None else self.max_error),
+            **arrays)
+
+    @classmethod
+    def load(cls, path):
+
+        with np.load(path) as data:
+
+            distance_breaks = data["distance_breaks"]
+            coefficients = [data[f"coefficients_{piece}"] for piece in range(len(distance_breaks) - 1)]
+            max_thrust_coefficient, max_turbulence = data["domain"]
+            max_error = float(data["max_error"])
+
+        return cls(
+            coefficients=coefficients,
+            distance_breaks=distance_breaks,
+            max_thrust_coefficient=max_thrust_coefficient,
+            max_turbulence=max_turbulence,
+            max_error=None if math.isnan(max_error) else max_error)
@@ -1,5 +1,8 @@
 from .wind_farm_wake import WindFarmWake
 from miniwake.rotation import rotate_and_sort_turbines as rotate_and_sort
+from miniwake.rotation import WindDirectionTransform
+
+import numpy as np
 
 
 class WindFarm:
@@ -10,7 +13,8 @@ class WindFarm:
             ambient_conditions,
             velocity_integrator,
             turbulence_integrator,
-            apply_meander):
+            apply_meander,
+            deficit_engine=None):
 
         self.turbines = turbines
         self.ambient_conditions = ambient_conditions
@@ -22,6 +26,9 @@ class WindFarm:
         self.turbulence_integrator = turbulence_integrator
         self.apply_meander = apply_meander
 
+        # None gives each solve its own engine (see WindFarmWake)
+        self.deficit_engine = deficit_engine
+
     def validate_unique_turbine_names(self):
 
         names = {}
@@ -33,23 +40,62 @@ class WindFarm:
 
             names[turbine.name] = turbine.name
 
-    def calculate(self, direction, reference_ambient_velocity):
+    def transform(self, direction):
+
+        # (transform, transformed turbines) for the direction
 
         if direction not in self.transformed_turbines_cache:
-            transformed_turbines = rotate_and_sort(direction, self.turbines)
-            self.transformed_turbines_cache[direction] = transformed_turbines
-        else:
-            transformed_turbines = self.transformed_turbines[direction]
+            self.transformed_turbines_cache[direction] = (
+                WindDirectionTransform(direction, self.turbines),
+                rotate_and_sort(direction, self.turbines))
+
+        return self.transformed_turbines_cache[direction]
+
+    def solve(self, direction, reference_ambient_velocity):
+
+        transform, transformed_turbines = self.transform(direction)
 
         wind_farm_wake = WindFarmWake(
                     transformed_turbines,
                     ambient_conditions=self.ambient_conditions.get_bin(direction, reference_ambient_velocity),
                     velocity_deficit_integrator=self.velocity_integrator,
                     added_turbulence_integrator=self.turbulence_integrator,
-                    apply_meander=self.apply_meander)
+                    apply_meander=self.apply_meander,
+                    deficit_engine=self.deficit_engine)
+
+        return wind_farm_wake, transform
+
+    def calculate(self, direction, reference_ambient_velocity):
+
+        wind_farm_wake, _ = self.solve(direction, reference_ambient_velocity)
 
         return self.restore_original_order(wind_farm_wake.turbine_wakes)
 
+    def calculate_points(self, direction, reference_ambient_velocity, point_query):
+
+        # waked (velocity, turbulence) at the points of a PointQuery
+
+        wind_farm_wake, transform = self.solve(direction, reference_ambient_velocity)
+
+        return point_query.calculate(wind_farm_wake, transform)
+
+    def calculate_points_for_flow_cases(self, flow_cases, point_query):
+
+        # flow_cases is a sequence of (direction, reference_ambient_velocity),
+        # returns waked (velocities, turbulences) arrays of shape (cases,) + points shape
+
+        velocities = np.zeros((len(flow_cases),) + point_query.shape)
+        turbulences = np.zeros((len(flow_cases),) + point_query.shape)
+
+        for i, (direction, reference_ambient_velocity) in enumerate(flow_cases):
+
+            velocities[i], turbulences[i] = self.calculate_points(
+                direction,
+                reference_ambient_velocity,
+                point_query)
+
+        return velocities, turbulences
+
     def restore_original_order(self, turbine_wakes):
 
         # reorder turbines to original order
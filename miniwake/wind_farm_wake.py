@@ -2,6 +2,8 @@ from .turbine_wake import TurbineWake
 from .rotor_integration import VelocityDeficitIntegrator
 from .rotor_integration import AddedTurbulenceIntegrator
 from .combination import WeightedAverageRSSLinearVelocityDeficitCombiner
+from .deficit_engine import create_deficit_engine
+from .upwind_index import UpwindWakeIndex
 
 
 class WindFarmWake:
@@ -14,7 +16,11 @@ class WindFarmWake:
             added_turbulence_integrator=AddedTurbulenceIntegrator(),
             velocity_deficit_combiner=WeightedAverageRSSLinearVelocityDeficitCombiner,
             apply_meander=True,
-            apply_added_turbulence=True):
+            apply_added_turbulence=True,
+            deficit_engine=None,
+            cross_section_cache_size=None,
+            influence_envelope=None,
+            upwind_index_bin_width=None):
 
         self.ambient_conditions = ambient_conditions
 
@@ -25,24 +31,46 @@ class WindFarmWake:
         self.apply_meander = apply_meander
         self.apply_added_turbulence = apply_added_turbulence
 
+        # without an engine the farm gets its own (see create_deficit_engine)
+        if deficit_engine is None:
+            deficit_engine = create_deficit_engine(len(turbines))
+
+        self.deficit_engine = deficit_engine
+        self.cross_section_cache_size = cross_section_cache_size
+        self.influence_envelope = influence_envelope
+
+        # with a bin width (2000.0 is a reasonable choice) each turbine only visits
+        # the upwind wakes an UpwindWakeIndex finds can reach it (the results are
+        # unchanged), None (the default) visits every upwind wake
+        self.upwind_index_bin_width = upwind_index_bin_width
+
         self.turbine_wakes = self.calculate(turbines)
 
     def recalculate(self, ambient_conditions):
 
         self.ambient_conditions = ambient_conditions
 
+        # the wakes change with the ambient conditions so the upwind wakes
+        # reaching each turbine are found again, as in calculate
+
+        upwind_index = self.create_upwind_index(self.turbine_wakes)
+
         for i in range(len(self.turbine_wakes)):
 
             wake = self.turbine_wakes[i]
 
-            wake.recalculate(
+            wake.reset(
                 self.ambient_conditions.get_velocity(wake.name),
                 self.ambient_conditions.get_turbulence(wake.name))
 
+            self.add_upwind_wakes(i, wake, self.turbine_wakes, upwind_index)
+
     def calculate(self, turbines):
 
         turbine_wakes = []
 
+        upwind_index = self.create_upwind_index(turbines)
+
         for i in range(len(turbines)):
 
             wake = TurbineWake(
@@ -53,17 +81,45 @@ class WindFarmWake:
                 velocity_deficit_combiner= self.velocity_deficit_combiner,
                 added_turbulence_integrator=self.added_turbulence_integrator, 
                 apply_meander=self.apply_meander,
-                apply_added_turbulence=self.apply_added_turbulence)
+                apply_added_turbulence=self.apply_added_turbulence,
+                deficit_engine=self.deficit_engine,
+                cross_section_cache_size=self.cross_section_cache_size,
+                influence_envelope=self.influence_envelope)
 
             if len(turbine_wakes) > 0:
                 if wake.x < turbine_wakes[-1].x:
                     raise Exception("Wakes must be added in order upwind to downwind")
 
-            for j in range(i):
-                wake.add_wake(turbine_wakes[j])
-
-            wake.calculate()
+            self.add_upwind_wakes(i, wake, turbine_wakes, upwind_index)
 
             turbine_wakes.append(wake)
 
         return turbine_wakes
+
+    def add_upwind_wakes(self, i, wake, turbine_wakes, upwind_index):
+
+        # adds the wakes of turbine_wakes[:i] which can reach the i-th wake then calculates it
+
+        if upwind_index is None:
+            upwind_wakes = range(i)
+        else:
+            upwind_wakes = upwind_index.candidates(wake)
+
+        for j in upwind_wakes:
+            wake.add_wake(turbine_wakes[j])
+
+        wake.calculate()
+
+        if upwind_index is not None:
+            upwind_index.add(i, wake)
+
+    def create_upwind_index(self, turbines):
+
+        if self.upwind_index_bin_width is None or len(turbines) < 1:
+            return None
+
+        return UpwindWakeIndex(
+            max_x=max(turbine.x for turbine in turbines),
+            max_diameter=max(turbine.diameter for turbine in turbines),
+            bin_width=self.upwind_index_bin_width,
+            influence_envelope=self.influence_envelope)
@@ -0,0 +1,33 @@
+from miniwake.turbine import Turbine
+from miniwake.turbine import FixedThrustCurve
+from miniwake.ambient import FixedAmbientConditions
+
+
+def make_turbine(name, x, y, thrust_coefficient=0.7):
+
+    return Turbine(
+        name=name,
+        x=x,
+        y=y,
+        hub_height=80.0,
+        diameter=76.0,
+        rotational_speed_rpm=17.0,
+        thrust_curve=FixedThrustCurve(thrust_coefficient))
+
+
+def make_grid(columns, rows, x_spacing, y_spacing, x_stagger=0.0, thrust_coefficient=0.7):
+
+    # columns along x (downwind for 270 degrees), each row staggered by x_stagger,
+    # sorted by x as WindFarmWake expects
+
+    turbines = [
+        make_turbine(f"T{i}_{j}", x_spacing * i + x_stagger * j, y_spacing * j, thrust_coefficient)
+        for i in range(columns) for j in range(rows)]
+
+    turbines.sort(key=lambda turbine: turbine.x)
+
+    return turbines
+
+
+def make_ambient_conditions(turbulence=0.08, velocity=9.5):
+    return FixedAmbientConditions(fixed_velocity=velocity, fixed_turbulence=turbulence)
@@ -1,6 +1,19 @@
 import pytest
+import numpy as np
 
 from miniwake.added_turbulence import quarton_added_turbulence
 
 def test_quarton_added_turbulence():
 	 assert quarton_added_turbulence(1.0, 1.0, 1.0, 1.0, 1.0) == pytest.approx(1.1)
+
+
+def test_quarton_added_turbulence_on_arrays():
+
+	distances = np.array([10.0, 200.0, 1000.0])
+	thrust_coefficients = np.array([0.8, 0.4, 0.1])
+
+	values = quarton_added_turbulence(distances, thrust_coefficients, 76.0, 150.0, 0.1)
+
+	# numpy's fractional powers can differ from math's in the last bit
+	for i in range(3):
+		assert values[i] == pytest.approx(quarton_added_turbulence(float(distances[i]), float(thrust_coefficients[i]), 76.0, 150.0, 0.1), rel=1e-15)
@@ -1,6 +1,8 @@
 import pytest
+import numpy as np
 
 from miniwake.combination import RSSMaxAutoVelocityDeficitCombiner, WeightedAverageRSSLinearVelocityDeficitCombiner, StraightAverageRSSLinearVelocityDeficitCombiner
+from miniwake.combination import AddedTurbulenceCombiner
 
 
 def test_velicity_deficit_combination():
@@ -27,3 +29,83 @@ def test_velicity_deficit_combination():
     assert abs(combiner1.combined_value() - 0.1232623) < 1E-6
     assert abs(combiner2.combined_value() - 0.1309017) < 1E-6
 
+
+
+@pytest.mark.parametrize("combiner_type", [
+    RSSMaxAutoVelocityDeficitCombiner,
+    WeightedAverageRSSLinearVelocityDeficitCombiner,
+    StraightAverageRSSLinearVelocityDeficitCombiner])
+def test_combine_arrays_matches_add(combiner_type):
+
+    random = np.random.default_rng(1)
+
+    values = random.uniform(-0.05, 0.2, (4, 50))
+    normalised_distances_upwind = random.uniform(2.0, 12.0, (4, 50))
+    normalised_lateral_distances = random.uniform(-3.0, 3.0, (4, 50))
+
+    combined = combiner_type.combine_arrays(values, normalised_distances_upwind, normalised_lateral_distances)
+
+    for point in range(50):
+
+        combiner = combiner_type()
+
+        for wake in range(4):
+            combiner.add(values[wake, point], normalised_distances_upwind[wake, point], normalised_lateral_distances[wake, point])
+
+        assert combined[point] == pytest.approx(combiner.combined_value(), abs=1e-15)
+
+
+@pytest.mark.parametrize("combiner_type", [
+    RSSMaxAutoVelocityDeficitCombiner,
+    WeightedAverageRSSLinearVelocityDeficitCombiner,
+    StraightAverageRSSLinearVelocityDeficitCombiner,
+    AddedTurbulenceCombiner])
+def test_array_combination_matches_combine_arrays(combiner_type):
+
+    random = np.random.default_rng(2)
+
+    values = random.uniform(-0.05, 0.2, (4, 50))
+    normalised_distances_upwind = random.uniform(2.0, 12.0, (4, 50))
+    normalised_lateral_distances = random.uniform(-3.0, 3.0, (4, 50))
+
+    # each wake only reaches some of the points
+    reached = random.uniform(0.0, 1.0, (4, 50)) < 0.6
+    values[~reached] = 0.0
+
+    combination = combiner_type.array_combination(50)
+
+    for wake in range(4):
+
+        points = np.flatnonzero(reached[wake])
+
+        if combiner_type is AddedTurbulenceCombiner:
+            combination.add(points, values[wake, points])
+        else:
+            combination.add(
+                points,
+                values[wake, points],
+                normalised_distances_upwind[wake, points],
+                normalised_lateral_distances[wake, points])
+
+    if combiner_type is AddedTurbulenceCombiner:
+        expected = combiner_type.combine_arrays(values)
+    else:
+        expected = combiner_type.combine_arrays(values, normalised_distances_upwind, normalised_lateral_distances)
+
+    assert combination.combined_value() == pytest.approx(expected, abs=1e-15)
+
+
+def test_added_turbulence_combine_arrays_matches_add():
+
+    values = np.array([[0.1, -0.1, 0.0], [0.2, 0.3, 0.0]])
+
+    combined = AddedTurbulenceCombiner.combine_arrays(values)
+
+    for point in range(3):
+
+        combiner = AddedTurbulenceCombiner()
+
+        for wake in range(2):
+            combiner.add(values[wake, point])
+
+        assert combined[point] == pytest.approx(combiner.combined_value(), abs=1e-15)
@@ -0,0 +1,155 @@
+import pytest
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+
+from miniwake import velocity_deficit
+from miniwake.deficit_engine import OdeDeficitEngine
+from miniwake.deficit_engine import LookUpDeficitEngine
+from miniwake.deficit_engine import default_deficit_engine
+from miniwake.velocity_deficit import VelocityDeficitTrajectoryCache
+from miniwake.velocity_deficit_look_up import VelocityDeficitLookUpBuilder
+from miniwake.velocity_deficit_look_up import VelocityDeficitLookUp
+from miniwake.wind_farm_wake import WindFarmWake
+
+from .layouts import make_turbine
+from .layouts import make_ambient_conditions
+
+
+@pytest.fixture(scope="module")
+def look_up(tmp_path_factory):
+
+    look_up_folder = str(tmp_path_factory.mktemp("look_up") / "look_up")
+
+    VelocityDeficitLookUpBuilder(
+        dist_downwind_step=0.5,
+        thrust_coefficient_step=0.1,
+        turbulence_intensity_step=0.1,
+        max_dist_downwind=50.0,
+        max_turbulence_intensity=0.3,
+        max_thrust_coefficient=1.0,
+        batch=True).save(look_up_folder)
+
+    return VelocityDeficitLookUp(look_up_folder)
+
+
+def wind_farm_wake(deficit_engine=default_deficit_engine):
+
+    turbines = [make_turbine(f"T{i}", i * 300.0, 20.0 * i) for i in range(4)]
+
+    return WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=make_ambient_conditions(0.1),
+        deficit_engine=deficit_engine)
+
+
+def test_ode_engine_matches_global_ode():
+
+    engine = OdeDeficitEngine()
+
+    assert engine.calculate_velocity_deficit(0.4, 10.0, 0.1) == velocity_deficit.calculate_velocity_deficit(0.4, 10.0, 0.1)
+
+    cts = np.array([0.2, 0.4, 0.8])
+
+    assert np.array_equal(
+        engine.calculate_velocity_deficits(cts, 10.0, 0.1),
+        velocity_deficit.calculate_velocity_deficits(cts, 10.0, 0.1))
+
+    assert len(engine.trajectory_cache.trajectories) == 3
+
+
+def test_look_up_engine_matches_global_look_up(look_up, monkeypatch):
+
+    engine = LookUpDeficitEngine(look_up).warm_up()
+
+    expected = [engine.calculate_velocity_deficit(0.45, 12.3, 0.5)]
+    expected_wakes = [wake.waked_velocity for wake in wind_farm_wake(engine).turbine_wakes]
+
+    monkeypatch.setattr(velocity_deficit, "velocity_deficit_look_up", look_up)
+
+    assert expected == [velocity_deficit.calculate_velocity_deficit(0.45, 12.3, 0.5)]
+    assert expected_wakes == [wake.waked_velocity for wake in wind_farm_wake().turbine_wakes]
+
+
+def test_wind_farm_wake_uses_engine_not_global(look_up, monkeypatch):
+
+    engine = OdeDeficitEngine()
+
+    expected = [wake.waked_velocity for wake in wind_farm_wake().turbine_wakes]
+
+    # setting the global look-up does not change a farm given an explicit engine
+    monkeypatch.setattr(velocity_deficit, "velocity_deficit_look_up", look_up)
+
+    actual = [wake.waked_velocity for wake in wind_farm_wake(engine).turbine_wakes]
+
+    assert actual == pytest.approx(expected, abs=1e-12)
+    assert len(engine.trajectory_cache.trajectories) > 0
+
+
+def test_concurrent_farms_with_separate_engines(look_up):
+
+    ode = [wake.waked_velocity for wake in wind_farm_wake(OdeDeficitEngine()).turbine_wakes]
+    table = [wake.waked_velocity for wake in wind_farm_wake(LookUpDeficitEngine(look_up)).turbine_wakes]
+
+    engines = [OdeDeficitEngine() if i % 2 == 0 else LookUpDeficitEngine(look_up).warm_up() for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(
+            lambda engine: [wake.waked_velocity for wake in wind_farm_wake(engine).turbine_wakes],
+            engines))
+
+    for i, result in enumerate(results):
+        assert result == (ode if i % 2 == 0 else table)
+
+    assert ode != table
+
+
+def test_wind_farm_wake_without_engine_has_its_own_cache():
+
+    first = wind_farm_wake(None)
+    second = wind_farm_wake(None)
+
+    assert isinstance(first.deficit_engine, OdeDeficitEngine)
+    assert first.deficit_engine is not second.deficit_engine
+    assert len(first.deficit_engine.trajectory_cache.trajectories) > 0
+
+    expected = [wake.waked_velocity for wake in wind_farm_wake(OdeDeficitEngine()).turbine_wakes]
+
+    assert [wake.waked_velocity for wake in first.turbine_wakes] == expected
+
+
+def test_module_trajectory_cache_is_used_by_default():
+
+    cache = velocity_deficit.velocity_deficit_trajectory_cache
+
+    assert isinstance(cache, VelocityDeficitTrajectoryCache)
+
+    cache.clear()
+
+    first = velocity_deficit.solve_velocity_deficit(0.4, 10.0, 0.1)
+    second = velocity_deficit.solve_velocity_deficit(0.4, 20.0, 0.1)
+
+    assert len(cache.trajectories) == 1
+    assert cache.trajectories.hits == 1
+
+    assert velocity_deficit.calculate_velocity_deficit(0.4, 10.0, 0.1) == first
+    assert velocity_deficit.solve_velocity_deficit(0.4, 20.0, 0.1) == second
+
+    # farms still cache trajectories in their own engine
+    assert isinstance(wind_farm_wake(None).deficit_engine, OdeDeficitEngine)
+
+
+def test_module_trajectory_cache_shared_between_threads(monkeypatch):
+
+    monkeypatch.setattr(velocity_deficit, "velocity_deficit_trajectory_cache", VelocityDeficitTrajectoryCache(maxsize=4))
+
+    cases = [(0.3 + 0.1 * (i % 6), 5.0 + 0.5 * i, 0.05 + 0.01 * (i % 5)) for i in range(40)]
+
+    expected = [
+        velocity_deficit.solve_velocity_deficit(*case, trajectory_cache=VelocityDeficitTrajectoryCache())
+        for case in cases]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda case: velocity_deficit.calculate_velocity_deficit(*case), cases))
+
+    assert results == expected
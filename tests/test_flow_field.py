@@ -0,0 +1,105 @@
+import pytest
+import numpy as np
+
+from miniwake.wind_farm_wake import WindFarmWake
+from miniwake.flow_field import FlowField
+from miniwake.combination import RSSMaxAutoVelocityDeficitCombiner
+from miniwake.combination import WeightedAverageRSSLinearVelocityDeficitCombiner
+from miniwake.combination import AddedTurbulenceCombiner
+
+from .layouts import make_turbine
+from .layouts import make_ambient_conditions
+
+
+def solve_wind_farm_wake(velocity_deficit_combiner):
+
+    turbines = [
+        make_turbine(f"T{i}_{j}", i * 400.0, j * 300.0 + i * 50.0)
+        for i in range(3) for j in range(2)]
+
+    return WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=make_ambient_conditions(),
+        velocity_deficit_combiner=velocity_deficit_combiner)
+
+
+def point_by_point(wind_farm_wake, x, y, z):
+
+    velocity_deficit_combiner = wind_farm_wake.velocity_deficit_combiner()
+    added_turbulence_combiner = AddedTurbulenceCombiner()
+
+    for turbine_wake in wind_farm_wake.turbine_wakes:
+
+        cross_section = turbine_wake.calculate_cross_section(x - turbine_wake.x)
+
+        lateral_distance = y - turbine_wake.y
+        vertical_distance = z - turbine_wake.hub_height
+
+        velocity_deficit_combiner.add(
+            cross_section.velocity_deficit(lateral_distance, vertical_distance),
+            cross_section.normalised_distance_downwind,
+            lateral_distance / turbine_wake.diameter)
+
+        added_turbulence_combiner.add(
+            cross_section.added_turbulence(lateral_distance, vertical_distance))
+
+    return velocity_deficit_combiner.combined_value(), added_turbulence_combiner.combined_value()
+
+
+@pytest.mark.parametrize("velocity_deficit_combiner", [
+    RSSMaxAutoVelocityDeficitCombiner,
+    WeightedAverageRSSLinearVelocityDeficitCombiner])
+def test_horizontal_plane_matches_point_by_point(velocity_deficit_combiner):
+
+    wind_farm_wake = solve_wind_farm_wake(velocity_deficit_combiner)
+
+    # a small tile size so that the map is calculated in many tiles
+    flow_field = FlowField(wind_farm_wake, tile_size=97)
+
+    xs = np.linspace(-100.0, 1500.0, 41)
+    ys = np.linspace(-200.0, 600.0, 23)
+
+    velocity_deficits, added_turbulences = flow_field.horizontal_plane(xs, ys, 80.0)
+
+    assert velocity_deficits.shape == (23, 41)
+    assert np.any(velocity_deficits > 0.05)
+
+    for i in range(len(ys)):
+        for j in range(len(xs)):
+
+            velocity_deficit, added_turbulence = point_by_point(wind_farm_wake, xs[j], ys[i], 80.0)
+
+            assert velocity_deficits[i, j] == pytest.approx(velocity_deficit, abs=1e-12)
+            assert added_turbulences[i, j] == pytest.approx(added_turbulence, abs=1e-12)
+
+
+def test_vertical_plane_matches_point_by_point():
+
+    wind_farm_wake = solve_wind_farm_wake(WeightedAverageRSSLinearVelocityDeficitCombiner)
+
+    flow_field = FlowField(wind_farm_wake)
+
+    xs = np.linspace(100.0, 1500.0, 15)
+    zs = np.linspace(0.0, 200.0, 9)
+
+    velocity_deficits, added_turbulences = flow_field.vertical_plane(xs, zs, 0.0)
+
+    assert velocity_deficits.shape == (9, 15)
+
+    for i in range(len(zs)):
+        for j in range(len(xs)):
+
+            velocity_deficit, added_turbulence = point_by_point(wind_farm_wake, xs[j], 0.0, zs[i])
+
+            assert velocity_deficits[i, j] == pytest.approx(velocity_deficit, abs=1e-12)
+            assert added_turbulences[i, j] == pytest.approx(added_turbulence, abs=1e-12)
+
+
+def test_points_upwind_of_farm_are_not_waked():
+
+    flow_field = FlowField(solve_wind_farm_wake(WeightedAverageRSSLinearVelocityDeficitCombiner))
+
+    velocity_deficits, added_turbulences = flow_field.calculate(-10.0, np.linspace(-100.0, 100.0, 5), 80.0)
+
+    assert np.array_equal(velocity_deficits, np.zeros(5))
+    assert np.array_equal(added_turbulences, np.zeros(5))
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+
+from miniwake.turbine_wake import TurbineWake
+from miniwake.wind_farm_wake import WindFarmWake
+from miniwake.influence_envelope import InfluenceEnvelope
+from miniwake.deficit_engine import default_deficit_engine
+
+from .layouts import make_turbine
+from .layouts import make_grid
+from .layouts import make_ambient_conditions
+
+
+class ScaledDeficitEngine:
+
+    def __init__(self, scale):
+        self.scale = scale
+
+    def calculate_velocity_deficits(self, thrust_coefficients, normalized_distances_downwind, turbulences):
+        return self.scale * default_deficit_engine.calculate_velocity_deficits(
+            thrust_coefficients,
+            normalized_distances_downwind,
+            turbulences)
+
+
+def test_pruned_rotors_see_deficit_below_threshold():
+
+    threshold = 0.005
+
+    envelope = InfluenceEnvelope.build(threshold=threshold, max_distance=40.0)
+
+    random = np.random.default_rng(1)
+
+    for _ in range(6):
+
+        thrust_coefficient = random.uniform(0.3, 0.95)
+        ambient_turbulence = random.uniform(0.03, 0.2)
+
+        upwind_wake = TurbineWake(make_turbine("T1", 0.0, 0.0, thrust_coefficient), 9.5, ambient_turbulence)
+        upwind_wake.calculate()
+
+        downwind_wake = TurbineWake(
+            make_turbine("T2", 0.0, 0.0, 0.5), 9.5, ambient_turbulence, influence_envelope=envelope)
+
+        pruned = 0
+
+        for _ in range(50):
+
+            downwind_separation = random.uniform(1.0, 39.0) * upwind_wake.diameter
+            lateral_separation = random.uniform(0.0, 6.0) * upwind_wake.diameter
+
+            if downwind_wake.in_influence_envelope(downwind_separation, lateral_separation, 0.0, upwind_wake):
+                continue
+
+            pruned += 1
+
+            # the deficit is largest at the closest point of the rotor
+            closest = lateral_separation - 0.5 * downwind_wake.diameter
+
+            cross_section = upwind_wake.calculate_cross_section(downwind_separation)
+
+            assert cross_section.velocity_deficit(closest, 0.0) < threshold
+
+        assert pruned > 0
+
+
+@pytest.mark.parametrize("apply_meander, include_added_turbulence", [
+    (True, False),
+    (True, True),
+    (False, False)])
+def test_radii_bound_random_points(apply_meander, include_added_turbulence):
+
+    envelope = InfluenceEnvelope.build(
+        max_distance=40.0,
+        apply_meander=apply_meander,
+        include_added_turbulence=include_added_turbulence)
+
+    random = np.random.default_rng(2)
+
+    distances = random.uniform(0.0, 40.0, 2000)
+    thrust_coefficients = random.uniform(0.0, 1.0, 2000)
+    turbulences = random.uniform(0.0, 0.4, 2000)
+
+    radii = InfluenceEnvelope.calculate_radii(
+        distances,
+        thrust_coefficients,
+        turbulences,
+        envelope.threshold,
+        apply_meander,
+        include_added_turbulence)
+
+    assert np.any(radii > 0.0)
+    assert np.all(radii <= envelope.radii_at(distances, thrust_coefficients, turbulences))
+
+
+def test_deficit_is_monotonic():
+
+    # the envelope's bound assumes this of the deficit engine
+
+    distances = np.linspace(0.0, 40.0, 81)
+    thrust_coefficients = np.linspace(0.0, 1.0, 41)
+    turbulences = np.linspace(0.0, 0.4, 41)
+
+    deficits = default_deficit_engine.calculate_velocity_deficits(
+        thrust_coefficients[np.newaxis, :, np.newaxis],
+        distances[:, np.newaxis, np.newaxis],
+        turbulences[np.newaxis, np.newaxis, :])
+
+    assert np.all(np.diff(deficits, axis=0) <= 0.0)
+    assert np.all(np.diff(deficits, axis=1) >= 0.0)
+    assert np.all(np.diff(deficits, axis=2) <= 0.0)
+
+
+def test_radius_outside_table_is_none():
+
+    envelope = InfluenceEnvelope.build(max_distance=10.0)
+
+    assert envelope.radius(11.0, 0.8, 0.1) is None
+    assert envelope.radius(5.0, 0.8, 0.5) is None
+    assert envelope.radius(10.0, 1.0, 0.4) is not None
+    assert envelope.radius(5.0, 0.8, 0.1) > 0.5
+
+
+def test_envelope_without_meander_cannot_prune_meandering_wakes():
+
+    envelope = InfluenceEnvelope.build(max_distance=10.0, apply_meander=False)
+
+    with pytest.raises(Exception):
+        TurbineWake(make_turbine("T1", 0.0, 0.0, 0.8), 9.5, 0.1, influence_envelope=envelope)
+
+
+def test_envelope_in_regular_layout():
+
+    turbines = make_grid(4, 4, 500.0, 300.0)
+
+    ambient_conditions = make_ambient_conditions(0.1)
+
+    envelope = InfluenceEnvelope.build(threshold=0.001, max_distance=40.0)
+
+    control_surface = WindFarmWake(turbines=turbines, ambient_conditions=ambient_conditions)
+    enveloped = WindFarmWake(turbines=turbines, ambient_conditions=ambient_conditions, influence_envelope=envelope)
+
+    for control_surface_wake, enveloped_wake in zip(control_surface.turbine_wakes, enveloped.turbine_wakes):
+        assert enveloped_wake.waked_velocity == pytest.approx(control_surface_wake.waked_velocity, abs=0.001 * 9.5)
+
+
+def test_envelope_is_built_from_deficit_engine():
+
+    envelope = InfluenceEnvelope.build(max_distance=10.0, deficit_engine=ScaledDeficitEngine(1.0))
+    no_wakes = InfluenceEnvelope.build(max_distance=10.0, deficit_engine=ScaledDeficitEngine(0.0))
+
+    assert np.array_equal(envelope.radii, InfluenceEnvelope.build(max_distance=10.0).radii)
+    assert np.all(no_wakes.radii == 0.0)
@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+
+from miniwake.interpolation import rect_grid_linear
+from miniwake.interpolation import rect_grid_nearest
+from miniwake.interpolation import direct_rect_grid_linear
+from miniwake.interpolation import direct_rect_grid_nearest
+
+
+def grid():
+
+    cts = np.linspace(0.0, 1.0, 11)
+    turbulences = np.linspace(0.0, 0.4, 5)
+    distances = np.concatenate([[0.0], np.geomspace(2.0, 100.0, 20)])
+
+    ct, turbulence, distance = np.meshgrid(cts, turbulences, distances, indexing='ij')
+    deficits = ct * np.exp(-distance * (0.05 + turbulence)) + 0.1 * turbulence
+
+    return cts, turbulences, distances, deficits
+
+
+@pytest.mark.parametrize("reference_method, direct_method", [
+    (rect_grid_linear, direct_rect_grid_linear),
+    (rect_grid_nearest, direct_rect_grid_nearest)])
+def test_direct_interpolation_matches_regular_grid_interpolator(reference_method, direct_method):
+
+    cts, turbulences, distances, deficits = grid()
+
+    reference = reference_method(cts, turbulences, distances, deficits)
+    direct = direct_method(cts, turbulences, distances, deficits)
+
+    random = np.random.default_rng(1)
+
+    points = [(0.0, 0.0, 0.0), (1.0, 0.4, 100.0), (0.3, 0.1, 2.0), (0.25, 0.3, 51.0)]
+    points += [(random.uniform(0.0, 1.0), random.uniform(0.0, 0.4), random.uniform(0.0, 100.0)) for _ in range(200)]
+
+    for point in points:
+        assert direct(point) == pytest.approx(float(reference(point)), abs=1e-14)
+
+
+def test_direct_interpolation_out_of_bounds():
+
+    direct = direct_rect_grid_linear(*grid())
+
+    with pytest.raises(ValueError):
+        direct((0.5, 0.5, 10.0))
+
+
+@pytest.mark.parametrize("method", [direct_rect_grid_linear, direct_rect_grid_nearest])
+def test_direct_interpolation_of_arrays(method):
+
+    direct = method(*grid())
+
+    cts = np.array([0.0, 0.3, 0.55, 1.0])
+    distances = np.array([[0.0], [2.0], [37.5], [100.0]])
+
+    values = direct((cts, 0.25, distances))
+
+    assert values.shape == (4, 4)
+
+    for i in range(4):
+        for j in range(4):
+            assert values[i, j] == pytest.approx(direct((cts[j], 0.25, distances[i, 0])), abs=1e-14)
+
+    with pytest.raises(ValueError):
+        direct((cts, 0.25, np.array([101.0])))
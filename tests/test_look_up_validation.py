@@ -0,0 +1,58 @@
+import json
+
+from miniwake.velocity_deficit_look_up import VelocityDeficitLookUpBuilder
+from miniwake.velocity_deficit_look_up import VelocityDeficitLookUp
+from miniwake.interpolation import rect_grid_linear
+from miniwake.interpolation import rect_grid_nearest
+
+from miniwake.look_up_validation import sample_domain
+from miniwake.look_up_validation import validate_look_ups
+from miniwake.look_up_validation import write_results
+
+
+def test_sample_domain_covers_look_up_domain():
+
+    cts, distances, turbulences = sample_domain(1000, max_turbulence=0.2, max_distance=20.0)
+
+    assert cts.min() >= 0.1 and cts.max() <= 1.0
+    assert turbulences.min() >= 0.0 and turbulences.max() <= 0.2
+    assert distances.min() >= 2.0 and distances.max() <= 20.0
+
+
+def test_validate_look_ups(tmp_path):
+
+    look_up_folder = str(tmp_path / "look_up")
+
+    VelocityDeficitLookUpBuilder(
+        dist_downwind_step=0.1,
+        thrust_coefficient_step=0.1,
+        turbulence_intensity_step=0.05,
+        max_dist_downwind=20.0,
+        max_turbulence_intensity=0.2,
+        max_thrust_coefficient=1.0,
+        batch=True).save(look_up_folder)
+
+    results = validate_look_ups(
+        {
+            "linear": VelocityDeficitLookUp(look_up_folder, interpolation_method=rect_grid_linear),
+            "nearest": VelocityDeficitLookUp(look_up_folder, interpolation_method=rect_grid_nearest)
+        },
+        number_of_points=50,
+        max_turbulence=0.2,
+        max_distance=20.0)
+
+    linear = results["look_ups"]["linear"]
+    nearest = results["look_ups"]["nearest"]
+
+    assert linear["max_error"] < nearest["max_error"]
+    assert linear["rms_error"] <= linear["max_error"]
+    assert linear["memory_bytes"] == nearest["memory_bytes"]
+    assert linear["batch_queries_per_second"] > 0.0
+
+    assert results["ode"]["warm_queries_per_second"] > results["ode"]["cold_queries_per_second"]
+
+    path = str(tmp_path / "results.json")
+    write_results(results, path)
+
+    with open(path) as f:
+        assert json.load(f) == results
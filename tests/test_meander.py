@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 
 from miniwake.meander import calculate_meander
 
@@ -6,3 +7,24 @@ def test_quarton_added_turbulence():
     result = calculate_meander(0.0, 4.0, 1.0, 1.0)
     assert result.width_meander == 1.0
     assert result.amplitude_meander == 1.0
+
+
+def test_calculate_meander_on_arrays():
+
+    normalized_distances_downwind = np.array([0.0, 2.0, 5.0, 20.0])
+    velocity_deficits = np.array([0.4, 0.3, 0.2, 0.05])
+    normalized_wake_widths = np.array([1.0, 1.1, 1.3, 2.5])
+    ambient_turbulences = np.array([0.1, -0.1, 0.05, 0.2])
+
+    result = calculate_meander(normalized_distances_downwind, velocity_deficits, normalized_wake_widths, ambient_turbulences)
+
+    for i in range(4):
+
+        expected = calculate_meander(
+            float(normalized_distances_downwind[i]),
+            float(velocity_deficits[i]),
+            float(normalized_wake_widths[i]),
+            float(ambient_turbulences[i]))
+
+        assert result.width_meander[i] == pytest.approx(expected.width_meander, rel=1e-15)
+        assert result.amplitude_meander[i] == pytest.approx(expected.amplitude_meander, rel=1e-15)
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 
 from miniwake.near_wake_length import calculate_ambient_turbulence_wake_erosion_rate
 from miniwake.near_wake_length import calculate_angular_velocity
@@ -38,3 +39,27 @@ def test_calculate_total_wake_erosion_rate():
 
 def testcalculate__near_wake_length():
 	assert calculate_near_wake_length(76, 0.7, 15, 3, 10, 0.15) == pytest.approx(140.0160145)
+
+def test_calculate_near_wake_length_on_arrays():
+
+	# spans both branches of the turbulence erosion rate and of the flow field ratio
+	diameters = np.array([76.0, 90.0, 120.0, 76.0, 150.0])
+	thrust_coefficients = np.array([0.7, 0.95, 0.2, 0.8888, 1.2])
+	rpms = np.array([15.0, 12.0, 9.0, 17.0, 8.0])
+	velocities = np.array([10.0, 6.0, 12.0, 8.0, 4.0])
+	turbulences = np.array([0.15, 0.01, 0.02, 0.0, 0.3])
+
+	lengths = calculate_near_wake_length(diameters, thrust_coefficients, rpms, 3, velocities, turbulences)
+
+	# numpy's vector routines can differ from math's in the last bit
+	for i in range(len(diameters)):
+		assert lengths[i] == pytest.approx(calculate_near_wake_length(
+			float(diameters[i]),
+			float(thrust_coefficients[i]),
+			float(rpms[i]),
+			3,
+			float(velocities[i]),
+			float(turbulences[i])), rel=1e-15)
+
+	assert np.array_equal(calculate_ambient_turbulence_wake_erosion_rate(turbulences), [calculate_ambient_turbulence_wake_erosion_rate(float(t)) for t in turbulences])
+	assert np.array_equal(calculate_flow_field_ratio(thrust_coefficients), [calculate_flow_field_ratio(float(ct)) for ct in thrust_coefficients])
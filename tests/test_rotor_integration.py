@@ -1,6 +1,12 @@
+import numpy as np
 import pytest
 
 from miniwake.rotor_integration import VelocityDeficitIntegrator
+from miniwake.rotor_integration import AddedTurbulenceIntegrator
+from miniwake.rotor_integration import VectorVelocityDeficitIntegrator
+from miniwake.rotor_integration import VectorAddedTurbulenceIntegrator
+from miniwake.rotor_integration import GaussVelocityDeficitIntegrator
+from miniwake.rotor_integration import GaussAddedTurbulenceIntegrator
 
 
 def one(lateral_offset, vertical_offset):
@@ -12,3 +18,58 @@ def test_rotor_integration():
     integrated, impactive = integrator.calculate(90.0, one)
     assert integrated == 1.0
     assert impactive == 2
+
+
+def ring(lateral_offsets, vertical_offsets):
+    return lateral_offsets * lateral_offsets + vertical_offsets, (vertical_offsets > 0.0).astype(int)
+
+
+def test_vector_rotor_integration_matches_sections():
+
+    def section(lateral_offset, vertical_offset):
+        return ring(np.array(lateral_offset), np.array(vertical_offset))
+
+    for integrator, vector_integrator in (
+            (VelocityDeficitIntegrator(), VectorVelocityDeficitIntegrator()),
+            (AddedTurbulenceIntegrator(), VectorAddedTurbulenceIntegrator())):
+
+        integrated, impactive = integrator.calculate(90.0, section)
+        vector_integrated, vector_impactive = vector_integrator.calculate(90.0, ring)
+
+        assert vector_integrated == pytest.approx(integrated, rel=1e-14)
+        assert vector_impactive == impactive == 1
+
+
+@pytest.mark.parametrize("radial_points, angular_points", [(2, 4), (3, 8), (5, 12)])
+def test_gauss_rotor_integration_of_polynomials(radial_points, angular_points):
+
+    integrator = GaussVelocityDeficitIntegrator(radial_points, angular_points)
+
+    def constant(lateral_offsets, vertical_offsets):
+        return np.ones(lateral_offsets.shape), np.zeros(lateral_offsets.shape, dtype=int)
+
+    def radius_sq(lateral_offsets, vertical_offsets):
+        return lateral_offsets * lateral_offsets + vertical_offsets * vertical_offsets, (lateral_offsets > 0.0).astype(int)
+
+    def lateral_sq(lateral_offsets, vertical_offsets):
+        return lateral_offsets * lateral_offsets, np.zeros(lateral_offsets.shape, dtype=int)
+
+    diameter = 90.0
+
+    assert integrator.calculate(diameter, constant)[0] == pytest.approx(1.0, rel=1e-14)
+
+    # mean over a disc of the squared radius is D^2 / 8 and of x^2 half that
+    integrated, impactive = integrator.calculate(diameter, radius_sq)
+    assert integrated == pytest.approx(diameter * diameter / 8.0, rel=1e-12)
+    assert impactive == 1
+
+    assert integrator.calculate(diameter, lateral_sq)[0] == pytest.approx(diameter * diameter / 16.0, rel=1e-12)
+
+
+def test_gauss_added_turbulence_is_maximum():
+
+    integrator = GaussAddedTurbulenceIntegrator(2, 4)
+
+    integrated, _ = integrator.calculate(90.0, ring)
+
+    assert integrated == pytest.approx(np.max(ring(integrator.lateral_array * 90.0, integrator.vertical_array * 90.0)[0]))
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from miniwake.rotor_overlap import calculate_rotor_averaged_shape
+from miniwake.rotor_overlap import calculate_top_hat_overlap
+from miniwake.rotor_overlap import RotorOverlapTable
+from miniwake.rotor_integration import RotorOverlapIntegrator
+from miniwake.rotor_integration import AddedTurbulenceIntegrator
+from miniwake.turbine import Turbine
+from miniwake.turbine import FixedThrustCurve
+from miniwake.wind_farm_wake import WindFarmWake
+from miniwake.ambient import FixedAmbientConditions
+
+
+def disc_average(function, normalised_offset, normalised_diameter, points=400):
+
+    # mean over a fine grid of points on the disc
+
+    grid = (np.arange(points) + 0.5) / points - 0.5
+
+    x, y = np.meshgrid(grid * normalised_diameter, grid * normalised_diameter)
+
+    on_disc = x * x + y * y <= 0.25 * normalised_diameter * normalised_diameter
+
+    x = x[on_disc] + normalised_offset
+    y = y[on_disc]
+
+    return np.mean(function(x * x + y * y))
+
+
+@pytest.mark.parametrize("normalised_offset, normalised_diameter", [
+    (0.0, 1.0),
+    (0.7, 0.5),
+    (1.5, 2.0),
+    (2.5, 3.0)])
+def test_rotor_averaged_shape(normalised_offset, normalised_diameter):
+
+    expected = disc_average(
+        lambda r_sq: np.exp(-3.56 * r_sq),
+        normalised_offset,
+        normalised_diameter)
+
+    assert calculate_rotor_averaged_shape(normalised_offset, normalised_diameter) == pytest.approx(expected, abs=1e-4)
+
+
+@pytest.mark.parametrize("normalised_offset, normalised_diameter", [
+    (0.5, 1.0),
+    (1.0, 1.0),
+    (0.3, 3.0),
+    (1.9, 2.0)])
+def test_top_hat_overlap(normalised_offset, normalised_diameter):
+
+    expected = disc_average(
+        lambda r_sq: (r_sq < 1.0).astype(float),
+        normalised_offset,
+        normalised_diameter)
+
+    assert calculate_top_hat_overlap(normalised_offset, normalised_diameter) == pytest.approx(expected, abs=1e-3)
+
+
+def test_top_hat_overlap_limits():
+
+    fractions = calculate_top_hat_overlap(
+        np.array([0.0, 0.0, 3.0, 0.5, 1.0]),
+        np.array([1.0, 4.0, 1.0, 0.0, 0.0]))
+
+    assert fractions == pytest.approx([1.0, 0.25, 0.0, 1.0, 0.0])
+
+
+def test_table_matches_direct_calculation():
+
+    table = RotorOverlapTable.build()
+
+    random = np.random.default_rng(0)
+
+    normalised_offsets = random.uniform(0.0, 4.0, 1000)
+    normalised_diameters = random.uniform(0.0, 6.0, 1000)
+
+    expected = calculate_rotor_averaged_shape(normalised_offsets, normalised_diameters)
+
+    assert np.max(np.abs(table.shape_factor(normalised_offsets, normalised_diameters) - expected)) < 5e-4
+
+    # beyond the cut off
+    assert table.shape_factor(3.1, 2.0) == 0.0
+
+
+def test_single_wake_rotor_overlap():
+
+    upwind_turbine = Turbine(
+        name="T1",
+        x=0.0,
+        y=0.0,
+        hub_height=80.0,
+        diameter=76.0,
+        rotational_speed_rpm=17.0,
+        thrust_curve=FixedThrustCurve(0.7))
+
+    downwind_turbine = Turbine(
+        name="T2",
+        x=6.0 * 76.0,
+        y=0.6 * 76.0,
+        hub_height=80.0,
+        diameter=76.0,
+        rotational_speed_rpm=17.0,
+        thrust_curve=FixedThrustCurve(0.7))
+
+    integrator = RotorOverlapIntegrator()
+
+    wind_farm_wake = WindFarmWake(
+        turbines=[upwind_turbine, downwind_turbine],
+        ambient_conditions=FixedAmbientConditions(fixed_velocity=9.5, fixed_turbulence=0.1),
+        velocity_deficit_integrator=integrator,
+        added_turbulence_integrator=AddedTurbulenceIntegrator())
+
+    upwind_wake, downwind_wake = wind_farm_wake.turbine_wakes
+
+    cross_section = upwind_wake.calculate_cross_section(downwind_turbine.x)
+
+    width = cross_section.width
+
+    expected = cross_section.velocity_deficit.velocity_deficit * disc_average(
+        lambda r_sq: np.where(r_sq <= 4.0, np.exp(-3.56 * r_sq), 0.0),
+        downwind_turbine.y / width,
+        downwind_turbine.diameter / width)
+
+    assert downwind_wake.velocity_deficit == pytest.approx(expected, abs=1e-4)
+    assert downwind_wake.velocity_deficit > 0.05
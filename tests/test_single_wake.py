@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 
 from miniwake.single_wake import SingleWake
 from miniwake.turbine import Turbine
@@ -39,3 +40,156 @@ def test_single_wake():
     assert wake.added_turbulence(0.0, 0.0) == pytest.approx(0.080722728)
     assert wake.added_turbulence(28.5, 0.0) == pytest.approx(0.080722728)
 
+
+
+def test_single_wake_cross_section_on_arrays():
+
+    upwind_turbine = Turbine(
+        name="T1",
+        x=0.0,
+        y=0.0,
+        hub_height=80.0,
+        diameter=76.0,
+        rotational_speed_rpm=17.0,
+        thrust_curve=FixedThrustCurve(0.4))
+
+    single_wake = SingleWake(
+        ambient_turbulence_intensity=0.1,
+        upwind_turbine=upwind_turbine,
+        upwind_velocity=9.5,
+        upwind_local_turbulence_intensity=0.1)
+
+    wake = single_wake.calculate(upwind_turbine.diameter * 4.0)
+
+    # spans both the top-hat edge and the 4.0 shape cut-off
+    lateral = np.linspace(-200.0, 200.0, 41)
+    vertical = np.array([[0.0], [30.0], [60.0]])
+
+    velocity_deficits = wake.velocity_deficit(lateral, vertical)
+    added_turbulences = wake.added_turbulence(lateral, vertical)
+
+    assert velocity_deficits.shape == (3, 41)
+    assert added_turbulences.shape == (3, 41)
+
+    for i in range(3):
+        for j in range(41):
+            assert velocity_deficits[i, j] == pytest.approx(wake.velocity_deficit(lateral[j], vertical[i, 0]), rel=1e-12, abs=1e-15)
+            assert added_turbulences[i, j] == wake.added_turbulence(lateral[j], vertical[i, 0])
+
+    assert np.any(velocity_deficits == 0.0)
+    assert np.any(added_turbulences == 0.0)
+
+    no_wake = single_wake.calculate(-10.0)
+
+    assert np.array_equal(no_wake.velocity_deficit(lateral, 0.0), np.zeros(41))
+    assert np.array_equal(no_wake.added_turbulence(lateral, 0.0), np.zeros(41))
+
+
+def test_single_wake_cross_section_cache():
+
+    upwind_turbine = Turbine(
+        name="T1",
+        x=0.0,
+        y=0.0,
+        hub_height=80.0,
+        diameter=76.0,
+        rotational_speed_rpm=17.0,
+        thrust_curve=FixedThrustCurve(0.4))
+
+    def single_wake(**kwargs):
+        return SingleWake(
+            ambient_turbulence_intensity=0.1,
+            upwind_turbine=upwind_turbine,
+            upwind_velocity=9.5,
+            upwind_local_turbulence_intensity=0.1,
+            **kwargs)
+
+    uncached = single_wake()
+    cached = single_wake(cross_section_cache_size=2)
+
+    assert uncached.cross_section_cache is None
+
+    for distance in [400.0, 400.0, 600.0, 400.0 + 1e-9, 800.0, 400.0]:
+
+        cross_section = cached.calculate(distance)
+        expected = uncached.calculate(distance)
+
+        assert cross_section.width == pytest.approx(expected.width, abs=1e-9)
+        assert cross_section.velocity_deficit(20.0, 0.0) == pytest.approx(expected.velocity_deficit(20.0, 0.0), abs=1e-9)
+        assert cross_section.added_turbulence(20.0, 0.0) == pytest.approx(expected.added_turbulence(20.0, 0.0), abs=1e-9)
+
+    # 400 + 1e-9 rounds to 400, which is then most recently used so 800 evicts 600
+    assert cached.cross_section_cache.hits == 3
+    assert cached.cross_section_cache.misses == 3
+    assert 600.0 / cached.cross_section_quantum not in cached.cross_section_cache
+
+
+@pytest.mark.parametrize("apply_meander", [True, False])
+@pytest.mark.parametrize("thrust_coefficient", [0.4, 0.0])
+def test_single_wake_calculate_many_matches_calculate(apply_meander, thrust_coefficient):
+
+    upwind_turbine = Turbine(
+        name="T1",
+        x=0.0,
+        y=0.0,
+        hub_height=80.0,
+        diameter=76.0,
+        rotational_speed_rpm=17.0,
+        thrust_curve=FixedThrustCurve(thrust_coefficient))
+
+    single_wake = SingleWake(
+        ambient_turbulence_intensity=0.1,
+        upwind_turbine=upwind_turbine,
+        upwind_velocity=9.5,
+        upwind_local_turbulence_intensity=0.12,
+        apply_meander=apply_meander)
+
+    distances = np.array([-50.0, 0.0, 50.0, 152.0, 400.0, 400.0, 1234.5, 5000.0])
+
+    cross_sections = single_wake.calculate_many(distances)
+
+    assert len(cross_sections) == len(distances)
+    assert np.array_equal(cross_sections.in_wake, distances > 0.0 if thrust_coefficient > 0.0 else np.zeros(8, dtype=bool))
+
+    lateral_distances = np.linspace(0.0, 100.0, len(distances))
+
+    velocity_deficits = cross_sections.velocity_deficit(lateral_distances, 10.0)
+    added_turbulences = cross_sections.added_turbulence(lateral_distances, 10.0)
+
+    for i, distance in enumerate(distances):
+
+        expected = single_wake.calculate(distance)
+
+        assert velocity_deficits[i] == pytest.approx(expected.velocity_deficit(lateral_distances[i], 10.0), abs=1e-12)
+        assert added_turbulences[i] == pytest.approx(expected.added_turbulence(lateral_distances[i], 10.0), abs=1e-12)
+
+        cross_section = cross_sections[i]
+
+        assert type(cross_section) is type(expected)
+        assert cross_section.velocity_deficit(lateral_distances[i], 10.0) == pytest.approx(expected.velocity_deficit(lateral_distances[i], 10.0), abs=1e-12)
+
+        if cross_sections.in_wake[i]:
+            assert cross_section.width == pytest.approx(expected.width, rel=1e-12)
+
+
+def test_cross_sections_have_no_instance_dictionary():
+
+    upwind_turbine = Turbine(
+        name="T1",
+        x=0.0,
+        y=0.0,
+        hub_height=80.0,
+        diameter=76.0,
+        rotational_speed_rpm=17.0,
+        thrust_curve=FixedThrustCurve(0.4))
+
+    single_wake = SingleWake(
+        ambient_turbulence_intensity=0.1,
+        upwind_turbine=upwind_turbine,
+        upwind_velocity=9.5,
+        upwind_local_turbulence_intensity=0.1)
+
+    wake = single_wake.calculate(upwind_turbine.diameter * 4.0)
+
+    for value in [wake, wake.velocity_deficit, wake.added_turbulence, single_wake.calculate(0.0)]:
+        assert not hasattr(value, "__dict__")
@@ -4,6 +4,8 @@ from miniwake.turbine import Turbine
 from miniwake.turbine import FixedThrustCurve
 from miniwake.turbine_wake import TurbineWake
 
+from .layouts import make_turbine
+
 
 class RotorCenterIntegrator:
 
@@ -113,3 +115,45 @@ def test_combined_wake_one_diameter_downwind():
     assert downwind_wake.waked_velocity == pytest.approx(ambient_velocity * (1 - 0.2910), abs=0.005)
     assert downwind_wake.waked_turbulence == pytest.approx(0.204077306)
 
+
+def test_only_interacting_wakes_are_stored():
+
+    upwind_wakes = [
+        TurbineWake(make_turbine("T1", 0.0, 0.0), 9.5, 0.1),
+        TurbineWake(make_turbine("T2", 10.0, 3000.0), 9.5, 0.1),
+        TurbineWake(make_turbine("T3", 20.0, 50.0), 9.5, 0.1)]
+
+    for upwind_wake in upwind_wakes:
+        upwind_wake.calculate()
+
+    downwind_wake = TurbineWake(make_turbine("T4", 500.0, 0.0), 9.5, 0.1)
+
+    for upwind_wake in upwind_wakes:
+        downwind_wake.add_wake(upwind_wake)
+
+    assert downwind_wake.number_of_added_wakes == 3
+    assert len(downwind_wake.interacting_wakes) == 2
+    assert [wake.x for wake in downwind_wake.wakes] == [0.0, 20.0]
+
+    # the ordering check still applies to wakes that are not stored
+    with pytest.raises(Exception):
+        downwind_wake.add_wake(upwind_wakes[1])
+
+
+def test_recalculate_tests_wakes_that_did_not_interact():
+
+    upwind_wake = TurbineWake(make_turbine("A", 0.0, 0.0), 9.5, 0.02)
+    upwind_wake.calculate()
+
+    downwind_wake = TurbineWake(make_turbine("B", 1500.0, 300.0), 9.5, 0.02)
+    downwind_wake.add_wake(upwind_wake)
+    downwind_wake.calculate()
+
+    assert len(downwind_wake.interacting_wakes) == 0
+    assert downwind_wake.waked_velocity == 9.5
+
+    upwind_wake.recalculate(9.5, 0.15, [])
+    downwind_wake.recalculate(9.5, 0.15, [upwind_wake])
+
+    assert len(downwind_wake.interacting_wakes) == 1
+    assert downwind_wake.waked_velocity < 9.5
@@ -1,9 +1,18 @@
 import pytest
 import math
+import numpy as np
 
 from miniwake.velocity_deficit import calculate_velocity_deficit
+from miniwake.velocity_deficit import calculate_velocity_deficits
 from miniwake.velocity_deficit import calculate_shape
 from miniwake.velocity_deficit import calculate_width
+from miniwake.velocity_deficit import solve_velocity_deficit
+from miniwake.velocity_deficit import solve_velocity_deficits
+from miniwake.velocity_deficit import solve_cached_velocity_deficits
+from miniwake.velocity_deficit import VelocityDeficitTrajectoryCache
+from miniwake.velocity_deficit import VelocityDeficitTrajectory
+from miniwake.velocity_deficit import AdaptiveVelocityDeficitTrajectory
+from miniwake.velocity_deficit import AdaptiveAndersonSimplifiedSolution
 
 
 def test_calculate_velocity_deficit():
@@ -14,5 +23,176 @@ def test_calculate_shape():
     assert calculate_shape(math.sqrt(1.0 / 3.56)) == pytest.approx(math.exp(-1.0))
 
 
+def test_calculate_shape_on_arrays():
+
+	positions = np.array([0.0, math.sqrt(1.0 / 3.56), 2.0, 2.0001])
+
+	assert calculate_shape(positions) == pytest.approx([calculate_shape(float(x)) for x in positions])
+	assert calculate_shape(positions)[-1] == 0.0
+
+
 def test_calculate_wake_width():
 	assert calculate_width(0.4, 0.229031) == pytest.approx(71.20098095 / 76.0)
+
+
+def test_solve_velocity_deficits_matches_scalar_solver():
+
+	thrust_coefficients = np.array([0.4, 0.8, 0.4])
+	distances = np.array([10.0, 20.0, 1.0])
+	turbulences = np.array([0.1, 0.05, 0.1])
+
+	deficits = solve_velocity_deficits(thrust_coefficients, distances, turbulences)
+
+	for i in range(len(deficits)):
+		assert deficits[i] == pytest.approx(
+			solve_velocity_deficit(thrust_coefficients[i], distances[i], turbulences[i]),
+			abs=1e-12)
+
+
+def test_trajectory_cache_reuses_and_extends_trajectories():
+
+	cache = VelocityDeficitTrajectoryCache(maxsize=2)
+
+	near = solve_velocity_deficit(0.4, 5.0, 0.1, trajectory_cache=cache)
+	far = solve_velocity_deficit(0.4, 20.0, 0.1, trajectory_cache=cache)
+
+	assert len(cache.trajectories) == 1
+	assert cache.trajectories.hits == 1
+	assert cache.trajectory(0.4, 0.1).distances[-1] >= 20.0
+
+	assert solve_velocity_deficit(0.4, 5.0, 0.1, trajectory_cache=cache) == near
+	assert far == pytest.approx(solve_velocity_deficits(0.4, 20.0, 0.1), abs=1e-12)
+
+	solve_velocity_deficit(0.5, 5.0, 0.1, trajectory_cache=cache)
+	solve_velocity_deficit(0.6, 5.0, 0.1, trajectory_cache=cache)
+
+	assert len(cache.trajectories) == 2
+	assert (round(0.4 / cache.quantum), round(0.1 / cache.quantum)) not in cache.trajectories
+
+
+def test_cache_integrates_missing_trajectories_together():
+
+	thrust_coefficients = np.array([0.4, 0.8, 0.4, 0.6])
+	distances = np.array([10.0, 20.0, 30.0, 5.0])
+	turbulences = np.array([0.1, 0.05, 0.1, 0.15])
+
+	cache = VelocityDeficitTrajectoryCache()
+
+	deficits = solve_cached_velocity_deficits(thrust_coefficients, distances, turbulences, trajectory_cache=cache)
+
+	trajectories = cache.trajectories.values()
+
+	assert len(trajectories) == 3
+	assert len(set(trajectory.group for trajectory in trajectories)) == 1
+
+	serial_cache = VelocityDeficitTrajectoryCache()
+
+	for i in range(len(deficits)):
+		assert deficits[i] == pytest.approx(
+			solve_velocity_deficit(thrust_coefficients[i], distances[i], turbulences[i], trajectory_cache=serial_cache),
+			abs=1e-9)
+
+
+def test_batch_without_initial_deficit_has_no_wake():
+
+	# ct=0.05, ti=0.1 gives a negative initial deficit, the other case is unaffected
+
+	deficits = solve_velocity_deficits([0.05, 0.4], 10.0, 0.1)
+
+	assert deficits[0] == 0.0
+	assert deficits[1] == pytest.approx(solve_velocity_deficit(0.4, 10.0, 0.1), abs=1e-12)
+
+	# the initial deficit is zero at this ct for ti=0.2, up to rounding
+	deficits = solve_velocity_deficits([0.05 * 0.8 / 0.68, 0.4], 10.0, 0.2)
+
+	assert deficits[0] == 0.0
+	assert deficits[1] > 0.0
+
+
+# Speed / accuracy of the adaptive (dense output) solver against the fixed step solver
+#
+# The fixed step solver takes ~10,000 RK45 steps of 0.1D to reach 1000D (~1s).
+# The adaptive solver (RK45, rtol=1e-6) takes ~50 steps for the same range (~15ms)
+# and is within ~1e-5 of a tightly converged (DOP853, rtol=1e-12) solution,
+# whereas the fixed step solver is within ~1e-4, its largest error being at the
+# infinite gradient of the filter function at 4.5D. Loosening rtol to 1e-4 halves
+# the steps again with errors up to ~4e-4; tightening to 1e-8 doubles them for ~1e-7.
+
+
+@pytest.mark.parametrize("thrust_coefficient, turbulence", [(0.4, 0.1), (0.8, 0.05), (1.0, 0.25)])
+def test_adaptive_solver_agrees_with_fixed_step_solver(thrust_coefficient, turbulence):
+
+	fixed = VelocityDeficitTrajectory(thrust_coefficient, turbulence, maximum_distance_downstream=11000.0)
+	adaptive = AdaptiveVelocityDeficitTrajectory(thrust_coefficient, turbulence, maximum_distance_downstream=11000.0)
+
+	for distance in [1.0, 2.5, 4.0, 4.5, 5.0, 6.0, 10.0, 25.0, 100.0]:
+		assert adaptive(distance) == pytest.approx(fixed(distance), abs=0.0002)
+
+	# adaptive steps cover 2D to 11000D, fixed steps only 2D to 100D
+	assert adaptive.number_of_steps * 10 < len(fixed.distances)
+
+
+def test_adaptive_solver_jacobian():
+
+	solution = AdaptiveAndersonSimplifiedSolution(10.0, [0.4, 0.8], [0.1, 0.05])
+
+	center_line_velocity = np.array([7.0, 6.0])
+	step = 1e-6
+
+	numerical = (solution(10.0, center_line_velocity + step) - solution(10.0, center_line_velocity - step)) / (2.0 * step)
+
+	assert np.diag(solution.jacobian(10.0, center_line_velocity)) == pytest.approx(numerical, rel=1e-6)
+
+
+def test_adaptive_solver_with_jacobian_method():
+
+	adaptive = AdaptiveVelocityDeficitTrajectory(0.4, 0.1, method='Radau', rtol=1e-6)
+
+	assert adaptive(10.0) == pytest.approx(solve_velocity_deficit(0.4, 10.0, 0.1), abs=0.0002)
+
+
+def test_calculate_velocity_deficits_matches_scalar_calculation():
+
+	thrust_coefficients = np.array([[0.4], [1.2], [0.2]])
+	distances = np.array([0.5, 4.0, 12.0, 30.0])
+
+	deficits = calculate_velocity_deficits(thrust_coefficients, distances, 0.1)
+
+	assert deficits.shape == (3, 4)
+
+	for i in range(3):
+		for j in range(4):
+			assert deficits[i, j] == pytest.approx(
+				calculate_velocity_deficit(thrust_coefficients[i, 0], distances[j], 0.1),
+				abs=1e-12)
+
+
+def test_calculate_velocity_deficits_validation():
+
+	with pytest.raises(Exception):
+		calculate_velocity_deficits([0.4, -0.1], 10.0, 0.1)
+
+	with pytest.raises(Exception):
+		calculate_velocity_deficits(0.4, [10.0, -1.0], 0.1)
+
+
+@pytest.mark.parametrize("thrust_coefficient, distance, turbulence, message", [
+	(-0.1, 10.0, 0.1, "Negative wake thrust coefficient"),
+	(0.4, 10.0, -0.1, "Negative wake turbulence"),
+	(0.4, -1.0, 0.1, "Negative wake distance")])
+def test_scalar_and_array_validation_messages_agree(thrust_coefficient, distance, turbulence, message):
+
+	with pytest.raises(Exception, match=message):
+		calculate_velocity_deficit(thrust_coefficient, distance, turbulence)
+
+	with pytest.raises(Exception, match=message):
+		calculate_velocity_deficits([thrust_coefficient], [distance], [turbulence])
+
+
+def test_adaptive_trajectory_evaluates_arrays():
+
+	adaptive = AdaptiveVelocityDeficitTrajectory(0.4, 0.1)
+
+	distances = np.array([1.0, 2.0, 4.5, 5.0, 5.5, 100.0, 2000.0])
+
+	assert adaptive.evaluate(distances) == pytest.approx([adaptive(distance) for distance in distances], abs=1e-14)
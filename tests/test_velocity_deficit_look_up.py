@@ -0,0 +1,175 @@
+import pytest
+import numpy as np
+
+from miniwake import velocity_deficit
+from miniwake.interpolation import rect_grid_linear
+from miniwake.interpolation import direct_rect_grid_linear
+
+from miniwake.velocity_deficit_look_up import VelocityDeficitLookUpBuilder
+from miniwake.velocity_deficit_look_up import VelocityDeficitLookUp
+
+
+def build(max_turbulence_intensity=0.2, dist_downwind_step=0.5, **kwargs):
+
+    return VelocityDeficitLookUpBuilder(
+        dist_downwind_step=dist_downwind_step,
+        thrust_coefficient_step=0.5,
+        turbulence_intensity_step=0.1,
+        max_dist_downwind=20.0,
+        max_turbulence_intensity=max_turbulence_intensity,
+        max_thrust_coefficient=1.0,
+        **kwargs)
+
+
+def test_parallel_build_is_identical_to_serial_build():
+
+    progress = []
+
+    serial = build()
+    parallel = build(workers=2, progress=lambda completed, total, ct, turbulence: progress.append((completed, total)))
+
+    assert np.array_equal(serial.deficits, parallel.deficits)
+
+    assert len(progress) == 9
+    assert progress[-1] == (9, 9)
+
+
+def test_batch_build_matches_serial_build():
+
+    serial = build()
+    batch = build(batch=True)
+
+    assert batch.deficits == pytest.approx(serial.deficits, abs=1e-12)
+
+
+def test_batch_build_rejects_conflicting_options(tmp_path):
+
+    with pytest.raises(ValueError):
+        build(batch=True, workers=2)
+
+    with pytest.raises(ValueError):
+        build(batch=True, checkpoint_folder=str(tmp_path / "checkpoint"))
+
+
+def test_checkpointed_build_resumes_from_completed_cells(tmp_path):
+
+    checkpoint_folder = str(tmp_path / "checkpoint")
+
+    first = build(checkpoint_folder=checkpoint_folder)
+
+    calculated = []
+
+    resumed = build(
+        checkpoint_folder=checkpoint_folder,
+        progress=lambda completed, total, ct, turbulence: calculated.append((ct, turbulence)))
+
+    assert len(calculated) == 0
+    assert np.array_equal(first.deficits, resumed.deficits)
+
+
+def test_build_extends_existing_look_up_to_wider_grid(tmp_path):
+
+    look_up_folder = str(tmp_path / "look_up")
+
+    build().save(look_up_folder)
+
+    calculated = []
+
+    extended = VelocityDeficitLookUpBuilder(
+        dist_downwind_step=0.5,
+        thrust_coefficient_step=0.5,
+        turbulence_intensity_step=0.1,
+        max_dist_downwind=20.0,
+        max_turbulence_intensity=0.3,
+        max_thrust_coefficient=1.0,
+        extend_from=look_up_folder,
+        progress=lambda completed, total, ct, turbulence: calculated.append((ct, turbulence)))
+
+    assert len(calculated) == 3
+    assert all(turbulence == pytest.approx(0.3) for _, turbulence in calculated)
+
+    assert extended.deficits == pytest.approx(build(max_turbulence_intensity=0.3).deficits, abs=1e-12)
+
+
+def test_single_file_look_up_matches_folder_look_up(tmp_path):
+
+    builder = build()
+
+    folder = str(tmp_path / "look_up")
+    path = str(tmp_path / "look_up.mwlu")
+
+    builder.save(folder)
+    builder.save_file(path)
+
+    folder_look_up = VelocityDeficitLookUp(folder)
+    file_look_up = VelocityDeficitLookUp(path, verify=True)
+
+    assert file_look_up.look_up_file.build_parameters["max_dist_downwind"] == 20.0
+    assert file_look_up.max_turbulence == folder_look_up.max_turbulence
+
+    for ct, distance, turbulence in [(0.4, 10.0, 0.1), (0.75, 3.3, 0.05), (1.0, 20.0, 0.2)]:
+        assert file_look_up(ct, distance, turbulence) == folder_look_up(ct, distance, turbulence)
+
+
+def test_single_file_look_up_detects_corruption(tmp_path):
+
+    path = str(tmp_path / "look_up.mwlu")
+
+    build().save_file(path)
+
+    with open(path, "r+b") as f:
+        f.seek(-8, 2)
+        f.write(b"\1" * 8)
+
+    with pytest.raises(Exception):
+        VelocityDeficitLookUp(path, verify=True)
+
+
+def test_adaptive_distance_grid_meets_tolerance_with_fewer_distances(tmp_path):
+
+    uniform = build(batch=True, dist_downwind_step=0.05)
+    adaptive = build(batch=True, dist_downwind_step=0.05, distance_grid="adaptive", distance_tolerance=1e-4)
+
+    assert len(adaptive.distances) * 4 < len(uniform.distances)
+
+    adaptive.save(str(tmp_path / "look_up"))
+    look_up = VelocityDeficitLookUp(str(tmp_path / "look_up"))
+
+    for i, ct in enumerate(uniform.cts):
+        for j, turbulence in enumerate(uniform.turbulences):
+            for k, distance in enumerate(uniform.distances):
+                assert look_up(ct, distance, turbulence) == pytest.approx(uniform.deficits[i, j, k], abs=1e-4)
+
+
+def test_log_distance_grid():
+
+    look_up = build(batch=True, distance_grid="log")
+
+    assert look_up.distances[0] == 0.0
+    assert look_up.distances[1] == 2.0
+    assert look_up.distances[2] - look_up.distances[1] <= 0.5
+    assert look_up.distances[-1] == pytest.approx(20.0)
+    assert np.all(np.diff(look_up.distances[1:]) > 0.0)
+
+
+@pytest.mark.parametrize("interpolation_method", [rect_grid_linear, direct_rect_grid_linear])
+def test_calculate_velocity_deficits_with_look_up(tmp_path, monkeypatch, interpolation_method):
+
+    build(batch=True).save(str(tmp_path / "look_up"))
+
+    monkeypatch.setattr(
+        velocity_deficit,
+        "velocity_deficit_look_up",
+        VelocityDeficitLookUp(str(tmp_path / "look_up"), interpolation_method=interpolation_method))
+
+    thrust_coefficients = np.array([0.0, 0.4, 0.9, 1.3])
+    distances = np.array([[1.0], [7.3], [20.0]])
+    turbulences = np.array([0.05, 0.1, 0.15, 0.5])
+
+    deficits = velocity_deficit.calculate_velocity_deficits(thrust_coefficients, distances, turbulences)
+
+    for i in range(3):
+        for j in range(4):
+            assert deficits[i, j] == pytest.approx(
+                velocity_deficit.calculate_velocity_deficit(thrust_coefficients[j], distances[i, 0], turbulences[j]),
+                abs=1e-14)
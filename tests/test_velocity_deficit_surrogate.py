@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+
+from miniwake import velocity_deficit
+from miniwake.velocity_deficit import solve_velocity_deficit
+from miniwake.velocity_deficit import solve_velocity_deficits
+from miniwake.velocity_deficit_surrogate import VelocityDeficitSurrogate
+
+
+@pytest.fixture(scope="module")
+def surrogate():
+    return VelocityDeficitSurrogate.fit(max_distance=50.0)
+
+
+def test_surrogate_accuracy_and_footprint(surrogate):
+
+    assert surrogate.max_error < 0.005
+    assert surrogate.nbytes < 64 * 1024
+
+    for ct, distance, turbulence in [(0.4, 10.0, 0.1), (0.8, 4.5, 0.05), (1.0, 2.0, 0.3), (0.2, 40.0, 0.01)]:
+        assert surrogate(ct, distance, turbulence) == pytest.approx(
+            solve_velocity_deficit(ct, distance, turbulence),
+            abs=surrogate.max_error)
+
+
+def test_surrogate_error_bound_covers_random_points(surrogate):
+
+    random = np.random.default_rng(0)
+
+    cts = random.uniform(0.0, surrogate.max_thrust_coefficient, 2000)
+    turbulences = random.uniform(0.0, surrogate.max_turbulence, 2000)
+    distances = random.uniform(2.0, surrogate.max_distance, 2000)
+
+    errors = np.abs(surrogate(cts, distances, turbulences) - solve_velocity_deficits(cts, distances, turbulences))
+
+    assert np.max(errors) <= surrogate.max_error
+    assert surrogate.validate() == surrogate.max_error
+
+
+def test_surrogate_at_small_thrust_coefficients(surrogate):
+
+    # no wake below the onset (about 0.06 at 0.2 turbulence), a steep rise above it
+
+    assert surrogate(0.0, 10.0, 0.2) == 0.0
+    assert surrogate(0.05, 10.0, 0.2) == 0.0
+
+    for ct in [0.06, 0.07, 0.1]:
+        assert surrogate(ct, 10.0, 0.2) == pytest.approx(solve_velocity_deficit(ct, 10.0, 0.2), abs=surrogate.max_error)
+
+    assert surrogate(0.1, 10.0, 0.2) > 0.0
+
+
+def test_surrogate_shared_pair_matches_scattered(surrogate):
+
+    distances = np.linspace(2.0, 50.0, 100)
+
+    shared = surrogate(0.4, distances, 0.1)
+
+    # a second pair sends every point through the scattered evaluation
+    scattered = surrogate(np.append(np.full(100, 0.4), 0.5), np.append(distances, 10.0), 0.1)
+
+    assert shared == pytest.approx(scattered[:100], abs=1e-14)
+
+
+def test_surrogate_batched_evaluation(surrogate):
+
+    cts = np.array([0.3, 0.3, 0.7])
+    distances = np.array([[1.0], [5.0], [30.0]])
+
+    values = surrogate(cts, distances, 0.1)
+
+    assert values.shape == (3, 3)
+
+    for i in range(3):
+        for j in range(3):
+            assert values[i, j] == pytest.approx(surrogate(cts[j], distances[i, 0], 0.1), abs=1e-14)
+
+    with pytest.raises(ValueError):
+        surrogate(0.4, 60.0, 0.1)
+
+
+def test_surrogate_save_and_load(surrogate, tmp_path):
+
+    path = str(tmp_path / "surrogate.npz")
+
+    surrogate.save(path)
+    loaded = VelocityDeficitSurrogate.load(path)
+
+    assert loaded.max_error == surrogate.max_error
+    assert loaded(0.4, 10.0, 0.1) == surrogate(0.4, 10.0, 0.1)
+
+
+def test_surrogate_as_velocity_deficit_look_up(surrogate, monkeypatch):
+
+    monkeypatch.setattr(velocity_deficit, "velocity_deficit_look_up", surrogate)
+
+    assert velocity_deficit.calculate_velocity_deficit(0.4, 10.0, 0.5) == surrogate(0.4, 10.0, surrogate.max_turbulence)
+    assert velocity_deficit.calculate_velocity_deficits([0.4, 0.6], 10.0, 0.1) == pytest.approx(surrogate([0.4, 0.6], 10.0, 0.1))
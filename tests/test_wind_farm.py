@@ -1,10 +1,15 @@
 import pytest
+import numpy as np
 
 from miniwake.turbine import Turbine
 from miniwake.turbine import FixedThrustCurve
 from miniwake.wind_farm import WindFarm
 from miniwake.ambient import FixedAmbientConditions
 from miniwake.rotor_integration import RotorCenterIntegrator
+from miniwake.point_query import PointQuery
+
+from .layouts import make_grid
+from .layouts import make_ambient_conditions
 
 
 def test_two_turbines_second_turbine_one_diameter_downwind():
@@ -55,3 +60,56 @@ def test_two_turbines_second_turbine_one_diameter_downwind():
 
     assert wakes[1].waked_velocity == pytest.approx(ambient_conditions.fixed_velocity * (1.0 - 0.2910), abs=0.005)
     assert wakes[1].waked_turbulence == pytest.approx(0.204077306)
+
+
+def grid_wind_farm():
+
+    return WindFarm(
+        turbines=make_grid(3, 3, 300.0, 350.0, x_stagger=40.0),
+        ambient_conditions=make_ambient_conditions(0.1),
+        velocity_integrator=RotorCenterIntegrator(),
+        turbulence_integrator=RotorCenterIntegrator(),
+        apply_meander=True)
+
+
+@pytest.mark.parametrize("direction", [270.0, 262.0, 90.0, 180.0])
+def test_points_at_turbine_hubs_match_turbine_wakes(direction):
+
+    wind_farm = grid_wind_farm()
+
+    point_query = PointQuery(
+        x=[turbine.x for turbine in wind_farm.turbines],
+        y=[turbine.y for turbine in wind_farm.turbines],
+        z=80.0)
+
+    wakes = wind_farm.calculate(direction, 9.5)
+
+    velocities, turbulences = wind_farm.calculate_points(direction, 9.5, point_query)
+
+    assert any(wake.waked_velocity < 9.0 for wake in wakes)
+
+    assert list(velocities) == pytest.approx([wake.waked_velocity for wake in wakes], abs=1e-6)
+    assert list(turbulences) == pytest.approx([wake.waked_turbulence for wake in wakes], abs=1e-6)
+
+
+def test_points_for_flow_cases():
+
+    wind_farm = grid_wind_farm()
+
+    # a met mast downwind (for 270 degrees) of the farm and one upwind
+    point_query = PointQuery(x=[1200.0, -500.0], y=[350.0, 350.0], z=80.0)
+
+    flow_cases = [(270.0, 9.5), (90.0, 9.5), (270.0, 9.5)]
+
+    velocities, turbulences = wind_farm.calculate_points_for_flow_cases(flow_cases, point_query)
+
+    assert velocities.shape == (3, 2)
+
+    assert velocities[0, 0] < 9.5
+    assert velocities[0, 1] == 9.5
+    assert turbulences[0, 1] == 0.1
+
+    assert velocities[1, 0] == 9.5
+    assert velocities[1, 1] < 9.5
+
+    assert np.array_equal(velocities[0], velocities[2])
@@ -1,9 +1,23 @@
+import numpy as np
 import pytest
 
 from miniwake.turbine import Turbine
 from miniwake.turbine import FixedThrustCurve
 from miniwake.wind_farm_wake import WindFarmWake
 from miniwake.ambient import FixedAmbientConditions
+from miniwake.rotation import rotate_and_sort_turbines
+from miniwake.influence_envelope import InfluenceEnvelope
+from miniwake.rotor_integration import VectorVelocityDeficitIntegrator
+from miniwake.rotor_integration import VectorAddedTurbulenceIntegrator
+from miniwake.rotor_integration import GaussVelocityDeficitIntegrator
+from miniwake.rotor_integration import AddedTurbulenceIntegrator
+from miniwake.combination import WeightedAverageRSSLinearVelocityDeficitCombiner
+from miniwake.combination import RSSMaxAutoVelocityDeficitCombiner
+
+from .layouts import make_turbine
+from .layouts import make_grid
+from .layouts import make_ambient_conditions
+
 
 class RotorCenterIntegrator:
 
@@ -60,3 +74,174 @@ def test_two_turbines_second_turbine_one_diameter_downwind():
 
     assert downwind_wake.waked_turbulence == pytest.approx(0.204077306)
 
+
+
+def test_cross_section_cache_in_regular_layout():
+
+    turbines = make_grid(4, 4, 500.0, 300.0)
+
+    ambient_conditions = make_ambient_conditions(0.1)
+
+    uncached = WindFarmWake(turbines=turbines, ambient_conditions=ambient_conditions)
+    cached = WindFarmWake(turbines=turbines, ambient_conditions=ambient_conditions, cross_section_cache_size=16)
+
+    for uncached_wake, cached_wake in zip(uncached.turbine_wakes, cached.turbine_wakes):
+        assert cached_wake.waked_velocity == pytest.approx(uncached_wake.waked_velocity, abs=1e-9)
+        assert cached_wake.waked_turbulence == pytest.approx(uncached_wake.waked_turbulence, abs=1e-9)
+
+    # turbines in the same column share their separation from each upwind turbine
+    assert sum(wake.cross_section_cache.hits for wake in cached.turbine_wakes) > 0
+    assert uncached.turbine_wakes[0].cross_section_cache is None
+
+
+@pytest.mark.parametrize("velocity_deficit_combiner", [
+    WeightedAverageRSSLinearVelocityDeficitCombiner,
+    RSSMaxAutoVelocityDeficitCombiner])
+def test_vector_rotor_integration_matches_sections(velocity_deficit_combiner):
+
+    turbines = make_grid(5, 4, 400.0, 250.0, x_stagger=37.0, thrust_coefficient=0.75)
+
+    ambient_conditions = make_ambient_conditions()
+
+    sections = WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=ambient_conditions,
+        velocity_deficit_combiner=velocity_deficit_combiner)
+
+    vector = WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=ambient_conditions,
+        velocity_deficit_combiner=velocity_deficit_combiner,
+        velocity_deficit_integrator=VectorVelocityDeficitIntegrator(),
+        added_turbulence_integrator=VectorAddedTurbulenceIntegrator())
+
+    for sections_wake, vector_wake in zip(sections.turbine_wakes, vector.turbine_wakes):
+        assert vector_wake.waked_velocity == pytest.approx(sections_wake.waked_velocity, abs=1e-12)
+        assert vector_wake.waked_turbulence == pytest.approx(sections_wake.waked_turbulence, abs=1e-12)
+        assert vector_wake.impacting_wakes == sections_wake.impacting_wakes
+
+    assert max(wake.impacting_wakes for wake in vector.turbine_wakes) > 1
+
+
+def test_gauss_rotor_integration_converges():
+
+    turbines = make_grid(4, 3, 400.0, 250.0, x_stagger=37.0, thrust_coefficient=0.75)
+
+    ambient_conditions = make_ambient_conditions()
+
+    def waked_velocities(radial_points, angular_points):
+
+        wind_farm_wake = WindFarmWake(
+            turbines=turbines,
+            ambient_conditions=ambient_conditions,
+            velocity_deficit_integrator=GaussVelocityDeficitIntegrator(radial_points, angular_points),
+            added_turbulence_integrator=AddedTurbulenceIntegrator())
+
+        return np.array([wake.waked_velocity for wake in wind_farm_wake.turbine_wakes])
+
+    reference = waked_velocities(12, 48)
+
+    assert np.max(np.abs(waked_velocities(4, 12) - reference)) < 1e-4
+    assert np.max(np.abs(waked_velocities(1, 4) - reference)) > 1e-2
+
+
+@pytest.mark.parametrize("direction", [270.0, 243.0])
+def test_upwind_index_visits_only_wakes_that_reach(direction):
+
+    turbines = rotate_and_sort_turbines(
+        direction,
+        make_grid(6, 6, 400.0, 300.0, x_stagger=40.0, thrust_coefficient=0.75))
+
+    ambient_conditions = make_ambient_conditions()
+
+    every_pair = WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=ambient_conditions,
+        upwind_index_bin_width=None)
+
+    indexed = WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=ambient_conditions,
+        upwind_index_bin_width=300.0)
+
+    for every_pair_wake, indexed_wake in zip(every_pair.turbine_wakes, indexed.turbine_wakes):
+
+        assert indexed_wake.waked_velocity == every_pair_wake.waked_velocity
+        assert indexed_wake.waked_turbulence == every_pair_wake.waked_turbulence
+
+        interacting = [wake.name for wake in every_pair_wake.interacting_wakes.turbine_wakes]
+        indexed_interacting = [wake.name for wake in indexed_wake.interacting_wakes.turbine_wakes]
+
+        assert indexed_interacting == interacting
+
+    assert sum(len(wake.interacting_wakes) for wake in indexed.turbine_wakes) > 0
+    assert sum(wake.number_of_added_wakes for wake in indexed.turbine_wakes) < \
+        sum(wake.number_of_added_wakes for wake in every_pair.turbine_wakes)
+
+
+def test_upwind_index_with_influence_envelope():
+
+    turbines = make_grid(5, 5, 400.0, 300.0, x_stagger=40.0, thrust_coefficient=0.75)
+
+    ambient_conditions = make_ambient_conditions()
+
+    influence_envelope = InfluenceEnvelope.build(max_distance=20.0, include_added_turbulence=True)
+
+    every_pair = WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=ambient_conditions,
+        influence_envelope=influence_envelope,
+        upwind_index_bin_width=None)
+
+    indexed = WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=ambient_conditions,
+        influence_envelope=influence_envelope)
+
+    for every_pair_wake, indexed_wake in zip(every_pair.turbine_wakes, indexed.turbine_wakes):
+        assert indexed_wake.waked_velocity == every_pair_wake.waked_velocity
+        assert indexed_wake.waked_turbulence == every_pair_wake.waked_turbulence
+
+
+def test_recalculate_matches_new_wind_farm_wake():
+
+    turbines = make_grid(4, 4, 400.0, 300.0, x_stagger=40.0)
+
+    wind_farm_wake = WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=make_ambient_conditions())
+
+    ambient_conditions = make_ambient_conditions(0.1, velocity=8.0)
+
+    wind_farm_wake.recalculate(ambient_conditions)
+
+    expected = WindFarmWake(turbines=turbines, ambient_conditions=ambient_conditions)
+
+    for recalculated_wake, expected_wake in zip(wind_farm_wake.turbine_wakes, expected.turbine_wakes):
+        assert recalculated_wake.waked_velocity == pytest.approx(expected_wake.waked_velocity, abs=1e-12)
+        assert recalculated_wake.waked_turbulence == pytest.approx(expected_wake.waked_turbulence, abs=1e-12)
+
+
+@pytest.mark.parametrize("upwind_index_bin_width", [2000.0, None])
+def test_recalculate_finds_wakes_that_now_interact(upwind_index_bin_width):
+
+    # at low turbulence the wake of A does not reach B, at high turbulence it does
+
+    turbines = [make_turbine("A", 0.0, 0.0), make_turbine("B", 1500.0, 300.0)]
+
+    wind_farm_wake = WindFarmWake(
+        turbines=turbines,
+        ambient_conditions=make_ambient_conditions(0.02),
+        upwind_index_bin_width=upwind_index_bin_width)
+
+    assert len(wind_farm_wake.turbine_wakes[1].interacting_wakes) == 0
+
+    ambient_conditions = make_ambient_conditions(0.15)
+
+    wind_farm_wake.recalculate(ambient_conditions)
+
+    expected = WindFarmWake(turbines=turbines, ambient_conditions=ambient_conditions)
+
+    assert [wake.name for wake in wind_farm_wake.turbine_wakes[1].interacting_wakes.turbine_wakes] == ["A"]
+    assert wind_farm_wake.turbine_wakes[1].waked_velocity == pytest.approx(expected.turbine_wakes[1].waked_velocity, abs=1e-12)
+    assert wind_farm_wake.turbine_wakes[1].waked_velocity < 9.5
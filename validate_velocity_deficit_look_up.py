@@ -0,0 +1,87 @@
+import argparse
+import os
+import tempfile
+
+from miniwake.velocity_deficit_look_up import VelocityDeficitLookUpBuilder
+from miniwake.velocity_deficit_look_up import VelocityDeficitLookUp
+from miniwake.velocity_deficit_surrogate import VelocityDeficitSurrogate
+from miniwake.interpolation import rect_grid_linear
+from miniwake.interpolation import rect_grid_nearest
+from miniwake.interpolation import direct_rect_grid_linear
+from miniwake.interpolation import direct_rect_grid_nearest
+from miniwake.look_up_validation import validate_look_ups
+from miniwake.look_up_validation import write_results
+
+
+INTERPOLATION_METHODS = {
+    "rect_grid_linear": rect_grid_linear,
+    "rect_grid_nearest": rect_grid_nearest,
+    "direct_rect_grid_linear": direct_rect_grid_linear,
+    "direct_rect_grid_nearest": direct_rect_grid_nearest
+}
+
+# (distance step, thrust coefficient step, turbulence step)
+GRID_RESOLUTIONS = [
+    (0.5, 0.1, 0.1),
+    (0.1, 0.1, 0.1),
+    (0.1, 0.1, 0.05),
+]
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compare velocity deficit look-ups against the ODE solution")
+    parser.add_argument("--output", default="look_up_validation.json")
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--max-distance", type=float, default=1000.0)
+    parser.add_argument("--max-turbulence", type=float, default=0.4)
+    arguments = parser.parse_args()
+
+    look_ups = {}
+
+    # the look-up files are memory mapped, so they are removed once validated
+    with tempfile.TemporaryDirectory() as folder:
+
+        for dist_step, ct_step, ti_step in GRID_RESOLUTIONS:
+
+            print(f"Building look-up dx={dist_step} dct={ct_step} dti={ti_step}")
+
+            builder = VelocityDeficitLookUpBuilder(
+                dist_downwind_step=dist_step,
+                thrust_coefficient_step=ct_step,
+                turbulence_intensity_step=ti_step,
+                max_dist_downwind=arguments.max_distance,
+                max_turbulence_intensity=arguments.max_turbulence,
+                max_thrust_coefficient=1.0,
+                batch=True)
+
+            path = os.path.join(folder, f"look_up_{dist_step}_{ct_step}_{ti_step}.bin")
+            builder.save_file(path)
+
+            for name, method in INTERPOLATION_METHODS.items():
+                look_ups[f"{name} dx={dist_step} dct={ct_step} dti={ti_step}"] = VelocityDeficitLookUp(path, interpolation_method=method)
+
+        print("Fitting surrogate")
+
+        look_ups["chebyshev_surrogate"] = VelocityDeficitSurrogate.fit(
+            max_turbulence=arguments.max_turbulence,
+            max_distance=arguments.max_distance,
+            validation_density=0)
+
+        print("Validating")
+
+        results = validate_look_ups(
+            look_ups,
+            number_of_points=arguments.points,
+            max_turbulence=arguments.max_turbulence,
+            max_distance=arguments.max_distance)
+
+    write_results(results, arguments.output)
+
+    for name, result in results["look_ups"].items():
+        print(f"{name}: max error {result['max_error']:.2e}, "
+              f"{result['scalar_queries_per_second']:.0f} scalar q/s, "
+              f"{result['batch_queries_per_second']:.0f} batch q/s, "
+              f"{result['memory_bytes'] / 1e6:.2f} MB")
+
+    print("Done")